@@ -3,6 +3,7 @@
 from __future__ import annotations
 
 import time
+from concurrent.futures import Future
 from concurrent.futures import ThreadPoolExecutor
 from concurrent.futures import TimeoutError
 from pathlib import Path
@@ -15,23 +16,36 @@ PROJECT_ROOT = Path(__file__).resolve().parents[1]
 if str(PROJECT_ROOT) not in sys.path:
     sys.path.insert(0, str(PROJECT_ROOT))
 
+from config.settings import settings
 from src.data.profiler import get_startup_profile
 from src.graph.flow import build_graph
 from src.graph.states import build_initial_state_dict
+from src.services.execution_control import CancellationToken
 from src.services.llm_client import OpenAILLMClient
+from src.services.sandbox import get_sandbox_pool
+from src.utils.async_runtime import submit
+from src.utils.token_stream import TokenStream
 
 WAIT_MESSAGES = ("thinking...", "getting your data...", "evaluating...")
 WAIT_INTERVAL_SEC = 2.0
+STREAM_POLL_SEC = 0.05
+STREAM_CURSOR = "▌"
 
 
 def _init_session() -> None:
     """Initialize long-lived app/session objects once."""
     if "graph_app" not in st.session_state:
-        st.session_state.graph_app = build_graph()
+        st.session_state.graph_app = build_graph(
+            async_nodes=settings.LLM_ASYNC_ENABLED
+        )
     if "llm_client" not in st.session_state:
         st.session_state.llm_client = OpenAILLMClient()
     if "data_profile" not in st.session_state:
+        # The profile is persisted per dataset version, so this is cheap after
+        # the first run; the cube and row indexes are built on first use.
         st.session_state.data_profile = get_startup_profile()
+        if settings.EXECUTION_SANDBOX:
+            get_sandbox_pool()
     if "graph_state" not in st.session_state:
         st.session_state.graph_state = None
     if "chat_messages" not in st.session_state:
@@ -50,32 +64,78 @@ def _prepare_state_for_query(query: str) -> dict[str, Any]:
         state["entities_preextracted"] = False
         state["task_type"] = None
         state["python_code"] = None
+        state["query_plan"] = None
+        state["cube_query"] = None
         state["retrieved_rows"] = []
         state["computed_result"] = None
+        state["execution_profile"] = None
+        state["question_cache_key"] = None
         state["needs_clarification"] = False
         state["clarification_question"] = None
         state["error_type"] = None
         state["final_answer"] = None
         state["routing_action"] = ""
+        previous_token = state.get("cancel_token")
+        if isinstance(previous_token, CancellationToken):
+            previous_token.cancel()
 
     state["llm_client"] = st.session_state.llm_client
-    state["data_profile"] = st.session_state.data_profile
+    state["cancel_token"] = CancellationToken()
+    state["answer_stream"] = TokenStream() if settings.LLM_STREAM_ANSWERS else None
+    # Refreshed per query so a reloaded dataset brings its rebuilt profile along.
+    state["data_profile"] = get_startup_profile()
     return state
 
 
 def _invoke_with_wait_status(state: dict[str, Any], placeholder: Any) -> dict[str, Any]:
-    """Invoke graph and rotate waiting status text every 2.5 seconds."""
+    """Invoke graph and rotate waiting status text every 2.5 seconds.
+
+    If the script run is interrupted (a new message triggers a rerun), the
+    query's cancellation token is set so running generated code stops early.
+    With `LLM_ASYNC_ENABLED` the turn runs on the shared event loop instead of
+    a dedicated thread.
+    """
+    if settings.LLM_ASYNC_ENABLED:
+        future = submit(st.session_state.graph_app.ainvoke(state))
+        return _wait_with_status(future, state, placeholder)
     with ThreadPoolExecutor(max_workers=1) as pool:
         future = pool.submit(st.session_state.graph_app.invoke, state)
-        index = 1
+        return _wait_with_status(future, state, placeholder)
+
+
+def _wait_with_status(future: Future, state: dict[str, Any], placeholder: Any) -> Any:
+    """Wait for a graph run while rotating the status text.
+
+    Streamed answer text replaces the status text as soon as it arrives.
+    """
+    stream = state.get("answer_stream")
+    streaming = isinstance(stream, TokenStream)
+    streamed = ""
+    index = 1
+    next_status = time.monotonic() + WAIT_INTERVAL_SEC
+    try:
         while True:
             try:
-                result = future.result(timeout=WAIT_INTERVAL_SEC)
-                placeholder.empty()
+                result = future.result(
+                    timeout=STREAM_POLL_SEC if streaming else WAIT_INTERVAL_SEC
+                )
+                if not streamed:
+                    placeholder.empty()
                 return result
             except TimeoutError:
-                placeholder.info(WAIT_MESSAGES[index % len(WAIT_MESSAGES)])
-                index += 1
+                if streaming:
+                    text = stream.drain()
+                    if text:
+                        streamed += text
+                        placeholder.markdown(streamed + STREAM_CURSOR)
+                if not streamed and time.monotonic() >= next_status:
+                    placeholder.info(WAIT_MESSAGES[index % len(WAIT_MESSAGES)])
+                    index += 1
+                    next_status += WAIT_INTERVAL_SEC
+    except BaseException:
+        state["cancel_token"].cancel()
+        future.cancel()
+        raise
 
 
 def main() -> None:
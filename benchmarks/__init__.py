@@ -0,0 +1 @@
+"""Standalone benchmarks for data-layer and execution hot paths."""
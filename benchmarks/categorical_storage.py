@@ -0,0 +1,110 @@
+"""Benchmark object-dtype vs categorical dimension storage for the cortex frame.
+
+Run from the project root:
+    python -m benchmarks.categorical_storage --scale 200
+"""
+
+from __future__ import annotations
+
+import argparse
+import timeit
+from typing import Callable
+
+import pandas as pd
+
+from config.constants import DATASET_PATH
+from src.data.transforms import encode_categorical_columns
+
+
+def _scaled_frame(dataset_path: str, scale: int) -> pd.DataFrame:
+    """Load dataset and replicate rows `scale` times to approximate larger ledgers."""
+    dataframe = pd.read_parquet(dataset_path)
+    if scale <= 1:
+        return dataframe
+    return pd.concat([dataframe] * scale, ignore_index=True)
+
+
+def _pnl_by_property(dataframe: pd.DataFrame) -> pd.DataFrame:
+    """Mirror the codegen few-shot P&L ranking plan."""
+    filtered_df = dataframe[
+        (dataframe["year"] == "2025") & (dataframe["property_name"].notna())
+    ][["property_name", "ledger_type", "profit"]]
+    revenue_df = (
+        filtered_df[filtered_df["ledger_type"] == "revenue"]
+        .groupby("property_name", dropna=False)["profit"]
+        .sum()
+        .reset_index()
+        .rename(columns={"profit": "revenue_total"})
+    )
+    expenses_df = (
+        filtered_df[filtered_df["ledger_type"] == "expenses"]
+        .groupby("property_name", dropna=False)["profit"]
+        .sum()
+        .reset_index()
+        .rename(columns={"profit": "expenses_total"})
+    )
+    pnl_df = pd.merge(revenue_df, expenses_df, on="property_name", how="outer").fillna(0)
+    pnl_df["net_pnl"] = pnl_df["revenue_total"] + pnl_df["expenses_total"]
+    return pnl_df.sort_values("net_pnl", ascending=False)
+
+
+def _operations() -> dict[str, Callable[[pd.DataFrame], object]]:
+    """Return representative generated-query operations keyed by label."""
+    return {
+        "eq_filter": lambda df: df[df["quarter"] == "2025-Q1"],
+        "range_filter": lambda df: df[
+            (df["month"] >= "2024-M03") & (df["month"] <= "2024-M09")
+        ],
+        "month_groupby": lambda df: df.groupby("month")["profit"].sum(),
+        "isin_filter": lambda df: df[
+            df["property_name"].isin(["Building 180", "Building 160"])
+        ],
+        "groupby_sum": lambda df: df.groupby("property_name", dropna=False)[
+            "profit"
+        ].sum(),
+        "groupby_nunique": lambda df: df.groupby("property_name", dropna=False)[
+            "tenant_name"
+        ].nunique(),
+        "pnl_plan": _pnl_by_property,
+    }
+
+
+def _best_ms(func: Callable[[], object], repeat: int) -> float:
+    """Return best-of-N wall time in milliseconds."""
+    return min(timeit.repeat(func, number=1, repeat=repeat)) * 1000
+
+
+def run(dataset_path: str, scale: int, repeat: int) -> None:
+    """Print memory and timing comparison table."""
+    object_df = _scaled_frame(dataset_path, scale)
+    categorical_df = encode_categorical_columns(object_df.copy())
+
+    object_mb = object_df.memory_usage(deep=True).sum() / 1e6
+    categorical_mb = categorical_df.memory_usage(deep=True).sum() / 1e6
+    print(f"rows={len(object_df)}")
+    print(
+        f"memory_mb object={object_mb:.1f} categorical={categorical_mb:.1f} "
+        f"ratio={object_mb / categorical_mb:.1f}x"
+    )
+    print(f"{'operation':<18}{'object_ms':>12}{'categorical_ms':>16}{'speedup':>10}")
+    for label, operation in _operations().items():
+        object_ms = _best_ms(lambda: operation(object_df), repeat)
+        categorical_ms = _best_ms(lambda: operation(categorical_df), repeat)
+        print(
+            f"{label:<18}{object_ms:>12.2f}{categorical_ms:>16.2f}"
+            f"{object_ms / categorical_ms:>9.1f}x"
+        )
+
+
+def main() -> None:
+    """CLI entrypoint."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--dataset-path", default=DATASET_PATH)
+    parser.add_argument("--scale", type=int, default=100)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+    run(args.dataset_path, args.scale, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,202 @@
+"""Benchmark the regex forbidden-pattern scan against the AST whitelist validator.
+
+Runs over a checked-in corpus of generated plans (`fixtures/generated_plans.json`)
+plus the prompt few-shot plans. Reports per-plan validation cost, the columns
+each plan is pruned to, false rejections/acceptances per validator, and which
+regex patterns cause the false rejections. Run from the project root:
+    python -m benchmarks.code_validation --repeat 2000
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import re
+import statistics
+import timeit
+from pathlib import Path
+from typing import Any
+
+from config.prompts import build_codegen_prompt
+from src.contracts.code_validation import (
+    GeneratedCodeValidationError,
+    parse_and_validate_generated_code,
+    plan_column_references,
+)
+from src.contracts.policies import FORBIDDEN_CODE_PATTERNS
+
+DEFAULT_CORPUS = Path(__file__).resolve().parent / "fixtures" / "generated_plans.json"
+
+
+def _prompt_plans() -> list[str]:
+    """Extract the few-shot `python_code` plans embedded in the codegen prompt."""
+    prompt = build_codegen_prompt("{}")
+    return [
+        json.loads(f'"{match}"')
+        for match in re.findall(r'"python_code":"(.*?)",\n', prompt)
+        if match
+    ]
+
+
+def load_plan_corpus(path: Path = DEFAULT_CORPUS) -> list[dict[str, Any]]:
+    """Return labelled plans: the prompt few-shots, then the fixture corpus."""
+    with open(path, encoding="utf-8") as handle:
+        fixture_plans = json.load(handle)["plans"]
+    prompt_plans = [
+        {"name": f"prompt_{index}", "expected": "accept", "python_code": source}
+        for index, source in enumerate(_prompt_plans())
+    ]
+    return prompt_plans + fixture_plans
+
+
+def _regex_matches(source: str, flags: int = 0) -> list[str]:
+    """Return the forbidden patterns that match a plan."""
+    return [
+        pattern
+        for pattern in FORBIDDEN_CODE_PATTERNS
+        if re.search(pattern, source, flags)
+    ]
+
+
+def _regex_scan(source: str) -> bool:
+    """Return True when no forbidden pattern matches (the legacy check)."""
+    return not any(re.search(pattern, source) for pattern in FORBIDDEN_CODE_PATTERNS)
+
+
+def _ast_scan(source: str) -> bool:
+    """Return True when the plan passes the AST whitelist."""
+    try:
+        parse_and_validate_generated_code(source)
+    except GeneratedCodeValidationError:
+        return False
+    return True
+
+
+def _pruned_columns(source: str) -> frozenset[str] | None:
+    """Return the columns the plan is pruned to, or None when it keeps all."""
+    try:
+        return plan_column_references(parse_and_validate_generated_code(source))
+    except GeneratedCodeValidationError:
+        return None
+
+
+def _best_us(func, repeat: int) -> float:
+    """Return best-of-5 mean time per call in microseconds."""
+    return min(timeit.repeat(func, number=repeat, repeat=5)) / repeat * 1e6
+
+
+def _print_timings(plans: list[dict[str, Any]], repeat: int) -> None:
+    """Print per-plan validation cost and pruned columns."""
+    print(
+        f"{'plan':<32}{'chars':>7}{'regex_us':>11}{'ast_us':>9}{'speedup':>9}"
+        "  columns"
+    )
+    regex_total = ast_total = 0.0
+    speedups: list[float] = []
+    for plan in plans:
+        source = plan["python_code"]
+        regex_us = _best_us(lambda: _regex_scan(source), repeat)
+        ast_us = _best_us(lambda: _ast_scan(source), repeat)
+        regex_total += regex_us
+        ast_total += ast_us
+        speedups.append(regex_us / ast_us)
+        columns = _pruned_columns(source)
+        print(
+            f"{plan['name']:<32}{len(source):>7}{regex_us:>11.1f}{ast_us:>9.1f}"
+            f"{regex_us / ast_us:>8.1f}x  "
+            f"{','.join(sorted(columns)) if columns is not None else 'all'}"
+        )
+    print(
+        f"total  regex_us={regex_total:.1f} ast_us={ast_total:.1f} "
+        f"speedup={regex_total / ast_total:.1f}x "
+        f"median_speedup={statistics.median(speedups):.1f}x"
+    )
+
+
+def _print_verdicts(plans: list[dict[str, Any]]) -> int:
+    """Print false rejections/acceptances per validator; return AST mistakes."""
+    validators = {
+        "regex": lambda source: not _regex_matches(source),
+        "regex_ignorecase": lambda source: not _regex_matches(source, re.IGNORECASE),
+        "ast": _ast_scan,
+    }
+    accepted_count = sum(plan["expected"] == "accept" for plan in plans)
+    print(
+        f"\nverdicts over {accepted_count} benign and "
+        f"{len(plans) - accepted_count} hostile plans"
+    )
+    print(f"{'validator':<18}{'false_reject':>13}{'false_accept':>13}  plans")
+    ast_mistakes = 0
+    for name, accepts in validators.items():
+        wrong = [
+            plan["name"]
+            for plan in plans
+            if accepts(plan["python_code"]) != (plan["expected"] == "accept")
+        ]
+        false_rejects = sum(
+            plan["expected"] == "accept" and plan["name"] in wrong for plan in plans
+        )
+        print(
+            f"{name:<18}{false_rejects:>13}{len(wrong) - false_rejects:>13}  "
+            f"{', '.join(wrong) or '-'}"
+        )
+        if name == "ast":
+            ast_mistakes = len(wrong)
+    return ast_mistakes
+
+
+def _print_pattern_false_rejections(plans: list[dict[str, Any]]) -> None:
+    """Print each regex pattern that matches a benign plan, with the plans it hits."""
+    print("\nregex false rejections by pattern (benign plans matched)")
+    print(f"{'pattern':<24}{'exact':>6}{'ignorecase':>11}  plans")
+    benign = [plan for plan in plans if plan["expected"] == "accept"]
+    rows = 0
+    for pattern in FORBIDDEN_CODE_PATTERNS:
+        exact = [
+            plan["name"] for plan in benign if re.search(pattern, plan["python_code"])
+        ]
+        folded = [
+            plan["name"]
+            for plan in benign
+            if re.search(pattern, plan["python_code"], re.IGNORECASE)
+        ]
+        if folded:
+            rows += 1
+            print(f"{pattern:<24}{len(exact):>6}{len(folded):>11}  {', '.join(folded)}")
+    if not rows:
+        print("none")
+
+
+def run(repeat: int, corpus: Path = DEFAULT_CORPUS) -> int:
+    """Print timings and verdict quality over the plan corpus.
+
+    Returns the number of problems: prompt few-shot plans that are not pruned,
+    plus plans whose AST verdict differs from the corpus label.
+    """
+    plans = load_plan_corpus(corpus)
+    print(f"plans={len(plans)} regex_patterns={len(FORBIDDEN_CODE_PATTERNS)}")
+    _print_timings(plans, repeat)
+    unpruned_prompt_plans = [
+        plan["name"]
+        for plan in plans
+        if plan["name"].startswith("prompt_")
+        and _pruned_columns(plan["python_code"]) is None
+    ]
+    if unpruned_prompt_plans:
+        print(f"prompt few-shot plans not pruned: {', '.join(unpruned_prompt_plans)}")
+    ast_mistakes = _print_verdicts(plans)
+    _print_pattern_false_rejections(plans)
+    return len(unpruned_prompt_plans) + ast_mistakes
+
+
+def main() -> None:
+    """CLI entrypoint; exits non-zero on an unpruned few-shot or a wrong AST verdict."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=500)
+    parser.add_argument("--corpus", type=Path, default=DEFAULT_CORPUS)
+    args = parser.parse_args()
+    raise SystemExit(1 if run(args.repeat, args.corpus) else 0)
+
+
+if __name__ == "__main__":
+    main()
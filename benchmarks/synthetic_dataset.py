@@ -0,0 +1,325 @@
+"""Generate schema-compatible synthetic cortex datasets at benchmark scale.
+
+The ledger catalogue (type/group/category/code/description), its frequencies and
+per-line value magnitudes are taken from a source dataset; properties, tenants,
+periods and values are sampled around them. Output is written in row chunks, so
+memory stays flat for 50M-row datasets.
+
+Run from the project root:
+    python -m benchmarks.synthetic_dataset --rows 5000000 --output data/synthetic_5m.parquet
+    python -m benchmarks.synthetic_dataset --rows 20000000 --partitioned --output data/synthetic_20m
+
+The output path can be used directly as `DATASET_PATH` / `dataset_path`.
+"""
+
+from __future__ import annotations
+
+import argparse
+from dataclasses import dataclass
+import os
+import shutil
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from config.constants import DATASET_PATH
+from src.data.constants import EXPECTED_COLUMNS
+from src.data.partitions import write_partitioned_table
+
+_LEDGER_COLUMNS = [
+    "ledger_type",
+    "ledger_group",
+    "ledger_category",
+    "ledger_code",
+    "ledger_description",
+]
+_ENTITY_NAME = "PropCo"
+# Log-scale spread of values around each ledger line's typical magnitude.
+_MAGNITUDE_SIGMA = 1.2
+
+SCHEMA = pa.schema(
+    [
+        (column, pa.int32() if column == "ledger_code" else pa.string())
+        for column in EXPECTED_COLUMNS
+        if column != "profit"
+    ]
+    + [("profit", pa.float64())]
+)
+
+
+@dataclass(frozen=True)
+class LedgerCatalogue:
+    """Ledger lines with sampling weight, typical magnitude and value-sign mix."""
+
+    lines: pd.DataFrame
+    weights: np.ndarray
+    magnitudes: np.ndarray
+    zero_share: np.ndarray
+    positive_share: np.ndarray
+
+
+@dataclass(frozen=True)
+class GeneratorConfig:
+    """Synthetic dataset shape."""
+
+    rows: int
+    properties: int
+    tenants: int
+    ledger_codes: int
+    start_month: str
+    months: int
+    property_null_ratio: float
+    tenant_null_ratio: float
+    chunk_rows: int
+    seed: int
+
+
+def load_ledger_catalogue(source_path: str, ledger_codes: int) -> LedgerCatalogue:
+    """Build a catalogue of `ledger_codes` lines from the source dataset.
+
+    Lines are ranked by frequency; extra lines beyond the source catalogue are
+    clones of existing ones with new codes, so groups/categories stay realistic.
+    """
+    source = pd.read_parquet(source_path, columns=_LEDGER_COLUMNS + ["profit"])
+    grouped = source.groupby(_LEDGER_COLUMNS, dropna=False)["profit"]
+    stats = grouped.agg(
+        count="size",
+        magnitude=lambda values: float(values[values != 0].abs().median() or 1.0),
+        zero_share=lambda values: float((values == 0).mean()),
+        positive_share=lambda values: float(
+            (values > 0).sum() / max(1, (values != 0).sum())
+        ),
+    ).reset_index()
+    stats = stats.sort_values("count", ascending=False, ignore_index=True)
+
+    if ledger_codes <= len(stats):
+        stats = stats.head(ledger_codes)
+    else:
+        extra = stats.sample(
+            ledger_codes - len(stats), replace=True, weights="count", random_state=0
+        ).reset_index(drop=True)
+        # Clones take the next free code after their source line (4xxx stays 4xxx).
+        used_codes = set(stats["ledger_code"].tolist())
+        new_codes = []
+        for base_code in extra["ledger_code"].tolist():
+            code = int(base_code) + 1
+            while code in used_codes:
+                code += 1
+            used_codes.add(code)
+            new_codes.append(code)
+        extra["ledger_code"] = new_codes
+        extra["ledger_description"] = [
+            f"{description} ({code})"
+            for description, code in zip(extra["ledger_description"], new_codes)
+        ]
+        stats = pd.concat([stats, extra], ignore_index=True)
+
+    weights = stats["count"].to_numpy(dtype=float)
+    return LedgerCatalogue(
+        lines=stats[_LEDGER_COLUMNS].reset_index(drop=True),
+        weights=weights / weights.sum(),
+        magnitudes=stats["magnitude"].to_numpy(dtype=float),
+        zero_share=stats["zero_share"].to_numpy(dtype=float),
+        positive_share=stats["positive_share"].to_numpy(dtype=float),
+    )
+
+
+def _zipf_weights(count: int, exponent: float = 1.1) -> np.ndarray:
+    """Return skewed weights (a few large properties, a long tail)."""
+    weights = 1.0 / np.arange(1, count + 1) ** exponent
+    return weights / weights.sum()
+
+
+def _month_tokens(
+    start_month: str, months: int
+) -> tuple[list[str], list[str], list[str]]:
+    """Return month, quarter and year tokens for `months` consecutive months."""
+    start = pd.Period(start_month.replace("-M", "-"), freq="M")
+    periods = [start + offset for offset in range(months)]
+    month_tokens = [f"{period.year}-M{period.month:02d}" for period in periods]
+    quarter_tokens = [f"{period.year}-Q{period.quarter}" for period in periods]
+    year_tokens = [str(period.year) for period in periods]
+    return month_tokens, quarter_tokens, year_tokens
+
+
+def _dictionary_column(
+    codes: np.ndarray, values: list[str], null_mask: np.ndarray | None = None
+) -> pa.Array:
+    """Decode integer codes into a string column without per-row Python objects."""
+    indices = pa.array(codes.astype(np.int32), mask=null_mask)
+    dictionary = pa.array(values, type=pa.string())
+    return pa.DictionaryArray.from_arrays(indices, dictionary).cast(pa.string())
+
+
+def _tenant_null_probabilities(
+    catalogue: LedgerCatalogue, tenant_null_ratio: float, property_null_ratio: float
+) -> np.ndarray:
+    """Per-line tenant-null probability among rows that have a property.
+
+    Rows without a property never have a tenant, so only the remainder of the
+    target ratio is placed here, on expense lines first as in the source ledger.
+    """
+    tenant_null_ratio = max(0.0, tenant_null_ratio - property_null_ratio) / max(
+        1e-9, 1.0 - property_null_ratio
+    )
+    is_expense = (catalogue.lines["ledger_type"] == "expenses").to_numpy()
+    expense_share = float(catalogue.weights[is_expense].sum())
+    revenue_share = 1.0 - expense_share
+    expense_null = min(1.0, tenant_null_ratio / expense_share) if expense_share else 0.0
+    revenue_null = (
+        max(0.0, (tenant_null_ratio - expense_share) / revenue_share)
+        if revenue_share
+        else 0.0
+    )
+    return np.where(is_expense, expense_null, revenue_null)
+
+
+def generate_chunk(
+    config: GeneratorConfig,
+    catalogue: LedgerCatalogue,
+    rows: int,
+    chunk_index: int,
+) -> pa.Table:
+    """Generate one reproducible chunk of synthetic rows as an Arrow table."""
+    rng = np.random.default_rng([config.seed, chunk_index])
+    month_tokens, quarter_tokens, year_tokens = _month_tokens(
+        config.start_month, config.months
+    )
+    property_names = [f"Building {index}" for index in range(1, config.properties + 1)]
+    tenant_names = [f"Tenant {index}" for index in range(1, config.tenants + 1)]
+
+    line = rng.choice(len(catalogue.weights), size=rows, p=catalogue.weights)
+    month = rng.integers(0, config.months, size=rows)
+    tenant = rng.integers(0, config.tenants, size=rows)
+    # Each tenant leases in one property; rows without a tenant pick any property.
+    tenant_property = np.arange(config.tenants) % config.properties
+    free_property = rng.choice(
+        config.properties, size=rows, p=_zipf_weights(config.properties)
+    )
+
+    property_null = rng.random(rows) < config.property_null_ratio
+    tenant_null = property_null | (
+        rng.random(rows)
+        < _tenant_null_probabilities(
+            catalogue, config.tenant_null_ratio, config.property_null_ratio
+        )[line]
+    )
+    property_code = np.where(tenant_null, free_property, tenant_property[tenant])
+
+    sign = np.where(rng.random(rows) < catalogue.positive_share[line], 1.0, -1.0)
+    magnitude = catalogue.magnitudes[line] * rng.lognormal(
+        0.0, _MAGNITUDE_SIGMA, size=rows
+    )
+    is_zero = rng.random(rows) < catalogue.zero_share[line]
+    profit = np.where(is_zero, 0.0, np.round(sign * magnitude, 2))
+
+    lines = catalogue.lines
+    columns = {
+        "entity_name": pa.array(np.full(rows, _ENTITY_NAME, dtype=object)),
+        "property_name": _dictionary_column(
+            property_code, property_names, property_null
+        ),
+        "tenant_name": _dictionary_column(tenant, tenant_names, tenant_null),
+        "ledger_code": pa.array(
+            lines["ledger_code"].to_numpy(dtype=np.int32)[line], type=pa.int32()
+        ),
+        "month": _dictionary_column(month, month_tokens),
+        "quarter": _dictionary_column(month, quarter_tokens),
+        "year": _dictionary_column(month, year_tokens),
+        "profit": pa.array(profit, type=pa.float64()),
+    }
+    for column in (
+        "ledger_type",
+        "ledger_group",
+        "ledger_category",
+        "ledger_description",
+    ):
+        columns[column] = _dictionary_column(line, lines[column].astype(str).tolist())
+    return pa.table([columns[field.name] for field in SCHEMA], schema=SCHEMA)
+
+
+def _chunk_sizes(rows: int, chunk_rows: int) -> list[int]:
+    full, remainder = divmod(rows, chunk_rows)
+    return [chunk_rows] * full + ([remainder] if remainder else [])
+
+
+def write_synthetic_dataset(
+    config: GeneratorConfig,
+    output: str,
+    *,
+    source_path: str = DATASET_PATH,
+    partitioned: bool = False,
+) -> None:
+    """Write a synthetic dataset as one parquet file or a hive-partitioned directory."""
+    catalogue = load_ledger_catalogue(source_path, config.ledger_codes)
+    sizes = _chunk_sizes(config.rows, config.chunk_rows)
+    if partitioned:
+        for chunk_index, size in enumerate(sizes):
+            write_partitioned_table(
+                generate_chunk(config, catalogue, size, chunk_index),
+                output,
+                basename_template=f"part-{chunk_index:05d}-{{i}}.parquet",
+                existing_data_behavior="overwrite_or_ignore",
+            )
+            print(f"chunk {chunk_index + 1}/{len(sizes)} rows={size}")
+        return
+    with pq.ParquetWriter(output, SCHEMA) as writer:
+        for chunk_index, size in enumerate(sizes):
+            writer.write_table(generate_chunk(config, catalogue, size, chunk_index))
+            print(f"chunk {chunk_index + 1}/{len(sizes)} rows={size}")
+
+
+def main() -> None:
+    """CLI entrypoint."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--output", required=True)
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--properties", type=int, default=50)
+    parser.add_argument("--tenants", type=int, default=500)
+    parser.add_argument("--ledger-codes", type=int, default=60)
+    parser.add_argument("--start-month", default="2020-M01")
+    parser.add_argument("--months", type=int, default=72)
+    parser.add_argument("--property-null-ratio", type=float, default=0.15)
+    parser.add_argument("--tenant-null-ratio", type=float, default=0.19)
+    parser.add_argument("--chunk-rows", type=int, default=1_000_000)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--source-path", default=DATASET_PATH)
+    parser.add_argument("--partitioned", action="store_true")
+    parser.add_argument(
+        "--overwrite", action="store_true", help="Replace an existing output path"
+    )
+    args = parser.parse_args()
+
+    if os.path.exists(args.output):
+        if not args.overwrite:
+            parser.error(f"{args.output} exists; pass --overwrite to replace it")
+        if os.path.isdir(args.output):
+            shutil.rmtree(args.output)
+        else:
+            os.remove(args.output)
+
+    config = GeneratorConfig(
+        rows=args.rows,
+        properties=args.properties,
+        tenants=args.tenants,
+        ledger_codes=args.ledger_codes,
+        start_month=args.start_month,
+        months=args.months,
+        property_null_ratio=args.property_null_ratio,
+        tenant_null_ratio=args.tenant_null_ratio,
+        chunk_rows=args.chunk_rows,
+        seed=args.seed,
+    )
+    write_synthetic_dataset(
+        config,
+        args.output,
+        source_path=args.source_path,
+        partitioned=args.partitioned,
+    )
+    print(f"wrote {config.rows} rows to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -11,6 +11,16 @@ MSG_OUT_OF_SCOPE: Final[str] = (
 )
 MSG_CANNOT_PROCEED: Final[str] = "Cannot proceed with this request"
 MSG_GIBBERISH: Final[str] = "I don't understand the question, please rephrase it"
+MSG_EXECUTION_TIMEOUT: Final[str] = (
+    "The query took too long to run and was stopped. Please narrow it down (for example, a shorter period or fewer properties) and try again"
+)
+MSG_RESOURCE_LIMIT: Final[str] = (
+    "The query needed more memory than allowed and was stopped. Please narrow it down (for example, a shorter period or fewer properties) and try again"
+)
+MSG_CANCELLED: Final[str] = "The query was cancelled"
+MSG_SANDBOX_UNAVAILABLE: Final[str] = (
+    "The query engine is restarting and could not run this query. Please try again in a moment"
+)
 
 MSG_MULTIPLE_QUESTION: Final[str] = (
     "Please, don't ask more than one question at a time. Choose one and ask again"
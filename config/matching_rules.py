@@ -12,3 +12,105 @@ MISSING_CHECK_COLUMNS: Final[tuple[str, ...]] = (
     "ledger_category",
     "ledger_description",
 )
+
+# Near-duplicate question matching (src/services/question_cache.py). Keys and
+# values are in normalized form: lowercase words separated by single spaces.
+QUESTION_SYNONYMS: Final[dict[str, str]] = {
+    "p l": "pnl",
+    "p and l": "pnl",
+    "profit and loss": "pnl",
+    "profit loss": "pnl",
+    "income statement": "pnl",
+    "earnings": "revenue",
+    "costs": "expenses",
+    "cost": "expenses",
+    "spend": "expenses",
+}
+
+QUESTION_STOPWORDS: Final[frozenset[str]] = frozenset(
+    {
+        "a",
+        "an",
+        "the",
+        "for",
+        "of",
+        "in",
+        "on",
+        "during",
+        "please",
+        "show",
+        "me",
+        "give",
+        "tell",
+        "get",
+        "what",
+        "whats",
+        "is",
+        "was",
+        "are",
+        "were",
+        "can",
+        "could",
+        "you",
+        "i",
+        "we",
+        "our",
+        "my",
+        "us",
+        "see",
+    }
+)
+
+# Words that change what a question asks for even when it is otherwise
+# near-identical; rephrasings must agree on them to share cached output.
+QUESTION_MODIFIER_TERMS: Final[dict[str, str]] = {
+    "highest": "rank=highest",
+    "top": "rank=highest",
+    "most": "rank=highest",
+    "largest": "rank=highest",
+    "biggest": "rank=highest",
+    "max": "rank=highest",
+    "maximum": "rank=highest",
+    "lowest": "rank=lowest",
+    "bottom": "rank=lowest",
+    "least": "rank=lowest",
+    "smallest": "rank=lowest",
+    "min": "rank=lowest",
+    "minimum": "rank=lowest",
+    "last": "relative=last",
+    "previous": "relative=last",
+    "prior": "relative=last",
+    "this": "relative=current",
+    "current": "relative=current",
+    "next": "relative=next",
+    "ytd": "relative=ytd",
+    "not": "negation",
+    "except": "negation",
+    "excluding": "negation",
+    "without": "negation",
+    "average": "aggregate=mean",
+    "avg": "aggregate=mean",
+    "mean": "aggregate=mean",
+    "count": "aggregate=count",
+    "many": "aggregate=count",
+    "number": "aggregate=count",
+    "pnl": "metric=pnl",
+    "net": "metric=net",
+    "profit": "metric=profit",
+    "revenue": "metric=revenue",
+    "income": "metric=revenue",
+    "expenses": "metric=expenses",
+    "monthly": "grain=month",
+    "month": "grain=month",
+    "months": "grain=month",
+    "quarterly": "grain=quarter",
+    "quarter": "grain=quarter",
+    "quarters": "grain=quarter",
+    "yearly": "grain=year",
+    "annual": "grain=year",
+    "year": "grain=year",
+    "years": "grain=year",
+    "compare": "compare",
+    "vs": "compare",
+    "versus": "compare",
+}
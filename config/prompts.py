@@ -197,10 +197,21 @@ A:
 """.strip()
 
 
-def build_codegen_prompt(profile_json: str) -> str:
-    """Build prompt for LLM Python code generation against dataframe."""
+_DUCKDB_BACKEND_RULE = """
+14) Query plans run as DuckDB SQL directly over the parquet files, out of core, while python_code
+   loads the whole dataset into memory. Express every filter, grouping, aggregation, P&L, sort and
+   limit as a query_plan; write python_code only for requests rule 13 lists as inexpressible.
+   Plan filters must use source columns (month/quarter/year, not month_key/quarter_key/year_key)."""
+
+
+def build_codegen_prompt(profile_json: str, backend: str = "pandas") -> str:
+    """Build prompt for LLM query-plan/Python code generation against dataframe.
+
+    `backend` names the engine that runs query plans; `duckdb` adds its rule.
+    """
+    backend_rule = _DUCKDB_BACKEND_RULE if backend == "duckdb" else ""
     return f"""
-You generate Python code to query a pandas DataFrame named `dataframe`.
+You generate a structured query plan, or Python code, to query a pandas DataFrame named `dataframe`.
 
 Dataset context:
 {profile_json}
@@ -216,13 +227,18 @@ Input payload is JSON with:
 Rules:
 1) Return strict JSON only with keys:
    - task_type: short label describing the requested query type
-   - python_code: string with executable pandas code
+   - query_plan: structured plan object (preferred, see rule 13) or null
+   - python_code: string with executable pandas code when query_plan is null, otherwise ""
    - needs_clarification: boolean
    - clarification_prompt: string
 2) This step is ONLY for information gathering.
    - Stage 1: create `filtered_df` from `dataframe` based on query scope.
    - Stage 1 logic:
      - if time is specified, filter only that specified month/quarter/year/range.
+     - for month/quarter/year ranges (including "last N months"), use `period_slice(frame, column, start, end)`
+       instead of string comparisons; `month_key`/`quarter_key`/`year_key` are integer period ordinals.
+     - for equality/membership filters start from `select_rows(...)` (always over the full `dataframe`),
+       then chain any remaining conditions on its result.
      - if time is not specified, keep whole-period rows (no time filter).
      - if request_target includes `property_name`, ensure rows with null `property_name` are excluded before ranking/selection.
      - if request_target includes `tenant_name`, ensure rows with null `tenant_name` are excluded before ranking/selection.
@@ -254,6 +270,20 @@ Rules:
 12) Use `extracted_entities` as primary control input for query generation:
    - prioritize extracted_entities.request_target/ranking over ambiguous phrasing
    - use extracted_entities column values for filters whenever present
+13) Prefer `query_plan` whenever the request is filtering plus optional grouping/aggregation/P&L, sort and limit:
+   - `filters`: list of {{column, op, values}} combined with AND. ops: eq, ne, in, not_in, gt, gte, lt, lte,
+     between (inclusive [start, end]; use it for month/quarter/year ranges), is_null, not_null (values []),
+     contains (case-insensitive substring).
+   - express time scope as eq/between on month/quarter/year; exclude null ranking targets with not_null.
+   - `columns` (+ `distinct`): projection of the filtered rows when nothing is aggregated (empty = all columns).
+   - `group_by` + `aggregations` ({{column, func, alias}}; func: sum, mean, min, max, count, nunique).
+   - `derive_pnl`: true adds revenue_total, expenses_total and net_pnl = revenue_total + expenses_total per group
+     (or overall without group_by); do not filter ledger_type for P&L.
+   - `sort`: output columns with `ascending`; `limit`: ranking.top_k after sorting.
+   - Only when the request needs something a plan cannot express (derived columns, period-over-period changes,
+     reshaping, schema/dtype summaries) set query_plan to null and write python_code following rules 2-11.
+   - If the payload contains `rejected_query_plan`, the engine could not run that plan (`error` says why):
+     set query_plan to null and answer the same request with python_code.{backend_rule}
 
 Allowed pandas command patterns (preferred):
 - Boolean filtering:
@@ -262,6 +292,11 @@ Allowed pandas command patterns (preferred):
   `filtered_df = dataframe[(dataframe['quarter'] == '2025-Q1') & (dataframe['ledger_type'] == 'revenue')]`
 - Membership filtering:
   `filtered_df = dataframe[dataframe['property_name'].isin(['Building 180', 'Building 160'])]`
+- Indexed equality/membership lookups on the full dataset (property_name, tenant_name, ledger_code,
+  month, quarter, year use row-position indexes; other columns are masked; a list means isin):
+  `filtered_df = select_rows(property_name='Building 140', tenant_name='Tenant 2', year='2025')`
+- Period range filtering (inclusive, binary search over period-sorted rows):
+  `filtered_df = period_slice(dataframe, 'month', '2024-M03', '2024-M09')`
 - Null filtering:
   `filtered_df = dataframe[dataframe['tenant_name'].isnull()]`
 - Column projection:
@@ -291,7 +326,8 @@ Input: compare Building 180 and Building 160 in 2025-Q1
 Output:
 {{
   "task_type":"comparison",
-  "python_code":"filtered_df = dataframe[(dataframe['property_name'].isin(['Building 180','Building 160'])) & (dataframe['quarter']=='2025-Q1')][['property_name','profit']].copy(); result_df = filtered_df.groupby('property_name', dropna=False)['profit'].sum().reset_index().rename(columns={{'profit':'profit_total'}}).sort_values(['property_name'])",
+  "query_plan":{{"filters":[{{"column":"property_name","op":"in","values":["Building 180","Building 160"]}},{{"column":"quarter","op":"eq","values":["2025-Q1"]}}],"columns":[],"distinct":false,"group_by":["property_name"],"aggregations":[{{"column":"profit","func":"sum","alias":"profit_total"}}],"derive_pnl":false,"sort":[{{"column":"property_name","ascending":true}}],"limit":null}},
+  "python_code":"",
   "needs_clarification":false,
   "clarification_prompt":""
 }}
@@ -301,7 +337,8 @@ Input: what building has the best P&L in 2025
 Output:
 {{
   "task_type":"pnl_ranking",
-  "python_code":"filtered_df = dataframe[(dataframe['year']=='2025') & (dataframe['property_name'].notna())][['property_name','ledger_type','profit']].copy(); revenue_df = filtered_df[filtered_df['ledger_type']=='revenue'].groupby('property_name', dropna=False)['profit'].sum().reset_index().rename(columns={{'profit':'revenue_total'}}); expenses_df = filtered_df[filtered_df['ledger_type']=='expenses'].groupby('property_name', dropna=False)['profit'].sum().reset_index().rename(columns={{'profit':'expenses_total'}}); pnl_df = pd.merge(revenue_df, expenses_df, on='property_name', how='outer').fillna(0); pnl_df['net_pnl'] = pnl_df['revenue_total'] + pnl_df['expenses_total']; result_df = pnl_df.sort_values('net_pnl', ascending=False).head(1)",
+  "query_plan":{{"filters":[{{"column":"year","op":"eq","values":["2025"]}},{{"column":"property_name","op":"not_null","values":[]}}],"columns":[],"distinct":false,"group_by":["property_name"],"aggregations":[],"derive_pnl":true,"sort":[{{"column":"net_pnl","ascending":false}}],"limit":1}},
+  "python_code":"",
   "needs_clarification":false,
   "clarification_prompt":""
 }}
@@ -311,17 +348,19 @@ Input: compare revenue by property in 2025-Q1
 Output:
 {{
   "task_type":"comparison",
-  "python_code":"filtered_df = dataframe[(dataframe['quarter']=='2025-Q1') & (dataframe['ledger_type']=='revenue')][['property_name','profit']].copy(); result_df = filtered_df.groupby('property_name', dropna=False)['profit'].sum().reset_index().rename(columns={{'profit':'revenue_total'}}).sort_values(['revenue_total'], ascending=False)",
+  "query_plan":{{"filters":[{{"column":"quarter","op":"eq","values":["2025-Q1"]}},{{"column":"ledger_type","op":"eq","values":["revenue"]}}],"columns":[],"distinct":false,"group_by":["property_name"],"aggregations":[{{"column":"profit","func":"sum","alias":"revenue_total"}}],"derive_pnl":false,"sort":[{{"column":"revenue_total","ascending":false}}],"limit":null}},
+  "python_code":"",
   "needs_clarification":false,
   "clarification_prompt":""
 }}
 
 Few-shot example 4:
-Input: highest income building in 2025-Q1
+Input: highest income building between 2024-M10 and 2025-M03
 Output:
 {{
   "task_type":"asset_details",
-  "python_code":"filtered_df = dataframe[(dataframe['quarter']=='2025-Q1') & (dataframe['ledger_type']=='revenue') & (dataframe['property_name'].notna())][['property_name','profit']].copy(); result_df = filtered_df.groupby('property_name', dropna=False)['profit'].sum().reset_index().rename(columns={{'profit':'revenue_total'}}).sort_values(['revenue_total'], ascending=False).head(1)",
+  "query_plan":{{"filters":[{{"column":"month","op":"between","values":["2024-M10","2025-M03"]}},{{"column":"ledger_type","op":"eq","values":["revenue"]}},{{"column":"property_name","op":"not_null","values":[]}}],"columns":[],"distinct":false,"group_by":["property_name"],"aggregations":[{{"column":"profit","func":"sum","alias":"revenue_total"}}],"derive_pnl":false,"sort":[{{"column":"revenue_total","ascending":false}}],"limit":1}},
+  "python_code":"",
   "needs_clarification":false,
   "clarification_prompt":""
 }}
@@ -331,7 +370,8 @@ Input: count tenants by property for 2025
 Output:
 {{
   "task_type":"asset_details",
-  "python_code":"filtered_df = dataframe[(dataframe['year']=='2025') & (dataframe['tenant_name'].notna()) & (dataframe['property_name'].notna())][['property_name','tenant_name']].copy(); result_df = filtered_df.groupby('property_name', dropna=False)['tenant_name'].nunique().reset_index().rename(columns={{'tenant_name':'tenant_count'}}).sort_values(['tenant_count'], ascending=False)",
+  "query_plan":{{"filters":[{{"column":"year","op":"eq","values":["2025"]}},{{"column":"tenant_name","op":"not_null","values":[]}},{{"column":"property_name","op":"not_null","values":[]}}],"columns":[],"distinct":false,"group_by":["property_name"],"aggregations":[{{"column":"tenant_name","func":"nunique","alias":"tenant_count"}}],"derive_pnl":false,"sort":[{{"column":"tenant_count","ascending":false}}],"limit":null}},
+  "python_code":"",
   "needs_clarification":false,
   "clarification_prompt":""
 }}
@@ -341,7 +381,19 @@ Input: show expense rows for Building 160 in 2025-Q1
 Output:
 {{
   "task_type":"asset_details",
-  "python_code":"filtered_df = dataframe[(dataframe['property_name']=='Building 160') & (dataframe['quarter']=='2025-Q1') & (dataframe['ledger_type']=='expenses')][['property_name','tenant_name','ledger_group','ledger_category','ledger_code','ledger_description','profit','quarter']].copy(); result_df = filtered_df.sort_values(['ledger_group','ledger_category','ledger_code'])",
+  "query_plan":{{"filters":[{{"column":"property_name","op":"eq","values":["Building 160"]}},{{"column":"quarter","op":"eq","values":["2025-Q1"]}},{{"column":"ledger_type","op":"eq","values":["expenses"]}}],"columns":["property_name","tenant_name","ledger_group","ledger_category","ledger_code","ledger_description","profit","quarter"],"distinct":false,"group_by":[],"aggregations":[],"derive_pnl":false,"sort":[{{"column":"ledger_group","ascending":true}},{{"column":"ledger_category","ascending":true}},{{"column":"ledger_code","ascending":true}}],"limit":null}},
+  "python_code":"",
+  "needs_clarification":false,
+  "clarification_prompt":""
+}}
+
+Few-shot example 7 (python_code fallback: period-over-period change is not expressible as a plan):
+Input: month-over-month revenue change for Building 160 in 2025
+Output:
+{{
+  "task_type":"trend",
+  "query_plan":null,
+  "python_code":"filtered_df = select_rows(property_name='Building 160', year='2025', ledger_type='revenue'); result_df = filtered_df.groupby('month')['profit'].sum().reset_index().rename(columns={{'profit':'revenue_total'}}).sort_values('month'); result_df['revenue_change'] = result_df['revenue_total'].diff()",
   "needs_clarification":false,
   "clarification_prompt":""
 }}
@@ -368,6 +420,9 @@ Rules:
 5) Keep answer concise and directly responsive to the question.
 6) If the question asks for aggregation/comparison and result_json already contains rows,
    compute simple comparisons/summaries in your answer text from those rows.
+7) result_json is columnar: `columns` maps each column name to its list of values, and row i
+   is the i-th value of every column. `total_rows` is the full result size; when `truncated`
+   is true only the first `row_count` rows are included, so do not present them as complete.
 
 Dataset context:
 {profile_json}
@@ -1,4 +1,4 @@
-from typing import Optional
+from typing import Literal, Optional
 from pydantic import Field
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
@@ -26,6 +26,172 @@ class Settings(BaseSettings):
 
     # Request settings
     OPENAI_TIMEOUT_SEC: int = Field(default=60, gt=0)
+    LLM_ASYNC_ENABLED: bool = Field(
+        default=False,
+        description="Run graph turns with async LLM nodes on one shared event loop",
+    )
+    LLM_HTTP_MAX_CONNECTIONS: int = Field(
+        default=100,
+        gt=0,
+        description="Connections in the process-wide LLM HTTP pool",
+    )
+    LLM_HTTP_MAX_KEEPALIVE_CONNECTIONS: int = Field(default=20, ge=0)
+    LLM_HTTP_KEEPALIVE_EXPIRY_SEC: float = Field(default=30.0, gt=0)
+    LLM_CACHE_ENABLED: bool = Field(
+        default=False,
+        description="Serve repeated temperature-0 LLM requests from a persistent cache",
+    )
+    LLM_CACHE_PATH: str = Field(default=".cache/llm_responses.sqlite3")
+    LLM_CACHE_TTL_SEC: float = Field(
+        default=7 * 24 * 3600,
+        gt=0,
+        description="Age after which a cached LLM response is ignored",
+    )
+    LLM_CACHE_MAX_BYTES: int = Field(
+        default=64 * 1024 * 1024,
+        gt=0,
+        description="Byte budget for cached LLM responses (least recently read evicted)",
+    )
+    LLM_STREAM_ANSWERS: bool = Field(
+        default=True,
+        description="Stream final answer tokens to the UI as they are generated",
+    )
+    LLM_RETRY_MAX_ATTEMPTS: int = Field(
+        default=4,
+        ge=1,
+        description="Attempts per LLM request when the provider returns 429/5xx or drops the connection",
+    )
+    LLM_RETRY_BASE_DELAY_SEC: float = Field(default=0.5, gt=0)
+    LLM_RETRY_MAX_DELAY_SEC: float = Field(
+        default=10.0,
+        gt=0,
+        description="Longest backoff (and longest honoured Retry-After) before giving up",
+    )
+    LLM_CIRCUIT_FAILURE_THRESHOLD: int = Field(
+        default=5,
+        ge=1,
+        description="Consecutive transient failures that open an endpoint's circuit",
+    )
+    LLM_CIRCUIT_RESET_SEC: float = Field(
+        default=30.0,
+        gt=0,
+        description="Time an open circuit fails fast before a probe request is let through",
+    )
+    LLM_INTENT_HEDGE_DELAY_SEC: float = Field(
+        default=0.0,
+        ge=0,
+        description="Send a duplicate intent request if the first has not answered by then (0 disables)",
+    )
+    LLM_HEDGE_MAX_WORKERS: int = Field(
+        default=32,
+        ge=2,
+        description="Threads for hedged requests; calls beyond them run unhedged on the caller's thread",
+    )
+    QUESTION_CACHE_ENABLED: bool = Field(
+        default=False,
+        description="Reuse extraction and codegen output of near-duplicate past questions",
+    )
+    QUESTION_CACHE_SIZE: int = Field(default=512, ge=0)
+    QUESTION_CACHE_MIN_SIMILARITY: float = Field(
+        default=0.75,
+        gt=0,
+        le=1,
+        description="Character-trigram TF-IDF cosine similarity a near-duplicate needs",
+    )
+
+    # Dataset settings
+    DATASET_CATEGORICAL: bool = Field(
+        default=False,
+        description="Store dimension columns as categoricals with stable dictionaries",
+    )
+    DATASET_ARROW_SNAPSHOT: bool = Field(
+        default=False,
+        description="Share the prepared dataset across processes via a memory-mapped Arrow file",
+    )
+    PROFILE_CACHE_ENABLED: bool = Field(
+        default=True,
+        description="Persist the startup profile next to the dataset, keyed by fingerprint",
+    )
+
+    # Execution settings
+    EXECUTION_DATAFRAME_MODE: Literal["copy", "readonly"] = Field(
+        default="copy",
+        description="Give generated code a private copy or a zero-copy read-only view",
+    )
+    EXECUTION_BACKEND: Literal["pandas", "duckdb"] = Field(
+        default="pandas",
+        description="Engine for structured query plans: in-memory pandas or DuckDB over parquet",
+    )
+    DUCKDB_THREADS: int = Field(
+        default=0,
+        ge=0,
+        description="DuckDB worker threads (0 = one per core)",
+    )
+    DUCKDB_MEMORY_LIMIT: str = Field(
+        default="",
+        description="DuckDB memory limit such as 4GB (empty = DuckDB default)",
+    )
+    DUCKDB_TEMP_DIRECTORY: str = Field(
+        default="",
+        description="Directory DuckDB spills out-of-core aggregations to (empty = DuckDB default)",
+    )
+    PNL_CUBE_ENABLED: bool = Field(
+        default=True,
+        description="Answer supported P&L metric requests from the precomputed cube",
+    )
+    PNL_CUBE_VERIFY: bool = Field(
+        default=False,
+        description="Check the cube against a raw-frame computation when it is built",
+    )
+    EXECUTION_TIMEOUT_SEC: float = Field(
+        default=20.0,
+        gt=0,
+        description="Deadline for one generated plan before it is stopped",
+    )
+    EXECUTION_PROFILING: bool = Field(
+        default=False,
+        description="Time each generated-code statement and record peak memory and row counts",
+    )
+    EXECUTION_SANDBOX: bool = Field(
+        default=False,
+        description="Run generated code in a warm pool of limited worker processes",
+    )
+    SANDBOX_WORKERS: int = Field(default=2, gt=0)
+    SANDBOX_WALL_TIME_SEC: float = Field(default=30.0, gt=0)
+    SANDBOX_CPU_TIME_SEC: int = Field(default=20, gt=0)
+    SANDBOX_MEMORY_MB: int = Field(
+        default=2048,
+        gt=0,
+        description="Address space a sandbox worker may add beyond the loaded dataset",
+    )
+    ROW_INDEX_ENABLED: bool = Field(
+        default=True,
+        description="Back select_rows with per-snapshot row-position indexes",
+    )
+    COLUMN_PRUNING_ENABLED: bool = Field(
+        default=True,
+        description="Hand generated code only the dataframe columns it provably reads",
+    )
+    CODE_CACHE_SIZE: int = Field(
+        default=256,
+        ge=0,
+        description="Compiled generated-code plans kept in the LRU cache (0 disables)",
+    )
+    RESULT_CACHE_SIZE: int = Field(
+        default=128,
+        ge=0,
+        description="Executed plan results kept per process (0 disables)",
+    )
+    RESULT_CACHE_MAX_BYTES: int = Field(
+        default=64 * 1024 * 1024,
+        gt=0,
+        description="Byte budget for serialized results in the result cache",
+    )
+    RESULT_MAX_ROWS: int = Field(
+        default=500,
+        gt=0,
+        description="Result rows serialized for the answer stage (total_rows is always exact)",
+    )
 
 
 settings = Settings()
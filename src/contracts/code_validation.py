@@ -0,0 +1,514 @@
+"""Single-pass AST whitelist validation and static analysis of generated plans."""
+
+from __future__ import annotations
+
+import ast
+from typing import Any
+
+from src.data.constants import PERIOD_KEY_COLUMNS
+
+# Names the execution namespace provides; anything else must be bound by the plan.
+EXEC_PROVIDED_NAMES: frozenset[str] = frozenset(
+    {
+        "dataframe",
+        "filtered_df",
+        "result_df",
+        "result_payload",
+        "pd",
+        "period_slice",
+        "select_rows",
+        "float",
+        "int",
+    }
+)
+
+# Callable names (helpers and the whitelisted builtins).
+CALLABLE_NAMES: frozenset[str] = frozenset(
+    {"period_slice", "select_rows", "float", "int"}
+)
+
+# Top-level `pd.<name>` attributes generated plans may use.
+PANDAS_ALLOWED_ATTRIBUTES: frozenset[str] = frozenset(
+    {
+        "DataFrame",
+        "Series",
+        "Index",
+        "Categorical",
+        "NA",
+        "NaT",
+        "Timestamp",
+        "Timedelta",
+        "Period",
+        "concat",
+        "merge",
+        "merge_asof",
+        "pivot_table",
+        "crosstab",
+        "cut",
+        "qcut",
+        "isna",
+        "isnull",
+        "notna",
+        "notnull",
+        "to_numeric",
+        "to_datetime",
+        "unique",
+        "factorize",
+        "wide_to_long",
+        "melt",
+    }
+)
+
+# Frame/Series methods that touch files, the clipboard, or evaluate strings as code.
+FORBIDDEN_METHODS: frozenset[str] = frozenset(
+    {
+        "to_csv",
+        "to_excel",
+        "to_parquet",
+        "to_pickle",
+        "to_json",
+        "to_sql",
+        "to_hdf",
+        "to_feather",
+        "to_orc",
+        "to_stata",
+        "to_clipboard",
+        "to_html",
+        "to_latex",
+        "to_markdown",
+        "to_xml",
+        "to_gbq",
+        "eval",
+        "plot",
+        "hist",
+        "boxplot",
+        "style",
+    }
+)
+
+_ALLOWED_NODES: tuple[type[ast.AST], ...] = (
+    ast.Module,
+    ast.Assign,
+    ast.AugAssign,
+    ast.AnnAssign,
+    ast.Expr,
+    ast.If,
+    ast.For,
+    ast.Pass,
+    ast.Break,
+    ast.Continue,
+    ast.Delete,
+    ast.BoolOp,
+    ast.BinOp,
+    ast.UnaryOp,
+    ast.Lambda,
+    ast.IfExp,
+    ast.Dict,
+    ast.Set,
+    ast.List,
+    ast.Tuple,
+    ast.ListComp,
+    ast.SetComp,
+    ast.DictComp,
+    ast.GeneratorExp,
+    ast.comprehension,
+    ast.Compare,
+    ast.Call,
+    ast.keyword,
+    ast.Constant,
+    ast.Attribute,
+    ast.Subscript,
+    ast.Slice,
+    ast.Starred,
+    ast.Name,
+    ast.JoinedStr,
+    ast.FormattedValue,
+    ast.arguments,
+    ast.arg,
+    ast.expr_context,
+    ast.boolop,
+    ast.operator,
+    ast.unaryop,
+    ast.cmpop,
+)
+
+
+class GeneratedCodeValidationError(ValueError):
+    """Raised when a generated plan uses a construct outside the whitelist."""
+
+
+class _PlanValidator:
+    """Ordered tree walk that tracks names bound so far.
+
+    Values are visited before assignment targets and comprehension iterables
+    before their element, so a name is only usable after the plan binds it.
+    """
+
+    def __init__(self) -> None:
+        self._bound: set[str] = set(EXEC_PROVIDED_NAMES)
+
+    def _reject(self, node: ast.AST, reason: str) -> None:
+        line = getattr(node, "lineno", None)
+        location = f" (line {line})" if line is not None else ""
+        raise GeneratedCodeValidationError(
+            f"Generated code contains forbidden operations: {reason}{location}."
+        )
+
+    def visit(self, node: ast.AST) -> None:
+        if not isinstance(node, _ALLOWED_NODES):
+            self._reject(node, f"{type(node).__name__} is not allowed")
+        handler = getattr(self, f"_visit_{type(node).__name__}", None)
+        if handler is not None:
+            handler(node)
+        else:
+            self._visit_children(node)
+
+    def _visit_children(self, node: ast.AST) -> None:
+        for child in ast.iter_child_nodes(node):
+            self.visit(child)
+
+    def _visit_all(self, nodes: list[Any]) -> None:
+        for node in nodes:
+            self.visit(node)
+
+    def _visit_Assign(self, node: ast.Assign) -> None:
+        self.visit(node.value)
+        for target in node.targets:
+            self.visit(target)
+
+    def _visit_AugAssign(self, node: ast.AugAssign) -> None:
+        self.visit(node.value)
+        if isinstance(node.target, ast.Name):
+            self.visit(ast.copy_location(ast.Name(node.target.id, ast.Load()), node))
+        self.visit(node.target)
+
+    def _visit_AnnAssign(self, node: ast.AnnAssign) -> None:
+        if node.value is not None:
+            self.visit(node.value)
+        self.visit(node.target)
+
+    def _visit_For(self, node: ast.For) -> None:
+        self.visit(node.iter)
+        self.visit(node.target)
+        self._visit_all(node.body)
+        self._visit_all(node.orelse)
+
+    def _visit_comprehension(self, node: ast.comprehension) -> None:
+        if node.is_async:
+            self._reject(node, "async comprehensions are not allowed")
+        self.visit(node.iter)
+        self.visit(node.target)
+        self._visit_all(node.ifs)
+
+    def _visit_ListComp(
+        self, node: ast.ListComp | ast.SetComp | ast.GeneratorExp
+    ) -> None:
+        self._visit_all(node.generators)
+        self.visit(node.elt)
+
+    _visit_SetComp = _visit_ListComp
+    _visit_GeneratorExp = _visit_ListComp
+
+    def _visit_DictComp(self, node: ast.DictComp) -> None:
+        self._visit_all(node.generators)
+        self.visit(node.key)
+        self.visit(node.value)
+
+    def _visit_Lambda(self, node: ast.Lambda) -> None:
+        arguments = node.args
+        self._visit_all(arguments.defaults)
+        self._visit_all([value for value in arguments.kw_defaults if value is not None])
+        for argument in (
+            arguments.posonlyargs
+            + arguments.args
+            + arguments.kwonlyargs
+            + [arg for arg in (arguments.vararg, arguments.kwarg) if arg is not None]
+        ):
+            self._bound.add(argument.arg)
+        self.visit(node.body)
+
+    def _visit_Name(self, node: ast.Name) -> None:
+        if node.id.startswith("_"):
+            self._reject(node, f"name `{node.id}` is private")
+        if isinstance(node.ctx, ast.Store):
+            self._bound.add(node.id)
+        elif node.id not in self._bound:
+            self._reject(node, f"name `{node.id}` is not defined")
+
+    def _visit_Attribute(self, node: ast.Attribute) -> None:
+        attribute = node.attr
+        if attribute.startswith("_"):
+            self._reject(node, f"attribute `{attribute}` is private")
+        if attribute in FORBIDDEN_METHODS or attribute.startswith("read_"):
+            self._reject(node, f"`{attribute}` is not allowed")
+        if isinstance(node.value, ast.Name) and node.value.id == "pd":
+            if attribute not in PANDAS_ALLOWED_ATTRIBUTES:
+                self._reject(node, f"`pd.{attribute}` is not allowed")
+        self.visit(node.value)
+
+    def _visit_Constant(self, node: ast.Constant) -> None:
+        # Strings reach pandas expression parsers (query); keep dunders out of them.
+        if isinstance(node.value, str) and "__" in node.value:
+            self._reject(node, "string literals must not contain `__`")
+
+    def _visit_Call(self, node: ast.Call) -> None:
+        function = node.func
+        if isinstance(function, ast.Name):
+            if function.id not in CALLABLE_NAMES and function.id in EXEC_PROVIDED_NAMES:
+                self._reject(node, f"`{function.id}` is not callable")
+        self.visit(function)
+        self._visit_all(node.args)
+        self._visit_all(node.keywords)
+
+
+def parse_and_validate_generated_code(source: str) -> ast.Module:
+    """Parse a generated plan once and validate it in a single ordered walk.
+
+    Raises `SyntaxError` for unparsable code and `GeneratedCodeValidationError`
+    when the plan leaves the whitelist. Returns the tree, ready for `compile`.
+    """
+    tree = ast.parse(source, mode="exec")
+    _PlanValidator().visit(tree)
+    return tree
+
+
+# Series methods whose result is a boolean row mask.
+_MASK_METHODS: frozenset[str] = frozenset(
+    {
+        "isin",
+        "isna",
+        "isnull",
+        "notna",
+        "notnull",
+        "between",
+        "contains",
+        "startswith",
+        "endswith",
+        "match",
+        "fullmatch",
+        "eq",
+        "ne",
+        "lt",
+        "le",
+        "gt",
+        "ge",
+        "duplicated",
+    }
+)
+
+
+def _column_literals(node: ast.AST) -> list[str] | None:
+    """Return column names of a `'col'` or `['a', 'b']` subscript, else None."""
+    if isinstance(node, ast.Constant) and isinstance(node.value, str):
+        return [node.value]
+    if isinstance(node, ast.List) and all(
+        isinstance(item, ast.Constant) and isinstance(item.value, str)
+        for item in node.elts
+    ):
+        return [item.value for item in node.elts]
+    return None
+
+
+def _is_row_mask(node: ast.AST) -> bool:
+    """Return whether an expression is syntactically a boolean row mask."""
+    if isinstance(node, ast.Compare):
+        return True
+    if isinstance(node, ast.UnaryOp) and isinstance(node.op, (ast.Invert, ast.Not)):
+        return True
+    if isinstance(node, ast.BinOp) and isinstance(
+        node.op, (ast.BitAnd, ast.BitOr, ast.BitXor)
+    ):
+        return True
+    return (
+        isinstance(node, ast.Call)
+        and isinstance(node.func, ast.Attribute)
+        and node.func.attr in _MASK_METHODS
+    )
+
+
+def _is_full_slice(node: ast.AST) -> bool:
+    return (
+        isinstance(node, ast.Slice)
+        and node.lower is None
+        and node.upper is None
+        and node.step is None
+    )
+
+
+# Names whose value leaves the plan; a full-width frame bound to them is returned.
+_ESCAPING_NAMES: frozenset[str] = frozenset({"dataframe", "result_df", "result_payload"})
+
+# Frame attributes that depend on rows only, never on which columns exist.
+_ROW_ONLY_ATTRIBUTES: frozenset[str] = frozenset({"empty"})
+
+
+class _ColumnUsage:
+    """Collect the columns a plan reads from `dataframe`, or give up.
+
+    A full-width frame (`dataframe`, a row filter of it, `select_rows(...)` or
+    `period_slice(...)`) is only allowed as the base of further row filters,
+    of an explicit column projection (`['col']`, `[['a', 'b']]`,
+    `.loc[rows, cols]`, `.groupby(keys)[cols]`), or as the value of a plain
+    assignment to a name (`filtered_df = ...`). Such names are followed the
+    same way at every load. Any other use could observe unreferenced columns.
+    """
+
+    def __init__(self, tree: ast.Module) -> None:
+        self.columns: set[str] = set()
+        self._parents: dict[ast.AST, ast.AST] = {}
+        self._name_nodes: dict[str, list[ast.Name]] = {}
+        for parent in ast.walk(tree):
+            for child in ast.iter_child_nodes(parent):
+                self._parents[child] = parent
+            if isinstance(parent, ast.Name):
+                self._name_nodes.setdefault(parent.id, []).append(parent)
+        self._frame_names: set[str] = set()
+        self._pending_names: list[str] = []
+
+    def _consume_source(self, node: ast.AST) -> bool:
+        """Follow a full-width frame up the tree until it is projected."""
+        while True:
+            parent = self._parents.get(node)
+            if isinstance(parent, ast.Subscript) and parent.value is node:
+                columns = _column_literals(parent.slice)
+                if columns is not None:
+                    self.columns.update(columns)
+                    return True
+                if not _is_row_mask(parent.slice):
+                    return False
+                node = parent
+            elif (
+                isinstance(parent, ast.Attribute)
+                and parent.value is node
+                and parent.attr == "loc"
+            ):
+                indexer = self._parents.get(parent)
+                if (
+                    not isinstance(indexer, ast.Subscript)
+                    or indexer.value is not parent
+                ):
+                    return False
+                selector = indexer.slice
+                if isinstance(selector, ast.Tuple) and len(selector.elts) == 2:
+                    rows, columns = selector.elts
+                    column_names = _column_literals(columns)
+                    if column_names is None or not (
+                        _is_row_mask(rows) or _is_full_slice(rows)
+                    ):
+                        return False
+                    self.columns.update(column_names)
+                    return True
+                if not _is_row_mask(selector):
+                    return False
+                node = indexer
+            elif (
+                isinstance(parent, ast.Attribute)
+                and parent.value is node
+                and parent.attr == "groupby"
+            ):
+                return self._consume_groupby(parent)
+            elif isinstance(parent, ast.Attribute) and parent.value is node:
+                return parent.attr in _ROW_ONLY_ATTRIBUTES
+            elif (
+                isinstance(parent, ast.Call)
+                and isinstance(parent.func, ast.Name)
+                and parent.func.id == "period_slice"
+                and parent.args
+                and parent.args[0] is node
+            ):
+                if not self._add_period_slice_columns(parent):
+                    return False
+                node = parent
+            elif isinstance(parent, ast.Assign) and parent.value is node:
+                return self._bind_frame_name(parent)
+            else:
+                return False
+
+    def _bind_frame_name(self, assign: ast.Assign) -> bool:
+        """Track `name = <full-width frame>` so loads of `name` are followed too."""
+        if len(assign.targets) != 1 or not isinstance(assign.targets[0], ast.Name):
+            return False
+        name = assign.targets[0].id
+        if name in _ESCAPING_NAMES:
+            return False
+        if name not in self._frame_names:
+            self._frame_names.add(name)
+            self._pending_names.append(name)
+        return True
+
+    def _consume_groupby(self, attribute: ast.Attribute) -> bool:
+        """Accept `frame.groupby(keys, **constants)[cols]`; other uses give up."""
+        call = self._parents.get(attribute)
+        if not isinstance(call, ast.Call) or call.func is not attribute:
+            return False
+        keys = [keyword for keyword in call.keywords if keyword.arg == "by"]
+        options = [keyword for keyword in call.keywords if keyword.arg != "by"]
+        if len(call.args) + len(keys) != 1 or not all(
+            isinstance(keyword.value, ast.Constant) for keyword in options
+        ):
+            return False
+        key_columns = _column_literals(call.args[0] if call.args else keys[0].value)
+        projection = self._parents.get(call)
+        if (
+            key_columns is None
+            or not isinstance(projection, ast.Subscript)
+            or projection.value is not call
+        ):
+            return False
+        columns = _column_literals(projection.slice)
+        if columns is None:
+            return False
+        self.columns.update(key_columns)
+        self.columns.update(columns)
+        return True
+
+    def _add_period_slice_columns(self, call: ast.Call) -> bool:
+        if len(call.args) < 2 or call.keywords:
+            return False
+        column = _column_literals(call.args[1])
+        if column is None or column[0] not in PERIOD_KEY_COLUMNS:
+            return False
+        self.columns.update((column[0], PERIOD_KEY_COLUMNS[column[0]]))
+        return True
+
+    def collect(self, tree: ast.Module) -> bool:
+        for node in ast.walk(tree):
+            if isinstance(node, ast.arg) and node.arg == "dataframe":
+                return False
+            if isinstance(node, ast.Name) and node.id == "dataframe":
+                if not isinstance(node.ctx, ast.Load) or not self._consume_source(node):
+                    return False
+            elif (
+                isinstance(node, ast.Call)
+                and isinstance(node.func, ast.Name)
+                and node.func.id == "select_rows"
+            ):
+                if node.args or any(keyword.arg is None for keyword in node.keywords):
+                    return False
+                self.columns.update(keyword.arg for keyword in node.keywords)
+                if not self._consume_source(node):
+                    return False
+        while self._pending_names:
+            name = self._pending_names.pop()
+            for node in self._name_nodes.get(name, []):
+                if isinstance(node.ctx, ast.Load):
+                    if not self._consume_source(node):
+                        return False
+                elif isinstance(self._parents.get(node), ast.AugAssign):
+                    return False
+        return True
+
+
+def plan_column_references(tree: ast.Module) -> frozenset[str] | None:
+    """Return every `dataframe` column a validated plan can read.
+
+    Frames bound to intermediate names (`filtered_df = select_rows(...)`) are
+    followed through every later use. Returns None when the plan may observe
+    columns it does not name (for example `dataframe.columns`,
+    `result_df = filtered_df` or passing a frame to a function), in which case
+    the full frame must be provided.
+    """
+    usage = _ColumnUsage(tree)
+    if not usage.collect(tree):
+        return None
+    return frozenset(usage.columns)
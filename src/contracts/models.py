@@ -158,11 +158,99 @@ class ExtractedEntitiesSchema(BaseModel):
     )
 
 
+class PlanFilterSchema(BaseModel):
+    """One row predicate of a structured query plan."""
+
+    column: str = Field(description="Dataset column the predicate applies to.")
+    op: Literal[
+        "eq",
+        "ne",
+        "in",
+        "not_in",
+        "between",
+        "gt",
+        "gte",
+        "lt",
+        "lte",
+        "is_null",
+        "not_null",
+        "contains",
+    ] = Field(description="Comparison operator.")
+    values: list[str | int | float] = Field(
+        default_factory=list,
+        description=(
+            "Operands: one for eq/ne/gt/gte/lt/lte/contains, one or more for in/not_in, "
+            "inclusive [start, end] for between, none for is_null/not_null."
+        ),
+    )
+
+
+class PlanAggregationSchema(BaseModel):
+    """Named aggregation computed per group (or over all filtered rows)."""
+
+    column: str = Field(description="Source column to aggregate.")
+    func: Literal["sum", "mean", "min", "max", "count", "nunique"] = Field(
+        description="Aggregation function."
+    )
+    alias: str = Field(description="Output column name.")
+
+
+class PlanSortSchema(BaseModel):
+    """Sort key applied to the plan output."""
+
+    column: str = Field(description="Output column to sort by.")
+    ascending: bool = Field(default=True, description="Sort direction.")
+
+
+class QueryPlanSchema(BaseModel):
+    """Declarative query plan executed without generated Python code."""
+
+    filters: list[PlanFilterSchema] = Field(
+        default_factory=list,
+        description="Row predicates combined with AND.",
+    )
+    columns: list[str] = Field(
+        default_factory=list,
+        description="Projection of filtered rows when nothing is aggregated (empty = all columns).",
+    )
+    distinct: bool = Field(
+        default=False,
+        description="Drop duplicate rows of the projection.",
+    )
+    group_by: list[str] = Field(
+        default_factory=list,
+        description="Grouping keys for aggregations and P&L derivation.",
+    )
+    aggregations: list[PlanAggregationSchema] = Field(
+        default_factory=list,
+        description="Named aggregations per group.",
+    )
+    derive_pnl: bool = Field(
+        default=False,
+        description="Add revenue_total, expenses_total and net_pnl per group.",
+    )
+    sort: list[PlanSortSchema] = Field(
+        default_factory=list,
+        description="Sort keys applied to the output, in priority order.",
+    )
+    limit: int | None = Field(
+        default=None,
+        description="Maximum number of output rows after sorting.",
+    )
+
+
 class CodegenPlanSchema(BaseModel):
     """Schema for generated Python query plan."""
 
     task_type: str = Field(description="Short label describing generated query type.")
-    python_code: str = Field(default="")
+    query_plan: QueryPlanSchema | None = Field(
+        default=None,
+        description="Structured plan; preferred whenever the request fits it.",
+    )
+    python_code: str = Field(
+        default="",
+        description="Fallback pandas code for requests the structured plan cannot express.",
+    )
     needs_clarification: bool = False
     clarification_prompt: str = ""
 
@@ -6,6 +6,8 @@ from typing import Any
 
 import pandas as pd
 
+from src.data.periods import period_slice
+
 LLM_COMPATIBILITY_MARKERS: tuple[str, ...] = (
     "responses",
     "parse",
@@ -18,6 +20,8 @@ LLM_COMPATIBILITY_MARKERS: tuple[str, ...] = (
 )
 
 
+# Legacy regex deny-list. Execution validates plans with the AST whitelist in
+# `src.contracts.code_validation`; this is kept for `benchmarks.code_validation`.
 FORBIDDEN_CODE_PATTERNS: tuple[str, ...] = (
     r"__import__",
     r"\bimport\b",
@@ -104,10 +108,103 @@ FORBIDDEN_CODE_PATTERNS: tuple[str, ...] = (
 )
 
 
-def build_exec_locals(dataframe: pd.DataFrame) -> dict[str, Any]:
-    """Build local exec namespace for generated code."""
+class ReadOnlyDataFrameError(ValueError):
+    """Raised when generated code attempts to mutate the shared dataset frame."""
+
+
+def _raise_read_only(*_args: Any, **_kwargs: Any) -> Any:
+    """Reject an in-place mutation of the shared dataset frame."""
+    raise ReadOnlyDataFrameError(
+        "Generated code must not modify `dataframe`; assign derived frames to new names."
+    )
+
+
+class _ReadOnlyIndexer:
+    """Indexer proxy that allows reads and rejects item assignment."""
+
+    def __init__(self, indexer: Any) -> None:
+        self._indexer = indexer
+
+    def __call__(self, axis: Any = None) -> "_ReadOnlyIndexer":
+        return _ReadOnlyIndexer(self._indexer(axis=axis))
+
+    def __getitem__(self, key: Any) -> Any:
+        return self._indexer[key]
+
+    __setitem__ = _raise_read_only
+
+
+class ReadOnlyDataFrame(pd.DataFrame):
+    """Zero-copy view of the cached dataset that fails loudly on mutation.
+
+    Derived results (filters, projections, aggregations) are plain DataFrames, so
+    generated code can freely mutate its own intermediates. Isolation of the shared
+    buffers from those intermediates relies on pandas Copy-on-Write.
+    """
+
+    @property
+    def _constructor(self) -> type[pd.DataFrame]:
+        return pd.DataFrame
+
+    @property
+    def loc(self) -> Any:  # type: ignore[override]
+        return _ReadOnlyIndexer(super().loc)
+
+    @property
+    def iloc(self) -> Any:  # type: ignore[override]
+        return _ReadOnlyIndexer(super().iloc)
+
+    @property
+    def at(self) -> Any:  # type: ignore[override]
+        return _ReadOnlyIndexer(super().at)
+
+    @property
+    def iat(self) -> Any:  # type: ignore[override]
+        return _ReadOnlyIndexer(super().iat)
+
+    __setitem__ = _raise_read_only
+    __delitem__ = _raise_read_only
+    insert = _raise_read_only
+    pop = _raise_read_only
+    update = _raise_read_only
+    _update_inplace = _raise_read_only
+    _set_value = _raise_read_only
+    _iset_item_mgr = _raise_read_only
+    _set_item_mgr = _raise_read_only
+
+    def _where(self, *args: Any, inplace: bool = False, **kwargs: Any) -> Any:
+        if inplace:
+            _raise_read_only()
+        return super()._where(*args, inplace=inplace, **kwargs)
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        if not name.startswith("_"):
+            _raise_read_only()
+        super().__setattr__(name, value)
+
+
+def copy_on_write_enabled() -> bool:
+    """Return whether pandas isolates derived frames from shared buffers."""
+    if int(pd.__version__.split(".", 1)[0]) >= 3:
+        return True
+    return bool(pd.get_option("mode.copy_on_write") is True)
+
+
+def build_exec_locals(
+    dataframe: pd.DataFrame, *, read_only: bool = False
+) -> dict[str, Any]:
+    """Build local exec namespace for generated code.
+
+    With `read_only=True` the generated code receives a zero-copy `ReadOnlyDataFrame`
+    over the cached frame instead of a private copy. Without Copy-on-Write the
+    shared buffers cannot be protected, so a private copy is used instead.
+    """
+    if read_only and copy_on_write_enabled():
+        exec_dataframe: pd.DataFrame = ReadOnlyDataFrame(dataframe)
+    else:
+        exec_dataframe = dataframe.copy()
     return {
-        "dataframe": dataframe.copy(),
+        "dataframe": exec_dataframe,
         "filtered_df": None,
         "result_df": None,
         "result_payload": None,
@@ -118,6 +215,7 @@ def build_safe_exec_globals() -> dict[str, Any]:
     """Build restricted globals namespace for generated code."""
     return {
         "pd": pd,
+        "period_slice": period_slice,
         "__builtins__": {
             "float": float,
             "int": int,
@@ -0,0 +1,124 @@
+"""Arrow IPC helpers: mmap-shared dataset snapshots and serialized frames."""
+
+from __future__ import annotations
+
+import os
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+from src.data.partitions import is_partitioned_dataset
+from src.utils.logging import log_event
+
+_FINGERPRINT_METADATA_KEY = b"cortex_fingerprint"
+
+
+def _arrow_string_dtype() -> pd.StringDtype | None:
+    """Return the Arrow-backed string dtype with NaN missing values, if pandas has one.
+
+    pandas 3 uses it for `str` columns; 2.3 spells it with `na_value`, 2.1–2.2
+    as "pyarrow_numpy". Older pandas only has copying object columns.
+    """
+    try:
+        return pd.StringDtype("pyarrow", na_value=np.nan)
+    except (TypeError, ImportError):
+        pass
+    try:
+        return pd.StringDtype("pyarrow_numpy")
+    except (TypeError, ValueError, ImportError):
+        return None
+
+
+_ARROW_STRING_DTYPE = _arrow_string_dtype()
+
+
+def _snapshot_types_mapper(arrow_type: pa.DataType) -> pd.StringDtype | None:
+    """Keep string columns Arrow-backed; leave every other type to pyarrow."""
+    if pa.types.is_string(arrow_type) or pa.types.is_large_string(arrow_type):
+        return _ARROW_STRING_DTYPE
+    return None
+
+
+def arrow_snapshot_path(dataset_path: str, categorical: bool) -> str:
+    """Return the snapshot location for a dataset path and storage mode."""
+    name = "categorical.arrow" if categorical else "arrow"
+    if is_partitioned_dataset(dataset_path):
+        return os.path.join(dataset_path, f"_snapshot.{name}")
+    return f"{dataset_path}.{name}"
+
+
+def write_arrow_snapshot(dataframe: pd.DataFrame, path: str, version: str) -> None:
+    """Write an uncompressed IPC file tagged with `version`, replacing atomically.
+
+    Uncompressed buffers are what make zero-copy memory-mapped reads possible.
+    """
+    table = pa.Table.from_pandas(dataframe, preserve_index=False)
+    # pandas' Arrow string arrays are large_string; storing that width lets
+    # readers wrap the mapped buffers instead of casting (copying) them.
+    table = table.cast(
+        pa.schema(
+            field.with_type(pa.large_string())
+            if pa.types.is_string(field.type)
+            else field
+            for field in table.schema
+        ).with_metadata(table.schema.metadata)
+    )
+    metadata = dict(table.schema.metadata or {})
+    metadata[_FINGERPRINT_METADATA_KEY] = version.encode("ascii")
+    table = table.replace_schema_metadata(metadata)
+    temp_path = f"{path}.{os.getpid()}.tmp"
+    try:
+        with pa.OSFile(temp_path, "wb") as sink:
+            with pa.ipc.new_file(sink, table.schema) as writer:
+                writer.write_table(table)
+        os.replace(temp_path, path)
+    except Exception:
+        try:
+            os.remove(temp_path)
+        except OSError:
+            pass
+        raise
+
+
+def read_arrow_snapshot(path: str, version: str) -> pd.DataFrame | None:
+    """Memory-map a snapshot and return it as a dataframe if it matches `version`.
+
+    Column buffers stay backed by the mapped file (shared page cache) instead of
+    being copied onto each process heap: null-free numeric columns through
+    `split_blocks`, string columns as Arrow-backed strings (NaN for missing, as
+    with object columns). Dictionary columns become categoricals; only their
+    small integer codes and categories are copied. On pandas before 2.1 string
+    columns fall back to object dtype and are copied per process.
+    """
+    try:
+        source = pa.memory_map(path, "r")
+    except FileNotFoundError:
+        return None
+    try:
+        reader = pa.ipc.open_file(source)
+        metadata = reader.schema.metadata or {}
+        if metadata.get(_FINGERPRINT_METADATA_KEY) != version.encode("ascii"):
+            return None
+        table = reader.read_all()
+    except (OSError, pa.ArrowInvalid) as exc:
+        log_event("arrow_snapshot_read_failed", path=path, error=str(exc))
+        return None
+    return table.to_pandas(
+        split_blocks=True,
+        types_mapper=None if _ARROW_STRING_DTYPE is None else _snapshot_types_mapper,
+    )
+
+
+def dataframe_to_ipc_bytes(dataframe: pd.DataFrame) -> bytes:
+    """Serialize a dataframe (including its index) to Arrow IPC stream bytes."""
+    table = pa.Table.from_pandas(dataframe)
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue().to_pybytes()
+
+
+def dataframe_from_ipc_bytes(payload: bytes) -> pd.DataFrame:
+    """Deserialize Arrow IPC stream bytes produced by `dataframe_to_ipc_bytes`."""
+    return pa.ipc.open_stream(pa.py_buffer(payload)).read_all().to_pandas()
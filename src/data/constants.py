@@ -32,3 +32,38 @@ PROFILE_VALUE_COLUMNS = [
     "quarter",
     "year",
 ]
+
+# Dimension columns stored as categoricals when categorical load mode is enabled.
+CATEGORICAL_COLUMNS: Final[list[str]] = [
+    "entity_name",
+    "property_name",
+    "tenant_name",
+    "ledger_type",
+    "ledger_group",
+    "ledger_category",
+    "ledger_code",
+    "ledger_description",
+    "month",
+    "quarter",
+    "year",
+]
+
+# Hive partition keys for the multi-file dataset layout (outermost first).
+PARTITION_COLUMNS: Final[tuple[str, ...]] = ("year", "quarter")
+
+# Integer ordinal key column added at load time for each period column.
+PERIOD_KEY_COLUMNS: Final[dict[str, str]] = {
+    "month": "month_key",
+    "quarter": "quarter_key",
+    "year": "year_key",
+}
+
+# Columns with row-position secondary indexes (value -> row positions).
+INDEXED_COLUMNS: Final[tuple[str, ...]] = (
+    "property_name",
+    "tenant_name",
+    "ledger_code",
+    "month",
+    "quarter",
+    "year",
+)
@@ -0,0 +1,383 @@
+"""Materialized P&L aggregate cube for supported-metric lookups."""
+
+from __future__ import annotations
+
+from collections.abc import Iterable
+from itertools import combinations
+from typing import Any
+
+import numpy as np
+import pandas as pd
+
+from config.settings import settings
+from src.data.repository import (
+    DatasetSnapshot,
+    cached_per_snapshot,
+    get_dataset_snapshot,
+)
+from src.utils.logging import log_event
+
+CUBE_DIMENSIONS: tuple[str, ...] = ("property_name", "tenant_name")
+CUBE_TIME_GRAINS: tuple[str, ...] = ("month", "quarter", "year")
+CUBE_VALUE_COLUMNS: tuple[str, ...] = ("revenue_total", "expenses_total", "net_pnl")
+
+# Time columns kept as keys at each grain; coarser periods are functionally
+# dependent on finer ones, so keeping them lets any coarser filter apply.
+_GRAIN_KEYS: dict[str | None, tuple[str, ...]] = {
+    "month": ("month", "quarter", "year"),
+    "quarter": ("quarter", "year"),
+    "year": ("year",),
+    None: (),
+}
+_GRAIN_ORDER: dict[str | None, int] = {"month": 0, "quarter": 1, "year": 2, None: 3}
+
+# Requested metric -> cube value columns returned to the answer stage.
+_METRIC_COLUMNS: dict[str, tuple[str, ...]] = {
+    "pnl": CUBE_VALUE_COLUMNS,
+    "net_pnl": CUBE_VALUE_COLUMNS,
+    "revenue_total": ("revenue_total",),
+    "expenses_total": ("expenses_total",),
+}
+_METRIC_LEDGER_TYPES: dict[str, set[str]] = {
+    "revenue_total": {"revenue"},
+    "expenses_total": {"expenses"},
+}
+_UNSUPPORTED_FILTER_COLUMNS: tuple[str, ...] = (
+    "entity_name",
+    "ledger_group",
+    "ledger_category",
+    "ledger_code",
+    "ledger_description",
+    "ledger_raw_mentions",
+)
+
+PNL_CUBE_TASK_TYPE = "pnl_cube"
+
+CubeLevelKey = tuple[tuple[str, ...], str | None]
+
+
+def _pnl_frame(dataframe: pd.DataFrame, keys: list[str]) -> pd.DataFrame:
+    """Aggregate revenue/expenses/net P&L by keys straight from ledger rows."""
+    profit = dataframe["profit"]
+    ledger_type = dataframe["ledger_type"].astype(object)
+    frame = (
+        dataframe[keys]
+        .astype(object)
+        .assign(
+            revenue_total=profit.where(ledger_type == "revenue", 0.0),
+            expenses_total=profit.where(ledger_type == "expenses", 0.0),
+        )
+    )
+    if keys:
+        aggregated = (
+            frame.groupby(keys, dropna=False, sort=True)[
+                ["revenue_total", "expenses_total"]
+            ]
+            .sum()
+            .reset_index()
+        )
+    else:
+        aggregated = frame[["revenue_total", "expenses_total"]].sum().to_frame().T
+    aggregated["net_pnl"] = aggregated["revenue_total"] + aggregated["expenses_total"]
+    return aggregated
+
+
+def _raw_pnl_frame(dataframe: pd.DataFrame, keys: list[str]) -> pd.DataFrame:
+    """Compute P&L the way generated plans do: per-type sums merged on keys."""
+    frame = dataframe[[*keys, "ledger_type", "profit"]].astype({"ledger_type": object})
+    frame[keys] = frame[keys].astype(object)
+    if not keys:
+        revenue_total = frame.loc[frame["ledger_type"] == "revenue", "profit"].sum()
+        expenses_total = frame.loc[frame["ledger_type"] == "expenses", "profit"].sum()
+        return pd.DataFrame(
+            {
+                "revenue_total": [revenue_total],
+                "expenses_total": [expenses_total],
+                "net_pnl": [revenue_total + expenses_total],
+            }
+        )
+    revenue_df = (
+        frame[frame["ledger_type"] == "revenue"]
+        .groupby(keys, dropna=False)["profit"]
+        .sum()
+        .reset_index()
+        .rename(columns={"profit": "revenue_total"})
+    )
+    expenses_df = (
+        frame[frame["ledger_type"] == "expenses"]
+        .groupby(keys, dropna=False)["profit"]
+        .sum()
+        .reset_index()
+        .rename(columns={"profit": "expenses_total"})
+    )
+    pnl_df = pd.merge(revenue_df, expenses_df, on=keys, how="outer")
+    pnl_df[["revenue_total", "expenses_total"]] = pnl_df[
+        ["revenue_total", "expenses_total"]
+    ].fillna(0.0)
+    pnl_df["net_pnl"] = pnl_df["revenue_total"] + pnl_df["expenses_total"]
+    return pnl_df
+
+
+def _level_keys(level: CubeLevelKey) -> list[str]:
+    """Return grouping keys for a cube level."""
+    dimensions, grain = level
+    return [*dimensions, *_GRAIN_KEYS[grain]]
+
+
+def _cube_levels() -> list[CubeLevelKey]:
+    """Enumerate every rollup level: all dimension subsets x all time grains."""
+    levels: list[CubeLevelKey] = []
+    for size in range(len(CUBE_DIMENSIONS) + 1):
+        for dimensions in combinations(CUBE_DIMENSIONS, size):
+            for grain in (*CUBE_TIME_GRAINS, None):
+                levels.append((dimensions, grain))
+    return levels
+
+
+class PnlCube:
+    """Precomputed revenue/expenses/net P&L for every rollup level."""
+
+    def __init__(self, levels: dict[CubeLevelKey, pd.DataFrame]) -> None:
+        self.levels = levels
+
+    def level(self, dimensions: tuple[str, ...], grain: str | None) -> pd.DataFrame:
+        """Return the aggregate frame for a dimension subset and time grain."""
+        ordered = tuple(column for column in CUBE_DIMENSIONS if column in dimensions)
+        return self.levels[(ordered, grain)]
+
+
+def build_pnl_cube(dataframe: pd.DataFrame) -> PnlCube:
+    """Build all cube levels by rolling up one finest-grain aggregate."""
+    return build_pnl_cube_from_frames([dataframe])
+
+
+def build_pnl_cube_from_frames(frames: Iterable[pd.DataFrame]) -> PnlCube:
+    """Build the cube from row batches, e.g. one partition at a time.
+
+    Each batch is reduced to its month-grain aggregate before the next is read,
+    so only one batch of rows is held in memory.
+    """
+    base_keys = [*CUBE_DIMENSIONS, *_GRAIN_KEYS["month"]]
+    base = pd.concat(
+        [_pnl_frame(dataframe, base_keys) for dataframe in frames], ignore_index=True
+    )
+    levels: dict[CubeLevelKey, pd.DataFrame] = {}
+    for level in _cube_levels():
+        keys = _level_keys(level)
+        if keys:
+            rolled = (
+                base.groupby(keys, dropna=False, sort=True)[
+                    ["revenue_total", "expenses_total"]
+                ]
+                .sum()
+                .reset_index()
+            )
+        else:
+            rolled = base[["revenue_total", "expenses_total"]].sum().to_frame().T
+        rolled["net_pnl"] = rolled["revenue_total"] + rolled["expenses_total"]
+        levels[level] = rolled
+    return PnlCube(levels)
+
+
+def check_pnl_cube_consistency(
+    dataframe: pd.DataFrame, cube: PnlCube, *, atol: float = 0.01
+) -> list[str]:
+    """Compare every cube level against an independent raw-frame computation.
+
+    Returns human-readable mismatch descriptions; an empty list means consistent.
+    """
+    mismatches: list[str] = []
+    for level, cube_frame in cube.levels.items():
+        keys = _level_keys(level)
+        raw_frame = _raw_pnl_frame(dataframe, keys)
+        label = "/".join(keys) or "total"
+        if len(raw_frame) != len(cube_frame):
+            mismatches.append(
+                f"{label}: row count cube={len(cube_frame)} raw={len(raw_frame)}"
+            )
+            continue
+        if keys:
+            merged = cube_frame.merge(
+                raw_frame, on=keys, how="outer", suffixes=("_cube", "_raw")
+            )
+        else:
+            merged = cube_frame.add_suffix("_cube").join(raw_frame.add_suffix("_raw"))
+        for column in CUBE_VALUE_COLUMNS:
+            cube_values = merged[f"{column}_cube"].to_numpy(dtype=float)
+            raw_values = merged[f"{column}_raw"].to_numpy(dtype=float)
+            if not np.allclose(cube_values, raw_values, atol=atol, equal_nan=False):
+                mismatches.append(f"{label}: {column} differs from raw computation")
+    return mismatches
+
+
+def _non_empty_values(entities: dict[str, Any], column: str) -> list[str]:
+    """Return stripped non-empty string values for an entity column."""
+    values = entities.get(column, [])
+    if not isinstance(values, list):
+        return []
+    return [str(value).strip() for value in values if str(value).strip()]
+
+
+def build_pnl_cube_query(entities: dict[str, Any]) -> dict[str, Any] | None:
+    """Translate extracted entities into a cube lookup, or None if the cube cannot answer."""
+    metric = str(entities.get("requested_metric", "") or "").strip().lower()
+    value_columns = _METRIC_COLUMNS.get(metric)
+    if value_columns is None:
+        return None
+    if any(
+        _non_empty_values(entities, column) for column in _UNSUPPORTED_FILTER_COLUMNS
+    ):
+        return None
+
+    ledger_types = {
+        value.lower() for value in _non_empty_values(entities, "ledger_type")
+    }
+    if ledger_types and ledger_types != _METRIC_LEDGER_TYPES.get(metric):
+        return None
+
+    filters = {
+        column: _non_empty_values(entities, column)
+        for column in CUBE_DIMENSIONS
+        if _non_empty_values(entities, column)
+    }
+
+    group_dimensions: set[str] = set(filters)
+    group_grain: str | None = None
+    for target in _non_empty_values(entities, "request_target"):
+        if target in CUBE_DIMENSIONS:
+            group_dimensions.add(target)
+        elif target in CUBE_TIME_GRAINS:
+            if group_grain is not None and group_grain != target:
+                return None
+            group_grain = target
+        elif target not in ("profit", *CUBE_VALUE_COLUMNS, metric):
+            return None
+    non_null_dimensions = [
+        column
+        for column in CUBE_DIMENSIONS
+        if column in _non_empty_values(entities, "request_target")
+    ]
+
+    time_scope = entities.get("time_scope") or {}
+    if not isinstance(time_scope, dict):
+        return None
+    mode = str(time_scope.get("mode", "none") or "none")
+    time_filter: dict[str, Any] | None = None
+    if mode == "exact":
+        for column in CUBE_TIME_GRAINS:
+            value = str(time_scope.get(column) or "").strip()
+            if value:
+                time_filter = {"column": column, "start": value, "end": value}
+                break
+        if time_filter is None:
+            return None
+    elif mode == "range":
+        column = str(time_scope.get("column") or "").strip()
+        start = str(time_scope.get("start") or "").strip()
+        end = str(time_scope.get("end") or "").strip()
+        if column not in CUBE_TIME_GRAINS or not start or not end:
+            return None
+        time_filter = {"column": column, "start": start, "end": end}
+    elif mode != "none":
+        return None
+
+    grains = [
+        grain for grain in (group_grain, (time_filter or {}).get("column")) if grain
+    ]
+    lookup_grain = min(grains, key=_GRAIN_ORDER.__getitem__) if grains else None
+
+    ranking = entities.get("ranking") or {}
+    ranking_mode = (
+        str(ranking.get("mode", "none") or "none")
+        if isinstance(ranking, dict)
+        else "none"
+    )
+    if ranking_mode not in ("none", "highest", "lowest"):
+        return None
+    if ranking_mode != "none" and not (group_dimensions or group_grain):
+        return None
+
+    return {
+        "metric": metric,
+        "value_columns": list(value_columns),
+        "filters": filters,
+        "time_filter": time_filter,
+        "group_dimensions": [
+            column for column in CUBE_DIMENSIONS if column in group_dimensions
+        ],
+        "group_grain": group_grain,
+        "lookup_grain": lookup_grain,
+        "non_null_dimensions": non_null_dimensions,
+        "ranking_mode": ranking_mode,
+        "top_k": ranking.get("top_k") if isinstance(ranking, dict) else None,
+    }
+
+
+def lookup_pnl_cube(cube: PnlCube, query: dict[str, Any]) -> dict[str, Any]:
+    """Answer a cube query; mirrors `execute_generated_python_code` output shape."""
+    group_dimensions = tuple(query["group_dimensions"])
+    frame = cube.level(group_dimensions, query["lookup_grain"])
+
+    mask = pd.Series(True, index=frame.index)
+    for column, values in query["filters"].items():
+        mask &= frame[column].isin(values)
+    for column in query["non_null_dimensions"]:
+        mask &= frame[column].notna()
+    time_filter = query.get("time_filter")
+    if time_filter:
+        period = frame[time_filter["column"]].astype(str)
+        mask &= (period >= time_filter["start"]) & (period <= time_filter["end"])
+    matched = frame[mask]
+    filtered_row_count = int(len(matched))
+
+    output_keys = [*group_dimensions]
+    if query["group_grain"]:
+        output_keys.append(query["group_grain"])
+    value_columns = list(query["value_columns"])
+    if output_keys:
+        result_df = (
+            matched.groupby(output_keys, dropna=False, sort=True)[value_columns]
+            .sum()
+            .reset_index()
+        )
+    elif filtered_row_count:
+        result_df = matched[value_columns].sum().to_frame().T
+    else:
+        result_df = pd.DataFrame(columns=value_columns)
+
+    if query["ranking_mode"] != "none" and not result_df.empty:
+        sort_column = "net_pnl" if "net_pnl" in value_columns else value_columns[0]
+        result_df = result_df.sort_values(
+            sort_column, ascending=query["ranking_mode"] == "lowest"
+        ).head(int(query.get("top_k") or 1))
+    return {
+        "result_df": result_df.reset_index(drop=True),
+        "filtered_row_count": filtered_row_count,
+        "result_payload": None,
+    }
+
+
+@cached_per_snapshot()
+def _pnl_cube_for_snapshot(snapshot: DatasetSnapshot) -> PnlCube:
+    """Build the P&L cube once per dataset version, partition by partition."""
+    cube = build_pnl_cube_from_frames(snapshot.iter_partitions())
+    log_event(
+        "pnl_cube_built",
+        dataset_path=snapshot.dataset_path,
+        version=snapshot.version,
+        levels=len(cube.levels),
+        rows=sum(len(level) for level in cube.levels.values()),
+    )
+    if settings.PNL_CUBE_VERIFY:
+        mismatches = check_pnl_cube_consistency(snapshot.dataframe, cube)
+        log_event(
+            "pnl_cube_consistency_check",
+            status="ok" if not mismatches else "mismatch",
+            mismatches=mismatches,
+        )
+    return cube
+
+
+def get_pnl_cube(snapshot: DatasetSnapshot | None = None) -> PnlCube:
+    """Return the cached P&L cube for a snapshot (default: current dataset)."""
+    return _pnl_cube_for_snapshot(snapshot or get_dataset_snapshot())
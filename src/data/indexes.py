@@ -0,0 +1,130 @@
+"""Row-position secondary indexes over the loaded dataset."""
+
+from __future__ import annotations
+
+from collections.abc import Callable
+from functools import reduce
+from typing import Any
+
+import numpy as np
+import pandas as pd
+
+from src.data.constants import INDEXED_COLUMNS
+from src.data.repository import DatasetSnapshot, cached_per_snapshot
+from src.utils.logging import log_event
+
+_EMPTY_POSITIONS = np.empty(0, dtype=np.intp)
+
+
+class RowIndex:
+    """Map each value of the indexed columns to ascending row positions."""
+
+    def __init__(self, row_count: int, positions: dict[str, dict[Any, np.ndarray]]):
+        self.row_count = row_count
+        self._positions = positions
+
+    @property
+    def columns(self) -> tuple[str, ...]:
+        return tuple(self._positions)
+
+    def lookup(self, column: str, value: Any) -> np.ndarray:
+        """Return row positions for a value, or the union for a list of values."""
+        by_value = self._positions[column]
+        if isinstance(value, (list, tuple, set)):
+            matches = [by_value[item] for item in value if item in by_value]
+            if not matches:
+                return _EMPTY_POSITIONS
+            # Positions of distinct values are disjoint, so a sort gives the union.
+            return np.sort(np.concatenate(matches))
+        return by_value.get(value, _EMPTY_POSITIONS)
+
+
+def build_row_index(dataframe: pd.DataFrame) -> RowIndex:
+    """Build value -> row-position maps for `INDEXED_COLUMNS` (nulls excluded)."""
+    positions: dict[str, dict[Any, np.ndarray]] = {}
+    for column in INDEXED_COLUMNS:
+        if column not in dataframe.columns:
+            continue
+        grouped = dataframe.groupby(column, sort=False, observed=True, dropna=True)
+        positions[column] = {
+            value: rows.astype(np.intp, copy=False)
+            for value, rows in grouped.indices.items()
+        }
+    return RowIndex(len(dataframe), positions)
+
+
+@cached_per_snapshot()
+def _row_index_for_snapshot(snapshot: DatasetSnapshot) -> RowIndex:
+    """Build the row index once per dataset version."""
+    row_index = build_row_index(snapshot.dataframe)
+    log_event(
+        "row_index_built",
+        version=snapshot.version,
+        columns=list(row_index.columns),
+        row_count=row_index.row_count,
+    )
+    return row_index
+
+
+def get_row_index(snapshot: DatasetSnapshot) -> RowIndex:
+    """Return the row index for a loaded snapshot."""
+    return _row_index_for_snapshot(snapshot)
+
+
+def get_scan_row_index(
+    snapshot: DatasetSnapshot,
+    time_scope: dict[str, Any] | None,
+    frame: pd.DataFrame,
+) -> RowIndex | None:
+    """Return a row index valid for `frame = snapshot.scan(time_scope)`.
+
+    Full-frame scans share the per-snapshot index; pushed-down scans of a
+    partitioned dataset get their own, built on first use and evicted with the scan.
+    """
+    if snapshot.is_loaded and frame is snapshot.dataframe:
+        return get_row_index(snapshot)
+    row_index = snapshot.scan_artifact(time_scope, "row_index", build_row_index)
+    if row_index is None or row_index.row_count != len(frame):
+        return None
+    return row_index
+
+
+def make_row_selector(
+    dataframe: pd.DataFrame, row_index: RowIndex | None
+) -> Callable[..., pd.DataFrame]:
+    """Return `select_rows(**filters)` bound to `dataframe`.
+
+    Each keyword is an equality filter (a list means membership). Indexed columns
+    are resolved by intersecting position arrays, smallest first, so selective
+    lookups cost O(matches); other columns fall back to boolean masks on the
+    selected rows. Without a matching index every filter uses masks.
+    """
+    usable_index = (
+        row_index
+        if row_index is not None and row_index.row_count == len(dataframe)
+        else None
+    )
+
+    def select_rows(**filters: Any) -> pd.DataFrame:
+        position_sets: list[np.ndarray] = []
+        mask_filters: dict[str, Any] = {}
+        for column, value in filters.items():
+            if usable_index is not None and column in usable_index.columns:
+                position_sets.append(usable_index.lookup(column, value))
+            else:
+                mask_filters[column] = value
+
+        selected = dataframe
+        if position_sets:
+            position_sets.sort(key=len)
+            positions = reduce(
+                lambda left, right: np.intersect1d(left, right, assume_unique=True),
+                position_sets,
+            )
+            selected = dataframe.iloc[positions]
+        for column, value in mask_filters.items():
+            values = list(value) if isinstance(value, (list, tuple, set)) else [value]
+            selected = selected[selected[column].isin(values)]
+        return selected
+
+    return select_rows
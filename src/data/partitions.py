@@ -0,0 +1,192 @@
+"""Hive-partitioned (`year=/quarter=`) dataset layout with time-scope pushdown."""
+
+from __future__ import annotations
+
+import argparse
+import os
+import re
+from collections.abc import Iterator
+from typing import Any
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+
+from config.constants import DATASET_PATH
+from src.data.constants import EXPECTED_COLUMNS, PARTITION_COLUMNS
+
+_MONTH_PATTERN = re.compile(r"^(\d{4})-M(\d{2})$")
+_QUARTER_PATTERN = re.compile(r"^(\d{4})-Q([1-4])$")
+_YEAR_PATTERN = re.compile(r"^\d{4}$")
+
+
+def _partitioning() -> ds.Partitioning:
+    """Return hive partitioning with string-typed period keys."""
+    return ds.partitioning(
+        pa.schema([(column, pa.string()) for column in PARTITION_COLUMNS]),
+        flavor="hive",
+    )
+
+
+def is_partitioned_dataset(dataset_path: str) -> bool:
+    """Return True when the dataset path is a partitioned directory."""
+    return os.path.isdir(dataset_path)
+
+
+def list_dataset_files(dataset_path: str) -> list[str]:
+    """Return sorted parquet data files below a partitioned dataset root."""
+    files: list[str] = []
+    for directory, _subdirs, names in os.walk(dataset_path):
+        for name in names:
+            if name.endswith(".parquet") and not name.startswith(("_", ".")):
+                files.append(os.path.join(directory, name))
+    return sorted(files)
+
+
+def write_partitioned_table(
+    table: pa.Table,
+    root: str,
+    *,
+    basename_template: str | None = None,
+    existing_data_behavior: str = "delete_matching",
+) -> None:
+    """Write an Arrow table as `root/year=YYYY/quarter=YYYY-QN/*.parquet`.
+
+    Pass a unique `basename_template` with `existing_data_behavior="overwrite_or_ignore"`
+    to append chunks to the same partitions.
+    """
+    ds.write_dataset(
+        table,
+        root,
+        format="parquet",
+        partitioning=_partitioning(),
+        basename_template=basename_template,
+        existing_data_behavior=existing_data_behavior,
+    )
+
+
+def write_partitioned_dataset(dataframe: pd.DataFrame, root: str) -> None:
+    """Write dataframe as `root/year=YYYY/quarter=YYYY-QN/*.parquet`."""
+    write_partitioned_table(pa.Table.from_pandas(dataframe, preserve_index=False), root)
+
+
+def _quarter_of_month(month: str) -> str | None:
+    """Map `YYYY-MNN` to its `YYYY-QN` quarter token."""
+    match = _MONTH_PATTERN.match(month)
+    if not match:
+        return None
+    year, month_number = match.group(1), int(match.group(2))
+    if not 1 <= month_number <= 12:
+        return None
+    return f"{year}-Q{(month_number - 1) // 3 + 1}"
+
+
+def _between(column: str, start: str, end: str) -> ds.Expression:
+    """Inclusive string range predicate on a column."""
+    field = ds.field(column)
+    return (field >= start) & (field <= end)
+
+
+def time_scope_period_range(
+    time_scope: dict[str, Any] | None,
+) -> tuple[str, str, str] | None:
+    """Translate an extracted time_scope into an inclusive `(column, start, end)`.
+
+    Returns None when the scope is empty or malformed; callers then read all rows.
+    """
+    if not isinstance(time_scope, dict):
+        return None
+    mode = str(time_scope.get("mode", "none") or "none")
+    if mode == "exact":
+        column, start = "", ""
+        for name in ("month", "quarter", "year"):
+            start = str(time_scope.get(name) or "").strip()
+            if start:
+                column = name
+                break
+        end = start
+    elif mode == "range":
+        column = str(time_scope.get("column") or "").strip()
+        start = str(time_scope.get("start") or "").strip()
+        end = str(time_scope.get("end") or "").strip()
+    else:
+        return None
+    if column == "month":
+        if _quarter_of_month(start) is None or _quarter_of_month(end) is None:
+            return None
+    elif column == "quarter":
+        if not (_QUARTER_PATTERN.match(start) and _QUARTER_PATTERN.match(end)):
+            return None
+    elif column == "year":
+        if not (_YEAR_PATTERN.match(start) and _YEAR_PATTERN.match(end)):
+            return None
+    else:
+        return None
+    return column, start, end
+
+
+def time_scope_filter(time_scope: dict[str, Any] | None) -> ds.Expression | None:
+    """Translate an extracted time_scope into a partition-pruning filter.
+
+    Returns None when the scope is empty or malformed; callers then read all rows.
+    """
+    period_range = time_scope_period_range(time_scope)
+    if period_range is None:
+        return None
+    column, start, end = period_range
+    expression = _between("year", start[:4], end[:4])
+    if column == "month":
+        expression &= _between(
+            "quarter", _quarter_of_month(start), _quarter_of_month(end)
+        )
+        expression &= _between("month", start, end)
+    elif column == "quarter":
+        expression &= _between("quarter", start, end)
+    return expression
+
+
+def _ordered_columns(dataframe: pd.DataFrame) -> pd.DataFrame:
+    """Put the expected columns first, in schema order."""
+    ordered = [column for column in EXPECTED_COLUMNS if column in dataframe.columns]
+    extra = [column for column in dataframe.columns if column not in ordered]
+    return dataframe[ordered + extra]
+
+
+def read_partitioned_dataframe(
+    root: str, *, filter: ds.Expression | None = None
+) -> pd.DataFrame:
+    """Read a partitioned dataset, scanning only partitions that match `filter`."""
+    dataset = ds.dataset(root, format="parquet", partitioning=_partitioning())
+    return _ordered_columns(dataset.to_table(filter=filter).to_pandas())
+
+
+def iter_partition_frames(root: str) -> Iterator[pd.DataFrame]:
+    """Yield one dataframe per leaf partition directory, oldest first.
+
+    Lets full-history artifacts be built with one partition in memory at a time.
+    """
+    by_directory: dict[str, list[str]] = {}
+    for path in list_dataset_files(root):
+        by_directory.setdefault(os.path.dirname(path), []).append(path)
+    for paths in by_directory.values():
+        dataset = ds.dataset(
+            paths,
+            format="parquet",
+            partitioning=_partitioning(),
+            partition_base_dir=root,
+        )
+        yield _ordered_columns(dataset.to_table().to_pandas())
+
+
+def main() -> None:
+    """Convert a single-file dataset into the partitioned layout."""
+    parser = argparse.ArgumentParser(description=main.__doc__)
+    parser.add_argument("--source", default=DATASET_PATH)
+    parser.add_argument("--output", required=True)
+    args = parser.parse_args()
+    write_partitioned_dataset(pd.read_parquet(args.source), args.output)
+    print(f"wrote {len(list_dataset_files(args.output))} files to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""Integer period keys and binary-search period slicing."""
+
+from __future__ import annotations
+
+import re
+
+import numpy as np
+import pandas as pd
+
+from src.data.constants import PERIOD_KEY_COLUMNS
+
+EPOCH_YEAR = 1970
+_INVALID_KEY = -1
+
+_PERIOD_PATTERNS: dict[str, re.Pattern[str]] = {
+    "month": re.compile(r"^(\d{4})-M(0[1-9]|1[0-2])$"),
+    "quarter": re.compile(r"^(\d{4})-Q([1-4])$"),
+    "year": re.compile(r"^(\d{4})$"),
+}
+
+
+def period_ordinal(column: str, token: object) -> int:
+    """Return the integer key of a period token.
+
+    month -> months since 1970-01, quarter -> quarters since 1970-Q1, year -> year.
+    """
+    pattern = _PERIOD_PATTERNS.get(column)
+    if pattern is None:
+        raise ValueError(f"Unsupported period column: {column}")
+    match = pattern.match(str(token).strip())
+    if not match:
+        raise ValueError(f"Invalid {column} token: {token!r}")
+    year = int(match.group(1))
+    if column == "month":
+        return (year - EPOCH_YEAR) * 12 + int(match.group(2)) - 1
+    if column == "quarter":
+        return (year - EPOCH_YEAR) * 4 + int(match.group(2)) - 1
+    return year
+
+
+def _ordinal_or_invalid(column: str, token: object) -> int:
+    """Return the period key, or the invalid sentinel for malformed tokens."""
+    try:
+        return period_ordinal(column, token)
+    except ValueError:
+        return _INVALID_KEY
+
+
+def add_period_keys(dataframe: pd.DataFrame) -> pd.DataFrame:
+    """Add `month_key`/`quarter_key`/`year_key` int32 columns.
+
+    Tokens are parsed once per distinct value. Null or malformed periods get -1.
+    """
+    for column, key_column in PERIOD_KEY_COLUMNS.items():
+        if column not in dataframe.columns:
+            continue
+        codes, uniques = pd.factorize(dataframe[column])
+        # Trailing sentinel so factorize's -1 (null) code maps to the invalid key.
+        lookup = np.array(
+            [_ordinal_or_invalid(column, value) for value in uniques] + [_INVALID_KEY],
+            dtype=np.int32,
+        )
+        dataframe[key_column] = lookup[codes]
+    return dataframe
+
+
+def sort_by_period(dataframe: pd.DataFrame) -> pd.DataFrame:
+    """Physically order rows by month (hence also quarter and year) keys."""
+    return dataframe.sort_values(
+        PERIOD_KEY_COLUMNS["month"], kind="stable", ignore_index=True
+    )
+
+
+def period_slice(
+    dataframe: pd.DataFrame, column: str, start: str, end: str
+) -> pd.DataFrame:
+    """Return rows whose `column` period lies in [start, end] inclusive.
+
+    On period-sorted frames (the loaded dataset and any row subset of it) the
+    bounds are located by binary search on the integer key and the result is a
+    contiguous slice; otherwise an integer range mask is used.
+    """
+    key_column = PERIOD_KEY_COLUMNS.get(column)
+    if key_column is None:
+        raise ValueError(f"Unsupported period column: {column}")
+    low = period_ordinal(column, start)
+    high = period_ordinal(column, end)
+    keys = dataframe[key_column]
+    if keys.is_monotonic_increasing:
+        values = keys.to_numpy()
+        first = int(np.searchsorted(values, low, side="left"))
+        last = int(np.searchsorted(values, high, side="right"))
+        return dataframe.iloc[first:last]
+    return dataframe[(keys >= low) & (keys <= high)]
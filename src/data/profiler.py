@@ -2,19 +2,30 @@
 
 from __future__ import annotations
 
-from functools import lru_cache
 import json
+import os
+from collections.abc import Iterable
 from typing import Any
 
 import pandas as pd
 
 from config.constants import DATASET_PATH
 from config.metric_registry import SUPPORTED_METRICS
-from src.data.repository import get_dataframe
+from config.settings import settings
+from src.data.partitions import is_partitioned_dataset
+from src.data.repository import (
+    DatasetSnapshot,
+    cached_per_snapshot,
+    get_dataset_snapshot,
+)
 from src.data.constants import PROFILE_VALUE_COLUMNS
+from src.utils.logging import log_event
 
+# Bump when the data-derived profile fields or load-time transforms change.
+PROFILE_CACHE_SCHEMA_VERSION = 1
 
-def _build_dataset_guide(_dataframe: pd.DataFrame) -> dict[str, Any]:
+
+def _build_dataset_guide() -> dict[str, Any]:
     """Build compact semantic guide for routing/extraction/codegen prompts."""
     return {
         "column_definitions": {
@@ -30,6 +41,9 @@ def _build_dataset_guide(_dataframe: pd.DataFrame) -> dict[str, Any]:
             "quarter": "Quarter period in YYYY-QN format (e.g., 2025-Q1).",
             "year": "Year period (e.g., 2025).",
             "profit": "Signed financial value. Positive=Revenue, Negative=Loss.",
+            "month_key": "Integer month ordinal (months since 1970-01); derived from month.",
+            "quarter_key": "Integer quarter ordinal (quarters since 1970-Q1); derived from quarter.",
+            "year_key": "Integer year; derived from year.",
         },
         "query_hints": [
             "If query includes compare/comparison, likely comparison task across property_name.",
@@ -39,6 +53,7 @@ def _build_dataset_guide(_dataframe: pd.DataFrame) -> dict[str, Any]:
             "If query includes YYYY-QN, filter quarter exactly.",
             "If query includes YYYY only, filter year exactly.",
             "If no timeframe is provided, do not apply a time filter.",
+            "Rows are sorted by month_key; use period_slice for month/quarter/year ranges.",
         ],
     }
 
@@ -71,31 +86,126 @@ def _build_time_ranges(unique_values: dict[str, list[Any]]) -> dict[str, Any]:
     }
 
 
-def build_data_profile(dataframe: pd.DataFrame) -> dict[str, Any]:
-    """Build compact startup profile from dataframe."""
-    unique_values: dict[str, list[Any]] = {}
-    for column in PROFILE_VALUE_COLUMNS:
-        unique_values[column] = _unique_non_null_values(dataframe, column)
-    null_counts = {
-        column: int(dataframe[column].isna().sum()) for column in dataframe.columns
+def _build_profile_data(dataframe: pd.DataFrame) -> dict[str, Any]:
+    """Build the data-derived part of the profile (the part worth persisting)."""
+    return _build_profile_data_from_frames([dataframe])
+
+
+def _build_profile_data_from_frames(
+    frames: Iterable[pd.DataFrame],
+) -> dict[str, Any]:
+    """Build profile data from row batches, e.g. one partition at a time."""
+    columns: list[str] = []
+    value_sets: dict[str, set[Any]] = {
+        column: set() for column in PROFILE_VALUE_COLUMNS
     }
+    null_counts: dict[str, int] = {}
+    for dataframe in frames:
+        columns = columns or dataframe.columns.tolist()
+        for column in PROFILE_VALUE_COLUMNS:
+            value_sets[column].update(_unique_non_null_values(dataframe, column))
+        for column in dataframe.columns:
+            null_counts[column] = null_counts.get(column, 0) + int(
+                dataframe[column].isna().sum()
+            )
+    unique_values = {column: sorted(values) for column, values in value_sets.items()}
     time_ranges = _build_time_ranges(unique_values)
 
     return {
-        "columns": dataframe.columns.tolist(),
+        "columns": columns,
         "unique_values": unique_values,
         "null_counts": null_counts,
         **time_ranges,
+    }
+
+
+def _with_static_sections(profile_data: dict[str, Any]) -> dict[str, Any]:
+    """Attach code-defined sections (metrics, guide) to data-derived profile fields."""
+    return {
+        **profile_data,
         "supported_metrics": SUPPORTED_METRICS,
-        "dataset_guide": _build_dataset_guide(dataframe),
+        "dataset_guide": _build_dataset_guide(),
     }
 
 
-@lru_cache(maxsize=4)
+def build_data_profile(dataframe: pd.DataFrame) -> dict[str, Any]:
+    """Build compact startup profile from dataframe."""
+    return _with_static_sections(_build_profile_data(dataframe))
+
+
+def profile_cache_path(dataset_path: str) -> str:
+    """Return the on-disk profile location for a dataset path."""
+    if is_partitioned_dataset(dataset_path):
+        return os.path.join(dataset_path, "_profile.json")
+    return f"{dataset_path}.profile.json"
+
+
+def _read_cached_profile_data(path: str, version: str) -> dict[str, Any] | None:
+    """Return persisted profile data when it matches schema and dataset version."""
+    try:
+        with open(path, encoding="utf-8") as handle:
+            payload = json.load(handle)
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError) as exc:
+        log_event("profile_cache_read_failed", path=path, error=str(exc))
+        return None
+    if not isinstance(payload, dict):
+        return None
+    if payload.get("schema_version") != PROFILE_CACHE_SCHEMA_VERSION:
+        return None
+    if payload.get("fingerprint") != version:
+        return None
+    profile_data = payload.get("profile")
+    return profile_data if isinstance(profile_data, dict) else None
+
+
+def _write_cached_profile_data(
+    path: str, version: str, profile_data: dict[str, Any]
+) -> None:
+    """Persist profile data atomically; failures only cost the next cold start."""
+    payload = {
+        "schema_version": PROFILE_CACHE_SCHEMA_VERSION,
+        "fingerprint": version,
+        "profile": profile_data,
+    }
+    temp_path = f"{path}.{os.getpid()}.tmp"
+    try:
+        with open(temp_path, "w", encoding="utf-8") as handle:
+            json.dump(payload, handle, ensure_ascii=True)
+        os.replace(temp_path, path)
+    except (OSError, TypeError, ValueError) as exc:
+        log_event("profile_cache_write_failed", path=path, error=str(exc))
+        try:
+            os.remove(temp_path)
+        except OSError:
+            pass
+
+
+@cached_per_snapshot()
+def _profile_for_snapshot(snapshot: DatasetSnapshot) -> dict[str, Any]:
+    """Build profile once per dataset version, reusing the on-disk copy if current."""
+    if not settings.PROFILE_CACHE_ENABLED:
+        return _with_static_sections(
+            _build_profile_data_from_frames(snapshot.iter_partitions())
+        )
+    path = profile_cache_path(snapshot.dataset_path)
+    profile_data = _read_cached_profile_data(path, snapshot.version)
+    if profile_data is not None:
+        log_event("profile_cache_hit", path=path, version=snapshot.version)
+        return _with_static_sections(profile_data)
+    profile_data = _build_profile_data_from_frames(snapshot.iter_partitions())
+    _write_cached_profile_data(path, snapshot.version, profile_data)
+    log_event("profile_cache_written", path=path, version=snapshot.version)
+    return _with_static_sections(profile_data)
+
+
 def get_startup_profile(dataset_path: str = DATASET_PATH) -> dict[str, Any]:
-    """Load and cache profile at startup scope for a dataset path."""
-    dataframe = get_dataframe(copy=False, dataset_path=dataset_path)
-    return build_data_profile(dataframe)
+    """Return cached profile for the current dataset version of a path.
+
+    The profile is rebuilt together with the dataset when the file changes.
+    """
+    return _profile_for_snapshot(get_dataset_snapshot(dataset_path=dataset_path))
 
 
 def build_minimal_prompt_profile_json(profile: dict[str, Any] | None) -> str:
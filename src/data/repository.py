@@ -1,13 +1,44 @@
-"""Minimal parquet loader with cached dataframe access."""
+"""Versioned parquet loader with cached dataframe snapshots."""
 
 from __future__ import annotations
 
-from functools import lru_cache
+from collections import OrderedDict
+from collections.abc import Iterator
+import hashlib
+import os
+import threading
+from typing import Any, Callable, TypeVar
 
 import pandas as pd
 
 from config.constants import DATASET_PATH
+from config.settings import settings
+from src.data.arrow_io import (
+    arrow_snapshot_path,
+    read_arrow_snapshot,
+    write_arrow_snapshot,
+)
 from src.data.constants import EXPECTED_COLUMNS
+from src.data.partitions import (
+    is_partitioned_dataset,
+    iter_partition_frames,
+    list_dataset_files,
+    read_partitioned_dataframe,
+    time_scope_filter,
+    time_scope_period_range,
+)
+from src.data.periods import add_period_keys, period_slice, sort_by_period
+from src.data.transforms import encode_categorical_columns
+from src.utils.logging import log_event
+
+# Bytes hashed from the end of the file; parquet footers carry row-group offsets
+# and column statistics, so rewritten data changes this digest.
+_FINGERPRINT_TAIL_BYTES = 64 * 1024
+_SCAN_CACHE_SIZE = 8
+
+TArtifact = TypeVar("TArtifact")
+SnapshotKey = tuple[str, bool]
+FileIdentity = tuple[int, ...]
 
 
 def _validate_columns(dataframe: pd.DataFrame) -> None:
@@ -17,17 +48,376 @@ def _validate_columns(dataframe: pd.DataFrame) -> None:
         raise ValueError(f"Missing required columns: {missing}")
 
 
-@lru_cache(maxsize=4)
-def _load_dataframe(dataset_path: str = DATASET_PATH) -> pd.DataFrame:
-    """Load parquet once per dataset path and validate schema."""
-    dataframe = pd.read_parquet(dataset_path)
+def _dataset_files(dataset_path: str) -> list[str]:
+    """Return the data files backing a dataset path (single file or partitioned)."""
+    if is_partitioned_dataset(dataset_path):
+        return list_dataset_files(dataset_path)
+    return [dataset_path]
+
+
+def _file_identity(dataset_path: str) -> FileIdentity:
+    """Return cheap stat-based identity (file count, total size, latest mtime_ns)."""
+    stats = [os.stat(path) for path in _dataset_files(dataset_path)]
+    return (
+        len(stats),
+        sum(stat.st_size for stat in stats),
+        max((stat.st_mtime_ns for stat in stats), default=0),
+    )
+
+
+def dataset_fingerprint(dataset_path: str = DATASET_PATH) -> str:
+    """Return a content fingerprint of the dataset files from their footers."""
+    digest = hashlib.blake2b(digest_size=16)
+    for path in _dataset_files(dataset_path):
+        size = os.stat(path).st_size
+        digest.update(os.path.relpath(path, dataset_path).encode("utf-8"))
+        digest.update(str(size).encode("ascii"))
+        with open(path, "rb") as handle:
+            handle.seek(max(0, size - _FINGERPRINT_TAIL_BYTES))
+            digest.update(handle.read())
+    return digest.hexdigest()
+
+
+def _prepare_dataframe(dataframe: pd.DataFrame, categorical: bool) -> pd.DataFrame:
+    """Validate schema, add period keys, sort by period, and apply the storage mode."""
     _validate_columns(dataframe)
+    dataframe = sort_by_period(add_period_keys(dataframe))
+    if categorical:
+        dataframe = encode_categorical_columns(dataframe)
     return dataframe
 
 
+def _read_source_dataframe(dataset_path: str, categorical: bool) -> pd.DataFrame:
+    """Read the full dataset from parquet, validate schema, and apply the storage mode."""
+    if is_partitioned_dataset(dataset_path):
+        dataframe = read_partitioned_dataframe(dataset_path)
+    else:
+        dataframe = pd.read_parquet(dataset_path)
+    return _prepare_dataframe(dataframe, categorical)
+
+
+def _read_dataframe(dataset_path: str, categorical: bool, version: str) -> pd.DataFrame:
+    """Read the full prepared dataset for `version`.
+
+    With `DATASET_ARROW_SNAPSHOT`, the prepared frame is written once to an Arrow
+    IPC file and every process memory-maps that file instead of re-reading parquet.
+    """
+    if not settings.DATASET_ARROW_SNAPSHOT:
+        return _read_source_dataframe(dataset_path, categorical)
+    snapshot_path = arrow_snapshot_path(dataset_path, categorical)
+    dataframe = read_arrow_snapshot(snapshot_path, version)
+    if dataframe is not None:
+        log_event("arrow_snapshot_mapped", path=snapshot_path, version=version)
+        return dataframe
+    dataframe = _read_source_dataframe(dataset_path, categorical)
+    try:
+        write_arrow_snapshot(dataframe, snapshot_path, version)
+    except Exception as exc:
+        log_event("arrow_snapshot_write_failed", path=snapshot_path, error=str(exc))
+        return dataframe
+    log_event("arrow_snapshot_written", path=snapshot_path, version=version)
+    # Re-open through the map so this process shares pages with the others too.
+    mapped = read_arrow_snapshot(snapshot_path, version)
+    return dataframe if mapped is None else mapped
+
+
+class DatasetSnapshot:
+    """Immutable, versioned view of a dataset.
+
+    The full frame is read only when something asks for `dataframe`, so version
+    metadata (and artifacts persisted by version) is available without a read.
+    For partitioned datasets, time-scoped queries use `scan`, which reads just
+    the matching partitions, and full-history artifacts are built from
+    `iter_partitions` one partition at a time.
+    """
+
+    def __init__(
+        self,
+        dataset_path: str,
+        categorical: bool,
+        version: str,
+        dataframe: pd.DataFrame | None = None,
+    ) -> None:
+        self.dataset_path = dataset_path
+        self.categorical = categorical
+        self.version = version
+        self.partitioned = is_partitioned_dataset(dataset_path)
+        self._dataframe = dataframe
+        self._scans: OrderedDict[str, pd.DataFrame] = OrderedDict()
+        self._scan_artifacts: dict[tuple[str, str], Any] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def is_loaded(self) -> bool:
+        """Return True once the full frame is in memory."""
+        return self._dataframe is not None
+
+    @property
+    def dataframe(self) -> pd.DataFrame:
+        """Return the full dataset frame, loading it on first access."""
+        if self._dataframe is None:
+            with self._lock:
+                if self._dataframe is None:
+                    self._dataframe = _read_dataframe(
+                        self.dataset_path, self.categorical, self.version
+                    )
+        return self._dataframe
+
+    def iter_partitions(self) -> Iterator[pd.DataFrame]:
+        """Yield the full dataset as prepared partition frames, oldest first.
+
+        Single-file and already loaded datasets yield the full frame once.
+        """
+        if not self.partitioned or self._dataframe is not None:
+            yield self.dataframe
+            return
+        for dataframe in iter_partition_frames(self.dataset_path):
+            yield _prepare_dataframe(dataframe, self.categorical)
+
+    def scan(self, time_scope: dict[str, Any] | None = None) -> pd.DataFrame:
+        """Return rows for a query, pushing `time_scope` down to partitions.
+
+        Generated code still applies its own time filter, so returning the full
+        frame (single-file datasets, or scopes that cannot be pushed down) is safe.
+        """
+        return self._scan(time_scope)[1]
+
+    def scan_artifact(
+        self,
+        time_scope: dict[str, Any] | None,
+        name: str,
+        builder: Callable[[pd.DataFrame], TArtifact],
+    ) -> TArtifact | None:
+        """Return `builder(scan(time_scope))`, cached and evicted with that scan.
+
+        Returns None when the scope is not pushed down; the scan is then the
+        full frame and per-snapshot artifacts apply.
+        """
+        scan_key, dataframe = self._scan(time_scope)
+        if scan_key is None:
+            return None
+        artifact_key = (scan_key, name)
+        with self._lock:
+            if artifact_key in self._scan_artifacts:
+                return self._scan_artifacts[artifact_key]
+        artifact = builder(dataframe)
+        with self._lock:
+            if scan_key in self._scans:
+                self._scan_artifacts[artifact_key] = artifact
+        return artifact
+
+    def _scan(
+        self, time_scope: dict[str, Any] | None
+    ) -> tuple[str | None, pd.DataFrame]:
+        """Return `(scan key, rows)`; the key is None for full-frame scans."""
+        period_range = time_scope_period_range(time_scope) if self.partitioned else None
+        if period_range is None:
+            return None, self.dataframe
+        scan_key = "/".join(period_range)
+        with self._lock:
+            if scan_key in self._scans:
+                self._scans.move_to_end(scan_key)
+                return scan_key, self._scans[scan_key]
+        if self._dataframe is not None:
+            # Still scope the rows once everything is loaded, so plans and
+            # per-scan artifacts cost the scope rather than the full history.
+            dataframe = period_slice(self._dataframe, *period_range)
+        else:
+            expression = time_scope_filter(time_scope)
+            dataframe = _prepare_dataframe(
+                read_partitioned_dataframe(self.dataset_path, filter=expression),
+                self.categorical,
+            )
+            log_event(
+                "dataset_partition_scan",
+                dataset_path=self.dataset_path,
+                filter=str(expression),
+                row_count=len(dataframe),
+            )
+        with self._lock:
+            self._scans[scan_key] = dataframe
+            while len(self._scans) > _SCAN_CACHE_SIZE:
+                evicted, _ = self._scans.popitem(last=False)
+                for artifact_key in [
+                    key for key in self._scan_artifacts if key[0] == evicted
+                ]:
+                    del self._scan_artifacts[artifact_key]
+        return scan_key, dataframe
+
+
+_SNAPSHOTS: dict[SnapshotKey, DatasetSnapshot] = {}
+_IDENTITIES: dict[SnapshotKey, FileIdentity] = {}
+_RELOADING: set[SnapshotKey] = set()
+_LOCK = threading.Lock()
+_LOAD_LOCKS: dict[SnapshotKey, threading.Lock] = {}
+_ARTIFACT_CACHES: list["_SnapshotArtifactCache"] = []
+
+
+def _load_snapshot(
+    key: SnapshotKey, *, eager: bool = False
+) -> tuple[DatasetSnapshot, FileIdentity]:
+    """Open a fresh snapshot and the file identity observed before reading it.
+
+    With `eager`, single-file datasets are read immediately instead of on first use.
+    """
+    dataset_path, categorical = key
+    identity = _file_identity(dataset_path)
+    version = dataset_fingerprint(dataset_path)
+    if not eager or is_partitioned_dataset(dataset_path):
+        return DatasetSnapshot(dataset_path, categorical, version), identity
+    dataframe = _read_dataframe(dataset_path, categorical, version)
+    return DatasetSnapshot(dataset_path, categorical, version, dataframe), identity
+
+
+def _reload_snapshot(key: SnapshotKey, identity: FileIdentity) -> None:
+    """Reload a changed dataset, rebuild warm artifacts, then swap atomically."""
+    try:
+        current = _SNAPSHOTS[key]
+        if dataset_fingerprint(key[0]) == current.version:
+            with _LOCK:
+                _IDENTITIES[key] = identity
+            return
+        # Keep a loaded dataset loaded so queries never pay the read after a swap.
+        snapshot, loaded_identity = _load_snapshot(key, eager=current.is_loaded)
+        for cache in list(_ARTIFACT_CACHES):
+            cache.rebuild_if_warm(previous=current, snapshot=snapshot)
+        with _LOCK:
+            _SNAPSHOTS[key] = snapshot
+            _IDENTITIES[key] = loaded_identity
+        log_event(
+            "dataset_reloaded",
+            dataset_path=key[0],
+            previous_version=current.version,
+            version=snapshot.version,
+        )
+    except Exception as exc:
+        # Keep serving the previous snapshot; retry only after the file changes again.
+        with _LOCK:
+            _IDENTITIES[key] = identity
+        log_event("dataset_reload_failed", dataset_path=key[0], error=str(exc))
+    finally:
+        with _LOCK:
+            _RELOADING.discard(key)
+
+
+def get_dataset_snapshot(
+    *, dataset_path: str = DATASET_PATH, categorical: bool | None = None
+) -> DatasetSnapshot:
+    """Return the current dataset snapshot, scheduling a reload if the file changed.
+
+    The first call opens the snapshot synchronously. Later calls compare the file's size/mtime
+    with the loaded one and, on change, reload in a background thread while the
+    previous snapshot keeps being served. Callers holding a snapshot keep a
+    consistent view for the whole query.
+    """
+    if categorical is None:
+        categorical = settings.DATASET_CATEGORICAL
+    key: SnapshotKey = (dataset_path, categorical)
+
+    snapshot = _SNAPSHOTS.get(key)
+    if snapshot is None:
+        with _LOCK:
+            load_lock = _LOAD_LOCKS.setdefault(key, threading.Lock())
+        with load_lock:
+            snapshot = _SNAPSHOTS.get(key)
+            if snapshot is None:
+                snapshot, identity = _load_snapshot(key)
+                with _LOCK:
+                    _SNAPSHOTS[key] = snapshot
+                    _IDENTITIES[key] = identity
+        return snapshot
+
+    try:
+        identity = _file_identity(dataset_path)
+    except OSError as exc:
+        log_event("dataset_stat_failed", dataset_path=dataset_path, error=str(exc))
+        return snapshot
+
+    with _LOCK:
+        if identity == _IDENTITIES.get(key) or key in _RELOADING:
+            return snapshot
+        _RELOADING.add(key)
+    threading.Thread(
+        target=_reload_snapshot,
+        args=(key, identity),
+        name="dataset-reload",
+        daemon=True,
+    ).start()
+    return snapshot
+
+
 def get_dataframe(
-    *, copy: bool = True, dataset_path: str = DATASET_PATH
+    *,
+    copy: bool = True,
+    dataset_path: str = DATASET_PATH,
+    categorical: bool | None = None,
 ) -> pd.DataFrame:
-    """Return cached dataframe, optionally as a copy."""
-    dataframe = _load_dataframe(dataset_path=dataset_path)
+    """Return cached dataframe, optionally as a copy.
+
+    `categorical` defaults to `settings.DATASET_CATEGORICAL`; when enabled, dimension
+    columns are dictionary-encoded and copies keep that encoding.
+    """
+    dataframe = get_dataset_snapshot(
+        dataset_path=dataset_path, categorical=categorical
+    ).dataframe
     return dataframe.copy() if copy else dataframe
+
+
+class _SnapshotArtifactCache:
+    """Bounded memo of an artifact derived from a dataset snapshot."""
+
+    def __init__(
+        self, builder: Callable[[DatasetSnapshot], TArtifact], maxsize: int
+    ) -> None:
+        self._builder = builder
+        self._maxsize = maxsize
+        self._values: OrderedDict[tuple[str, bool, str], TArtifact] = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(snapshot: DatasetSnapshot) -> tuple[str, bool, str]:
+        return snapshot.dataset_path, snapshot.categorical, snapshot.version
+
+    def get(self, snapshot: DatasetSnapshot) -> TArtifact:
+        key = self._key(snapshot)
+        with self._lock:
+            if key in self._values:
+                self._values.move_to_end(key)
+                return self._values[key]
+        value = self._builder(snapshot)
+        with self._lock:
+            self._values[key] = value
+            self._values.move_to_end(key)
+            while len(self._values) > self._maxsize:
+                self._values.popitem(last=False)
+        return value
+
+    def rebuild_if_warm(
+        self, *, previous: DatasetSnapshot, snapshot: DatasetSnapshot
+    ) -> None:
+        """Build the artifact for a new snapshot if one existed for the previous one."""
+        with self._lock:
+            warm = self._key(previous) in self._values
+        if warm:
+            self.get(snapshot)
+
+
+def cached_per_snapshot(
+    maxsize: int = 4,
+) -> Callable[
+    [Callable[[DatasetSnapshot], TArtifact]], Callable[[DatasetSnapshot], TArtifact]
+]:
+    """Memoize a snapshot-derived artifact by dataset version.
+
+    Artifacts that were built for the previous version are rebuilt during a
+    background reload, before the new snapshot becomes visible.
+    """
+
+    def decorator(
+        builder: Callable[[DatasetSnapshot], TArtifact],
+    ) -> Callable[[DatasetSnapshot], TArtifact]:
+        cache = _SnapshotArtifactCache(builder, maxsize)
+        _ARTIFACT_CACHES.append(cache)
+        return cache.get
+
+    return decorator
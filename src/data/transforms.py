@@ -0,0 +1,36 @@
+"""Load-time dataframe transforms applied by the dataset repository."""
+
+from __future__ import annotations
+
+import pandas as pd
+
+from src.data.constants import CATEGORICAL_COLUMNS, PERIOD_KEY_COLUMNS
+
+
+def _stable_categorical_dtype(
+    series: pd.Series, ordered: bool
+) -> pd.CategoricalDtype:
+    """Build a categorical dtype whose dictionary is the sorted set of non-null values."""
+    categories = sorted(series.dropna().unique().tolist())
+    return pd.CategoricalDtype(categories=categories, ordered=ordered)
+
+
+def encode_categorical_columns(dataframe: pd.DataFrame) -> pd.DataFrame:
+    """Store dimension columns as categoricals with stable (sorted) category dictionaries.
+
+    Sorted dictionaries keep category codes identical across loads of the same data.
+    Period columns are ordered: their tokens sort lexically in period order, so
+    generated `<`/`>=` comparisons against period tokens of the dataset work
+    (comparing with a token that is not a category raises `TypeError`).
+    """
+    for column in CATEGORICAL_COLUMNS:
+        if column not in dataframe.columns:
+            continue
+        ordered = column in PERIOD_KEY_COLUMNS
+        dtype = dataframe[column].dtype
+        if isinstance(dtype, pd.CategoricalDtype) and dtype.ordered == ordered:
+            continue
+        dataframe[column] = dataframe[column].astype(
+            _stable_categorical_dtype(dataframe[column], ordered)
+        )
+    return dataframe
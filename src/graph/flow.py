@@ -7,6 +7,9 @@ from typing import Literal
 from langgraph.graph import END, START, StateGraph
 
 from src.graph.nodes import (
+    aexecutor_response_agent,
+    aguard_router_agent,
+    aquery_agent,
     clarification_node,
     entity_extractor_agent,
     executor_response_agent,
@@ -55,14 +58,23 @@ def _route_after_query_agent(state: GraphStateDict) -> QueryRoute:
     return decision
 
 
-def build_graph():
-    """Build and compile the LangGraph workflow."""
+def build_graph(*, async_nodes: bool = False):
+    """Build and compile the LangGraph workflow.
+
+    With `async_nodes`, the LLM-calling nodes await the async client and the
+    compiled graph must be run with `ainvoke`.
+    """
     graph = StateGraph(GraphStateDict)
 
-    graph.add_node("guard_router_agent", guard_router_agent)
+    graph.add_node(
+        "guard_router_agent", aguard_router_agent if async_nodes else guard_router_agent
+    )
     graph.add_node("entity_extractor_agent", entity_extractor_agent)
-    graph.add_node("query_agent", query_agent)
-    graph.add_node("executor_response_agent", executor_response_agent)
+    graph.add_node("query_agent", aquery_agent if async_nodes else query_agent)
+    graph.add_node(
+        "executor_response_agent",
+        aexecutor_response_agent if async_nodes else executor_response_agent,
+    )
     graph.add_node("clarification_node", clarification_node)
     graph.add_node("finalize_node", finalize_node)
 
@@ -2,16 +2,30 @@
 
 from __future__ import annotations
 
+import asyncio
 import time
-from typing import Any
+from typing import Any, AsyncIterator, Iterable
 
+import pandas as pd
+
+from config.settings import settings
 from config.constants import (
     INTENT_DATASET_KNOWLEDGE,
     INTENT_DEFINITIONS,
     MSG_MULTIPLE_QUESTION,
     MSG_NOT_PRESENT,
 )
-from src.data.repository import get_dataframe
+from src.contracts.code_validation import GeneratedCodeValidationError
+from src.contracts.models import IntentDecision
+from src.contracts.policies import ReadOnlyDataFrameError
+from src.data.cube import (
+    PNL_CUBE_TASK_TYPE,
+    build_pnl_cube_query,
+    get_pnl_cube,
+    lookup_pnl_cube,
+)
+from src.data.indexes import RowIndex, get_scan_row_index
+from src.data.repository import DatasetSnapshot, get_dataset_snapshot
 from src.graph.guards import (
     detect_multiple_questions,
     route_query,
@@ -26,23 +40,76 @@ from src.graph.resolvers import (
     _time_range_not_present_answer,
 )
 from src.services.codegen_service import (
+    agenerate_query_code_with_llm,
     execute_generated_python_code,
     generate_query_code_with_llm,
 )
+from src.services.duckdb_engine import execute_query_plan_duckdb
+from src.services.execution_control import (
+    ExecutionCancelledError,
+    ExecutionGuard,
+    ExecutionTimeoutError,
+)
 from src.services.intent_service import (
+    aclassify_intent_and_extract_with_llm,
     classify_intent_and_extract_with_llm,
 )
+from src.services.plan_engine import QueryPlanError, execute_query_plan
+from src.services.question_cache import get_question_cache
 from src.services.response_service import (
+    aanswer_from_profile_with_llm,
+    aanswer_from_result_with_llm,
     answer_from_profile_with_llm,
     answer_from_result_with_llm,
+    astream_answer_from_profile_with_llm,
+    astream_answer_from_result_with_llm,
     fallback_for_error_type,
+    result_records,
+    serialize_result_frame,
+    stream_answer_from_profile_with_llm,
+    stream_answer_from_result_with_llm,
+)
+from src.services.result_cache import (
+    get_cached_execution,
+    query_plan_source,
+    result_cache_stats,
+    store_execution,
 )
+from src.services.sandbox import SandboxUnavailableError, get_sandbox_pool
 from src.utils.logging import log_event
+from src.utils.token_stream import TokenStream
 
 
-def guard_router_agent(state: dict[str, Any]) -> dict[str, Any]:
-    """Run guard checks and combined intent+entity extraction routing."""
-    state = _ensure_state(state)
+def _answer_stream(state: dict[str, Any]) -> TokenStream | None:
+    """Return the UI's answer stream when answers should be streamed."""
+    stream = state.get("answer_stream")
+    if settings.LLM_STREAM_ANSWERS and isinstance(stream, TokenStream):
+        return stream
+    return None
+
+
+def _relay_answer(stream: TokenStream, pieces: Iterable[str]) -> str:
+    """Forward answer pieces to the UI as they arrive; return the whole answer."""
+    parts: list[str] = []
+    for piece in pieces:
+        stream.put(piece)
+        parts.append(piece)
+    log_event("answer_streamed", pieces=len(parts))
+    return "".join(parts)
+
+
+async def _arelay_answer(stream: TokenStream, pieces: AsyncIterator[str]) -> str:
+    """Awaitable `_relay_answer`."""
+    parts: list[str] = []
+    async for piece in pieces:
+        stream.put(piece)
+        parts.append(piece)
+    log_event("answer_streamed", pieces=len(parts))
+    return "".join(parts)
+
+
+def _guard_precheck(state: dict[str, Any]) -> dict[str, Any] | None:
+    """Record the user turn and run rule checks; None when the turn is finalized."""
     user_query = str(state.get("user_query", "")).strip()
     if user_query:
         messages = state.setdefault("messages", [])
@@ -59,86 +126,134 @@ def guard_router_agent(state: dict[str, Any]) -> dict[str, Any]:
         state["error_type"] = "not_present"
         state["routing_action"] = "finalize"
         log_event("multiple_questions_blocked", user_query=user_query)
-        return state
+        return None
+    return route_query(user_query)
+
+
+def _intent_request(state: dict[str, Any]) -> dict[str, Any]:
+    return {
+        "profile": state.get("data_profile", {}),
+        "conversation_messages": state.get("messages"),
+        "client": state.get("llm_client"),
+    }
+
+
+def _apply_intent_extraction(
+    state: dict[str, Any],
+    llm_decision: Any,
+    llm_entities: dict[str, Any],
+    started: float,
+    *,
+    source: str = "llm_combined",
+) -> dict[str, Any]:
+    """Turn the combined intent+extraction output into a routing decision."""
+    duration_ms = int((time.perf_counter() - started) * 1000)
+    log_event("intent_stage_timing", duration_ms=duration_ms, source=source)
+    decision = {
+        "intent": llm_decision.intent,
+        "action": llm_decision.action,
+        "fallback_message": llm_decision.fallback_message,
+        "clarification_prompt": llm_decision.clarification_prompt,
+        "reason": llm_decision.reason,
+    }
+    if (
+        decision["action"] == "continue"
+        and isinstance(llm_entities, dict)
+        and llm_entities
+    ):
+        if decision[
+            "intent"
+        ] == INTENT_DEFINITIONS and not _definitions_intent_is_eligible(llm_entities):
+            decision["intent"] = INTENT_DATASET_KNOWLEDGE
+            log_event("definitions_downgraded_to_dataset_knowledge", status="ok")
+        state["entities"] = llm_entities
+        state["entities_preextracted"] = True
+        log_event("guard_preextracted_entities", status="ok")
+    elif (
+        decision["action"] == "clarify"
+        and decision["intent"] == INTENT_DATASET_KNOWLEDGE
+        and isinstance(llm_entities, dict)
+        and llm_entities
+    ):
+        # Reorder checks: validate explicit entities first (not_present)
+        # before asking clarification (e.g., metric clarification).
+        explicit_columns = (
+            "property_name",
+            "tenant_name",
+            "entity_name",
+            "ledger_code",
+        )
+        has_explicit_entity = any(
+            isinstance(llm_entities.get(column), list)
+            and len(llm_entities.get(column, [])) > 0
+            for column in explicit_columns
+        )
+        if has_explicit_entity:
+            state["entities"] = llm_entities
+            state["entities_preextracted"] = True
+            decision["action"] = "continue"
+            log_event("guard_clarify_deferred_for_entity_validation", status="ok")
+    log_event(
+        "intent_llm_override",
+        intent=decision["intent"],
+        action=decision["action"],
+    )
+    return decision
+
+
+def _cached_intent_extraction(
+    state: dict[str, Any],
+) -> tuple[IntentDecision, dict[str, Any]] | None:
+    """Return the intent+extraction output of a near-duplicate past question."""
+    cache = get_question_cache()
+    if cache is None:
+        return None
+    match = cache.lookup(
+        str(state.get("user_query", "")).strip(), state.get("data_profile", {})
+    )
+    if match is None:
+        return None
+    key, entry, similarity = match
+    state["question_cache_key"] = key
+    log_event(
+        "question_cache_hit",
+        similarity=similarity,
+        matched_question=entry["question"],
+        plan_cached=entry["generated"] is not None,
+    )
+    return IntentDecision(**entry["decision"]), entry["entities"]
+
+
+def _remember_intent_extraction(
+    state: dict[str, Any], llm_decision: IntentDecision, llm_entities: dict[str, Any]
+) -> None:
+    """Index the question so that rephrasings can reuse this extraction."""
+    cache = get_question_cache()
+    if cache is None or llm_decision.action != "continue":
+        return
+    state["question_cache_key"] = cache.add(
+        str(state.get("user_query", "")).strip(),
+        state.get("data_profile", {}),
+        llm_decision.model_dump(),
+        llm_entities,
+    )
 
-    decision = route_query(user_query)
-    if decision.get("action") == "continue":
-        try:
-            t0 = time.perf_counter()
-            llm_decision, llm_entities = classify_intent_and_extract_with_llm(
-                user_query,
-                profile=state.get("data_profile", {}),
-                conversation_messages=state.get("messages"),
-                client=state.get("llm_client"),
-            )
-            duration_ms = int((time.perf_counter() - t0) * 1000)
-            log_event(
-                "intent_stage_timing", duration_ms=duration_ms, source="llm_combined"
-            )
-            decision = {
-                "intent": llm_decision.intent,
-                "action": llm_decision.action,
-                "fallback_message": llm_decision.fallback_message,
-                "clarification_prompt": llm_decision.clarification_prompt,
-                "reason": llm_decision.reason,
-            }
-            if (
-                decision["action"] == "continue"
-                and isinstance(llm_entities, dict)
-                and llm_entities
-            ):
-                if decision[
-                    "intent"
-                ] == INTENT_DEFINITIONS and not _definitions_intent_is_eligible(
-                    llm_entities
-                ):
-                    decision["intent"] = INTENT_DATASET_KNOWLEDGE
-                    log_event(
-                        "definitions_downgraded_to_dataset_knowledge", status="ok"
-                    )
-                state["entities"] = llm_entities
-                state["entities_preextracted"] = True
-                log_event("guard_preextracted_entities", status="ok")
-            elif (
-                decision["action"] == "clarify"
-                and decision["intent"] == INTENT_DATASET_KNOWLEDGE
-                and isinstance(llm_entities, dict)
-                and llm_entities
-            ):
-                # Reorder checks: validate explicit entities first (not_present)
-                # before asking clarification (e.g., metric clarification).
-                explicit_columns = (
-                    "property_name",
-                    "tenant_name",
-                    "entity_name",
-                    "ledger_code",
-                )
-                has_explicit_entity = any(
-                    isinstance(llm_entities.get(column), list)
-                    and len(llm_entities.get(column, [])) > 0
-                    for column in explicit_columns
-                )
-                if has_explicit_entity:
-                    state["entities"] = llm_entities
-                    state["entities_preextracted"] = True
-                    decision["action"] = "continue"
-                    log_event(
-                        "guard_clarify_deferred_for_entity_validation", status="ok"
-                    )
-            log_event(
-                "intent_llm_override",
-                intent=decision["intent"],
-                action=decision["action"],
-            )
-        except Exception as exc:
-            log_event("intent_extractor_llm_failed", error=str(exc))
-            decision = {
-                "intent": "ambiguous",
-                "action": "clarify",
-                "fallback_message": "",
-                "clarification_prompt": "Please rephrase your request with the target and time scope.",
-                "reason": "combined intent+extraction failed",
-            }
+
+def _intent_extraction_failed(exc: Exception) -> dict[str, Any]:
+    log_event("intent_extractor_llm_failed", error=str(exc))
+    return {
+        "intent": "ambiguous",
+        "action": "clarify",
+        "fallback_message": "",
+        "clarification_prompt": "Please rephrase your request with the target and time scope.",
+        "reason": "combined intent+extraction failed",
+    }
+
+
+def _apply_routing_decision(
+    state: dict[str, Any], decision: dict[str, Any]
+) -> dict[str, Any]:
+    """Set intent, routing action and fallback/clarification fields."""
     log_event(
         "intent_detected",
         intent=decision.get("intent"),
@@ -177,6 +292,63 @@ def guard_router_agent(state: dict[str, Any]) -> dict[str, Any]:
     return state
 
 
+def guard_router_agent(state: dict[str, Any]) -> dict[str, Any]:
+    """Run guard checks and combined intent+entity extraction routing."""
+    state = _ensure_state(state)
+    decision = _guard_precheck(state)
+    if decision is None:
+        return state
+    if decision.get("action") == "continue":
+        t0 = time.perf_counter()
+        cached = _cached_intent_extraction(state)
+        if cached is not None:
+            decision = _apply_intent_extraction(
+                state, *cached, t0, source="question_cache"
+            )
+        else:
+            try:
+                llm_decision, llm_entities = classify_intent_and_extract_with_llm(
+                    str(state.get("user_query", "")).strip(), **_intent_request(state)
+                )
+                _remember_intent_extraction(state, llm_decision, llm_entities)
+                decision = _apply_intent_extraction(
+                    state, llm_decision, llm_entities, t0
+                )
+            except Exception as exc:
+                decision = _intent_extraction_failed(exc)
+    return _apply_routing_decision(state, decision)
+
+
+async def aguard_router_agent(state: dict[str, Any]) -> dict[str, Any]:
+    """Awaitable `guard_router_agent` using the async LLM client."""
+    state = _ensure_state(state)
+    decision = _guard_precheck(state)
+    if decision is None:
+        return state
+    if decision.get("action") == "continue":
+        t0 = time.perf_counter()
+        cached = _cached_intent_extraction(state)
+        if cached is not None:
+            decision = _apply_intent_extraction(
+                state, *cached, t0, source="question_cache"
+            )
+        else:
+            try:
+                (
+                    llm_decision,
+                    llm_entities,
+                ) = await aclassify_intent_and_extract_with_llm(
+                    str(state.get("user_query", "")).strip(), **_intent_request(state)
+                )
+                _remember_intent_extraction(state, llm_decision, llm_entities)
+                decision = _apply_intent_extraction(
+                    state, llm_decision, llm_entities, t0
+                )
+            except Exception as exc:
+                decision = _intent_extraction_failed(exc)
+    return _apply_routing_decision(state, decision)
+
+
 def entity_extractor_agent(state: dict[str, Any]) -> dict[str, Any]:
     """Consume preextracted entities from guard stage and run validation."""
     state = _ensure_state(state)
@@ -233,6 +405,125 @@ def entity_extractor_agent(state: dict[str, Any]) -> dict[str, Any]:
     return state
 
 
+def _definitions_request(state: dict[str, Any]) -> dict[str, Any]:
+    return {
+        "user_query": str(state.get("user_query", "")),
+        "profile": state.get("data_profile", {}),
+        "conversation_messages": state.get("messages"),
+        "client": state.get("llm_client"),
+    }
+
+
+def _definitions_answer_failed(state: dict[str, Any], exc: Exception) -> None:
+    log_event("definitions_answer_llm_failed", error=str(exc))
+    state["needs_clarification"] = True
+    state["clarification_question"] = (
+        "Please clarify what information you want me to extract."
+    )
+
+
+def _select_pnl_cube(state: dict[str, Any]) -> bool:
+    """Route supported P&L metric requests to the cube; True when selected."""
+    entities = state.get("entities", {})
+    cube_query = build_pnl_cube_query(entities) if settings.PNL_CUBE_ENABLED else None
+    if cube_query is None:
+        return False
+    state["task_type"] = PNL_CUBE_TASK_TYPE
+    state["python_code"] = None
+    state["query_plan"] = None
+    state["cube_query"] = cube_query
+    log_event("pnl_cube_selected", cube_query=cube_query)
+    return True
+
+
+def _codegen_request(state: dict[str, Any]) -> dict[str, Any]:
+    return {
+        "user_query": str(state.get("user_query", "")),
+        "extracted_entities": state.get("entities", {}),
+        "profile": state.get("data_profile", {}),
+        "conversation_messages": state.get("messages"),
+        "client": state.get("llm_client"),
+    }
+
+
+def _cached_generated_code(state: dict[str, Any]) -> dict[str, Any] | None:
+    """Return the plan of the matched past question when its entities are unchanged."""
+    key = state.get("question_cache_key")
+    cache = get_question_cache()
+    if not key or cache is None:
+        return None
+    generated = cache.generated_for(key, state.get("entities", {}))
+    if generated is not None:
+        log_event("question_cache_plan_reused", task_type=generated.get("task_type"))
+    return generated
+
+
+def _remember_generated_code(state: dict[str, Any]) -> None:
+    """Record the executed plan for rephrasings of this question."""
+    key = state.get("question_cache_key")
+    cache = get_question_cache()
+    if not key or cache is None or state.get("cube_query"):
+        return
+    cache.attach_generated(
+        key,
+        state.get("entities", {}),
+        {
+            "task_type": state.get("task_type"),
+            "query_plan": state.get("query_plan"),
+            "python_code": state.get("python_code"),
+        },
+    )
+
+
+def _apply_generated_code(state: dict[str, Any], generated: dict[str, Any]) -> bool:
+    """Store the generated plan/code; False when clarification is needed instead."""
+    if generated.get("needs_clarification"):
+        state["needs_clarification"] = True
+        state["clarification_question"] = generated.get(
+            "clarification_prompt", "Please clarify the query."
+        )
+        return False
+
+    query_plan = generated.get("query_plan")
+    python_code = str(generated.get("python_code", "") or "").strip()
+    if not python_code and not query_plan:
+        state["needs_clarification"] = True
+        state["clarification_question"] = (
+            "Please clarify what information you want me to extract."
+        )
+        return False
+
+    task_type = str(generated.get("task_type", "asset_details"))
+    state["task_type"] = task_type
+    state["query_plan"] = query_plan
+    state["python_code"] = python_code
+    log_event(
+        "codegen_llm_used",
+        task_type=task_type,
+        query_plan=query_plan,
+        python_code=python_code,
+    )
+    return True
+
+
+def _codegen_failed(state: dict[str, Any], exc: Exception) -> None:
+    log_event("codegen_llm_failed", error=str(exc))
+    state["needs_clarification"] = True
+    state["clarification_question"] = (
+        "Please clarify what information you want me to extract."
+    )
+
+
+def _log_query_agent_output(state: dict[str, Any]) -> None:
+    log_event(
+        "query_agent_output",
+        task_type=state.get("task_type"),
+        query_plan_present=bool(state.get("query_plan")),
+        python_code_present=bool(str(state.get("python_code", "")).strip()),
+        python_code=str(state.get("python_code", "") or ""),
+    )
+
+
 def query_agent(state: dict[str, Any]) -> dict[str, Any]:
     """Generate executable query code contract from extracted entities."""
     state = _ensure_state(state)
@@ -241,90 +532,258 @@ def query_agent(state: dict[str, Any]) -> dict[str, Any]:
     if state.get("needs_clarification"):
         return state
 
-    entities = state.get("entities", {})
-    data_profile = state.get("data_profile", {})
-
     if str(state.get("intent", "")) == INTENT_DEFINITIONS:
         try:
-            state["final_answer"] = answer_from_profile_with_llm(
-                user_query=str(state.get("user_query", "")),
-                profile=data_profile,
-                conversation_messages=state.get("messages"),
-                client=state.get("llm_client"),
-            )
+            stream = _answer_stream(state)
+            if stream is None:
+                state["final_answer"] = answer_from_profile_with_llm(
+                    **_definitions_request(state)
+                )
+            else:
+                state["final_answer"] = _relay_answer(
+                    stream,
+                    stream_answer_from_profile_with_llm(**_definitions_request(state)),
+                )
             log_event("definitions_answer_llm_used", status="ok")
         except Exception as exc:
-            log_event("definitions_answer_llm_failed", error=str(exc))
-            state["needs_clarification"] = True
-            state["clarification_question"] = (
-                "Please clarify what information you want me to extract."
-            )
+            _definitions_answer_failed(state, exc)
+        return state
+
+    if _select_pnl_cube(state):
         return state
 
     try:
-        generated = generate_query_code_with_llm(
-            str(state.get("user_query", "")),
-            entities,
-            profile=data_profile,
-            conversation_messages=state.get("messages"),
-            client=state.get("llm_client"),
-        )
-        if generated.get("needs_clarification"):
-            state["needs_clarification"] = True
-            state["clarification_question"] = generated.get(
-                "clarification_prompt", "Please clarify the query."
-            )
+        generated = _cached_generated_code(state)
+        if generated is None:
+            generated = generate_query_code_with_llm(**_codegen_request(state))
+        if not _apply_generated_code(state, generated):
             return state
+    except Exception as exc:
+        _codegen_failed(state, exc)
+        return state
+
+    _log_query_agent_output(state)
+    return state
+
+
+async def aquery_agent(state: dict[str, Any]) -> dict[str, Any]:
+    """Awaitable `query_agent` using the async LLM client."""
+    state = _ensure_state(state)
+    if state.get("final_answer"):
+        return state
+    if state.get("needs_clarification"):
+        return state
+
+    if str(state.get("intent", "")) == INTENT_DEFINITIONS:
+        try:
+            stream = _answer_stream(state)
+            if stream is None:
+                state["final_answer"] = await aanswer_from_profile_with_llm(
+                    **_definitions_request(state)
+                )
+            else:
+                state["final_answer"] = await _arelay_answer(
+                    stream,
+                    astream_answer_from_profile_with_llm(**_definitions_request(state)),
+                )
+            log_event("definitions_answer_llm_used", status="ok")
+        except Exception as exc:
+            _definitions_answer_failed(state, exc)
+        return state
+
+    if _select_pnl_cube(state):
+        return state
 
-        python_code = str(generated.get("python_code", "") or "").strip()
-        if not python_code:
-            state["needs_clarification"] = True
-            state["clarification_question"] = (
-                "Please clarify what information you want me to extract."
+    try:
+        generated = _cached_generated_code(state)
+        if generated is None:
+            generated = await agenerate_query_code_with_llm(
+                **_codegen_request(state)
             )
+        if not _apply_generated_code(state, generated):
             return state
-
-        task_type = str(generated.get("task_type", "asset_details"))
-        state["task_type"] = task_type
-        state["python_code"] = python_code
-        log_event("codegen_llm_used", task_type=task_type, python_code=python_code)
     except Exception as exc:
-        log_event("codegen_llm_failed", error=str(exc))
-        state["needs_clarification"] = True
-        state["clarification_question"] = (
-            "Please clarify what information you want me to extract."
-        )
+        _codegen_failed(state, exc)
         return state
 
+    _log_query_agent_output(state)
+    return state
+
+
+def _row_index_for_scan(
+    snapshot: DatasetSnapshot, time_scope: dict[str, Any] | None, frame: pd.DataFrame
+) -> RowIndex | None:
+    """Return a row index for `frame = snapshot.scan(time_scope)`, if enabled."""
+    if not settings.ROW_INDEX_ENABLED:
+        return None
+    return get_scan_row_index(snapshot, time_scope, frame)
+
+
+def _execute_query_plan_on_snapshot(
+    snapshot: DatasetSnapshot, query_plan: dict[str, Any], state: dict[str, Any]
+) -> dict[str, Any]:
+    """Run a structured plan; `QueryPlanError` if it does not fit the dataset."""
+    time_scope = state.get("entities", {}).get("time_scope")
+    source = query_plan_source(query_plan)
+    execution = get_cached_execution(snapshot, source, time_scope=time_scope)
+    if execution is not None:
+        log_event(
+            "result_cache_hit", task_type=state.get("task_type"), **result_cache_stats()
+        )
+        return execution
+    if settings.EXECUTION_BACKEND == "duckdb":
+        # Scans the parquet files; the snapshot frame is never loaded.
+        execution = execute_query_plan_duckdb(
+            snapshot,
+            query_plan,
+            timeout_sec=settings.EXECUTION_TIMEOUT_SEC,
+            cancel_token=state.get("cancel_token"),
+        )
+    else:
+        frame = snapshot.scan(time_scope)
+        cube = get_pnl_cube(snapshot) if settings.PNL_CUBE_ENABLED else None
+        row_index = _row_index_for_scan(snapshot, time_scope, frame)
+        with ExecutionGuard(
+            timeout_sec=settings.EXECUTION_TIMEOUT_SEC,
+            cancel_token=state.get("cancel_token"),
+            description="Query plan",
+        ):
+            execution = execute_query_plan(
+                frame, query_plan, row_index=row_index, cube=cube
+            )
     log_event(
-        "query_agent_output",
+        "query_plan_executed",
         task_type=state.get("task_type"),
-        python_code_present=bool(str(state.get("python_code", "")).strip()),
-        python_code=str(state.get("python_code", "") or ""),
+        path=execution["plan_path"],
+        filter_order=execution["filter_order"],
+        filtered_row_count=execution["filtered_row_count"],
     )
-    return state
+    store_execution(snapshot, source, execution, time_scope=time_scope)
+    return execution
 
 
-def executor_response_agent(state: dict[str, Any]) -> dict[str, Any]:
-    """Execute generated pandas code, serialize result_df, and produce final answer."""
-    state = _ensure_state(state)
+def _python_code_for_rejected_plan(
+    state: dict[str, Any], query_plan: dict[str, Any], exc: QueryPlanError
+) -> str:
+    """Ask codegen for python_code in place of a plan the engine rejected."""
+    try:
+        generated = generate_query_code_with_llm(
+            **_codegen_request(state),
+            rejected_plan={"query_plan": query_plan, "error": str(exc)},
+        )
+    except Exception as llm_exc:
+        log_event("codegen_plan_fallback_failed", error=str(llm_exc))
+        return ""
+    python_code = str(generated.get("python_code", "") or "").strip()
+    log_event(
+        "codegen_plan_fallback",
+        task_type=state.get("task_type"),
+        python_code=python_code,
+    )
+    if python_code:
+        # Rephrasings of this question reuse the code, not the rejected plan.
+        state["query_plan"] = None
+        state["python_code"] = python_code
+    return python_code
+
+
+def _execute_plan_on_snapshot(
+    snapshot: DatasetSnapshot, python_code: str, state: dict[str, Any]
+) -> dict[str, Any]:
+    """Run a generated plan against the rows of `snapshot` the query needs."""
+    time_scope = state.get("entities", {}).get("time_scope")
+    read_only = settings.EXECUTION_DATAFRAME_MODE == "readonly"
+    if settings.EXECUTION_SANDBOX:
+        # Never falls back to running the plan unisolated in this process.
+        return get_sandbox_pool().execute(
+            snapshot,
+            python_code,
+            time_scope=time_scope,
+            read_only=read_only,
+            row_index=settings.ROW_INDEX_ENABLED,
+            timeout_sec=settings.EXECUTION_TIMEOUT_SEC,
+            cancel_token=state.get("cancel_token"),
+            profile=settings.EXECUTION_PROFILING,
+        )
+    frame = snapshot.scan(time_scope)
+    row_index = _row_index_for_scan(snapshot, time_scope, frame)
+    # Isolation (private copy or read-only view) is applied by the exec policy.
+    return execute_generated_python_code(
+        frame,
+        python_code,
+        read_only=read_only,
+        row_index=row_index,
+        timeout_sec=settings.EXECUTION_TIMEOUT_SEC,
+        cancel_token=state.get("cancel_token"),
+        profile=settings.EXECUTION_PROFILING,
+    )
+
+
+def _execute_for_answer(state: dict[str, Any]) -> bool:
+    """Execute the cube lookup, plan or code and serialize result_df.
+
+    Returns True when `computed_result` is ready for the answer stage; otherwise
+    the final answer (not-present, timeout, ...) has already been set.
+    """
     if state.get("needs_clarification"):
-        return state
+        return False
     if state.get("final_answer"):
-        return state
+        return False
 
     python_code = str(state.get("python_code", "") or "").strip()
-    if not python_code:
+    cube_query = state.get("cube_query")
+    query_plan = state.get("query_plan")
+    if not python_code and not cube_query and not query_plan:
         state["error_type"] = "not_present"
         state["final_answer"] = fallback_for_error_type("not_present")
-        return state
+        return False
 
     task_type = state.get("task_type")
     data_profile = state.get("data_profile", {})
 
     try:
-        full_df = get_dataframe(copy=True)
-        execution = execute_generated_python_code(full_df, python_code)
+        # One snapshot per query: a concurrent dataset reload does not affect it.
+        snapshot = get_dataset_snapshot()
+        execution = None
+        if cube_query:
+            execution = lookup_pnl_cube(get_pnl_cube(snapshot), cube_query)
+        elif query_plan:
+            try:
+                execution = _execute_query_plan_on_snapshot(
+                    snapshot, query_plan, state
+                )
+            except QueryPlanError as exc:
+                log_event("query_plan_rejected", error=str(exc), query_plan=query_plan)
+                python_code = python_code or _python_code_for_rejected_plan(
+                    state, query_plan, exc
+                )
+        if execution is None:
+            # python_code is the fallback for plans the engine rejected.
+            if not python_code:
+                state["error_type"] = "not_present"
+                state["final_answer"] = MSG_NOT_PRESENT
+                return False
+            time_scope = state.get("entities", {}).get("time_scope")
+            execution = get_cached_execution(
+                snapshot, python_code, time_scope=time_scope
+            )
+            if execution is not None:
+                log_event(
+                    "result_cache_hit", task_type=task_type, **result_cache_stats()
+                )
+            else:
+                execution = _execute_plan_on_snapshot(snapshot, python_code, state)
+                store_execution(
+                    snapshot, python_code, execution, time_scope=time_scope
+                )
+                execution_profile = execution.get("execution_profile")
+                if execution_profile is not None:
+                    state["execution_profile"] = execution_profile
+                    log_event(
+                        "code_execution_profile",
+                        task_type=task_type,
+                        **execution_profile,
+                    )
         filtered_row_count = execution.get("filtered_row_count")
         if filtered_row_count == 0:
             state["error_type"] = "not_present"
@@ -336,49 +795,150 @@ def executor_response_agent(state: dict[str, Any]) -> dict[str, Any]:
                 or MSG_NOT_PRESENT
             )
             log_event("code_execution_empty_filtered_df", task_type=task_type)
-            return state
+            return False
         result_df = execution.get("result_df")
         if result_df is None:
             state["error_type"] = "not_present"
             state["final_answer"] = MSG_NOT_PRESENT
-            return state
+            return False
 
-        query_df = result_df
-        state["retrieved_rows"] = query_df.to_dict(orient="records")
         log_event(
             "code_execution_result_df",
             entities=state.get("entities", {}),
-            row_count=len(query_df),
-            columns=list(query_df.columns),
+            row_count=len(result_df),
+            columns=list(result_df.columns),
             task_type=task_type,
         )
 
-        records = query_df.to_dict(orient="records")
-        bounded_records = records[:500]
-        state["computed_result"] = {
-            "rows": bounded_records,
-            "total_rows": len(records),
-            "truncated": len(records) > len(bounded_records),
-            "task_type": task_type,
-        }
-
-        try:
-            state["final_answer"] = answer_from_result_with_llm(
-                user_query=str(state.get("user_query", "")),
-                result_payload=state["computed_result"],
-                profile=state.get("data_profile", {}),
-                conversation_messages=state.get("messages"),
-                client=state.get("llm_client"),
-            )
-            log_event("answer_llm_used", status="ok")
-        except Exception as exc:
-            log_event("answer_llm_failed", error=str(exc))
-            state["error_type"] = "not_present"
-            state["final_answer"] = MSG_NOT_PRESENT
+        state["computed_result"] = serialize_result_frame(
+            result_df,
+            max_rows=settings.RESULT_MAX_ROWS,
+            task_type=task_type,
+            total_rows=execution.get("result_row_count"),
+        )
+        state["retrieved_rows"] = result_records(state["computed_result"])
+        _remember_generated_code(state)
+        return True
+    except GeneratedCodeValidationError as exc:
+        log_event(
+            "code_validation_rejected",
+            error=str(exc),
+            task_type=task_type,
+            python_code=python_code,
+        )
+        state["error_type"] = "not_present"
+        state["final_answer"] = MSG_NOT_PRESENT
+    except ExecutionTimeoutError as exc:
+        log_event(
+            "code_execution_timeout",
+            error=str(exc),
+            task_type=task_type,
+            timeout_sec=settings.EXECUTION_TIMEOUT_SEC,
+            python_code=python_code,
+        )
+        state["error_type"] = "timeout"
+        state["final_answer"] = fallback_for_error_type("timeout")
+    except MemoryError as exc:
+        log_event(
+            "code_execution_memory_limit",
+            error=str(exc),
+            task_type=task_type,
+            python_code=python_code,
+        )
+        state["error_type"] = "resource_limit"
+        state["final_answer"] = fallback_for_error_type("resource_limit")
+    except ExecutionCancelledError as exc:
+        log_event(
+            "code_execution_cancelled",
+            error=str(exc),
+            task_type=task_type,
+            python_code=python_code,
+        )
+        state["error_type"] = "cancelled"
+        state["final_answer"] = fallback_for_error_type("cancelled")
+    except SandboxUnavailableError as exc:
+        log_event(
+            "code_execution_sandbox_unavailable",
+            error=str(exc),
+            task_type=task_type,
+        )
+        state["error_type"] = "sandbox_unavailable"
+        state["final_answer"] = fallback_for_error_type("sandbox_unavailable")
+    except ReadOnlyDataFrameError as exc:
+        log_event(
+            "code_execution_mutation_blocked",
+            error=str(exc),
+            task_type=task_type,
+            python_code=python_code,
+        )
+        state["error_type"] = "not_present"
+        state["final_answer"] = MSG_NOT_PRESENT
     except Exception as exc:
         log_event("code_execution_failed", error=str(exc))
         state["error_type"] = "not_present"
         state["final_answer"] = MSG_NOT_PRESENT
+    return False
+
+
+def _answer_request(state: dict[str, Any]) -> dict[str, Any]:
+    return {
+        "user_query": str(state.get("user_query", "")),
+        "result_payload": state["computed_result"],
+        "profile": state.get("data_profile", {}),
+        "conversation_messages": state.get("messages"),
+        "client": state.get("llm_client"),
+    }
+
+
+def _answer_failed(state: dict[str, Any], exc: Exception) -> None:
+    log_event("answer_llm_failed", error=str(exc))
+    state["error_type"] = "not_present"
+    state["final_answer"] = MSG_NOT_PRESENT
+
+
+def executor_response_agent(state: dict[str, Any]) -> dict[str, Any]:
+    """Execute generated pandas code, serialize result_df, and produce final answer."""
+    state = _ensure_state(state)
+    if not _execute_for_answer(state):
+        return state
+    try:
+        stream = _answer_stream(state)
+        if stream is None:
+            state["final_answer"] = answer_from_result_with_llm(
+                **_answer_request(state)
+            )
+        else:
+            state["final_answer"] = _relay_answer(
+                stream, stream_answer_from_result_with_llm(**_answer_request(state))
+            )
+        log_event("answer_llm_used", status="ok")
+    except Exception as exc:
+        _answer_failed(state, exc)
+    return state
+
+
+async def aexecutor_response_agent(state: dict[str, Any]) -> dict[str, Any]:
+    """Awaitable `executor_response_agent`.
+
+    Execution is CPU-bound and runs in a worker thread; the answer call awaits
+    the async LLM client.
+    """
+    state = _ensure_state(state)
+    if not await asyncio.to_thread(_execute_for_answer, state):
+        return state
+    try:
+        stream = _answer_stream(state)
+        if stream is None:
+            state["final_answer"] = await aanswer_from_result_with_llm(
+                **_answer_request(state)
+            )
+        else:
+            state["final_answer"] = await _arelay_answer(
+                stream, astream_answer_from_result_with_llm(**_answer_request(state))
+            )
+        log_event("answer_llm_used", status="ok")
+    except Exception as exc:
+        _answer_failed(state, exc)
     return state
 
 
@@ -17,15 +17,21 @@ class GraphStateDict(TypedDict, total=False):
     entities_preextracted: bool
     task_type: str | None
     python_code: str | None
+    query_plan: dict[str, Any] | None
+    cube_query: dict[str, Any] | None
     data_profile: dict[str, Any] | None
     retrieved_rows: list[dict[str, Any]]
     computed_result: dict[str, Any] | None
+    execution_profile: dict[str, Any] | None
+    question_cache_key: str | None
     messages: list[dict[str, Any]]
     needs_clarification: bool
     clarification_question: str | None
     error_type: str | None
     final_answer: str | None
     routing_action: str
+    cancel_token: Any
+    answer_stream: Any
 
 
 class GraphState(BaseModel):
@@ -55,17 +61,39 @@ class GraphState(BaseModel):
         default=None,
         description="Generated pandas code for information gathering; must assign result_df.",
     )
+    query_plan: dict[str, Any] | None = Field(
+        default=None,
+        description="Structured query plan run by the vectorized plan engine; python_code is its fallback.",
+    )
+    cube_query: dict[str, Any] | None = Field(
+        default=None,
+        description="P&L cube lookup used instead of generated code for supported metrics.",
+    )
     data_profile: dict[str, Any] | None = Field(
         default=None, description="Optional startup metadata profile passed to nodes."
     )
     retrieved_rows: list[dict[str, Any]] = Field(
         default_factory=list,
-        description="Rows produced by executed generated code (result_df serialized to records).",
+        description="Bounded head of result_df (at most RESULT_MAX_ROWS rows) as records.",
     )
     computed_result: dict[str, Any] | None = Field(
         default=None,
         description=(
-            "Bounded JSON payload derived from result_df and passed to the final answer LLM."
+            "Bounded columnar JSON payload derived from result_df and passed to the final answer LLM."
+        ),
+    )
+    execution_profile: dict[str, Any] | None = Field(
+        default=None,
+        description=(
+            "Per-statement timing, peak memory and row counts of generated code "
+            "(set only with EXECUTION_PROFILING)."
+        ),
+    )
+    question_cache_key: str | None = Field(
+        default=None,
+        description=(
+            "Near-duplicate question cache entry of this turn "
+            "(set only with QUESTION_CACHE_ENABLED)."
         ),
     )
     messages: list[dict[str, Any]] = Field(
@@ -87,6 +115,14 @@ class GraphState(BaseModel):
     final_answer: str | None = Field(
         default=None, description="Final user-facing response for the turn."
     )
+    cancel_token: Any = Field(
+        default=None,
+        description="CancellationToken the caller sets to stop this turn's code execution.",
+    )
+    answer_stream: Any = Field(
+        default=None,
+        description="TokenStream that receives the final answer text as it is generated.",
+    )
 
 
 def build_initial_state(
@@ -2,22 +2,74 @@
 
 from __future__ import annotations
 
+import hashlib
 import json
-import re
-from typing import Any
+from types import CodeType
+from typing import Any, NamedTuple
 
 import pandas as pd
 
 from config.settings import settings
 from config.prompts import build_codegen_prompt
+from src.data.indexes import RowIndex, make_row_selector
 from src.data.profiler import build_minimal_prompt_profile_json
 from src.contracts.models import CodegenPlanSchema
+from src.contracts.code_validation import (
+    parse_and_validate_generated_code,
+    plan_column_references,
+)
 from src.contracts.policies import (
-    FORBIDDEN_CODE_PATTERNS,
     build_exec_locals,
     build_safe_exec_globals,
 )
+from src.services.execution_control import CancellationToken, ExecutionGuard
+from src.services.execution_profile import profile_generated_code
 from src.services.llm_client import OpenAILLMClient
+from src.utils.cache import LRUCache
+from src.utils.logging import log_event
+
+# Filename attached to compiled plans (shows up in tracebacks and frame checks).
+GENERATED_CODE_FILENAME = "<generated_plan>"
+
+
+class CompiledPlan(NamedTuple):
+    """Validated plan code plus the dataframe columns it reads (None = all)."""
+
+    code: CodeType
+    columns: frozenset[str] | None
+
+
+_COMPILED_CODE_CACHE: LRUCache[CompiledPlan] = LRUCache(settings.CODE_CACHE_SIZE)
+
+
+def _codegen_request(
+    user_query: str,
+    extracted_entities: dict[str, Any],
+    profile: dict[str, Any],
+    conversation_messages: list[dict[str, Any]] | None,
+    rejected_plan: dict[str, Any] | None = None,
+) -> dict[str, Any]:
+    """Build the structured-parse arguments of the codegen call."""
+    profile_json = build_minimal_prompt_profile_json(profile)
+    payload: dict[str, Any] = {
+        "user_query": user_query,
+        "request_target": extracted_entities.get("request_target", []),
+        "ranking": extracted_entities.get("ranking", {"mode": "none", "top_k": None}),
+        "time_scope": extracted_entities.get("time_scope", {"mode": "none"}),
+        "extracted_entities": extracted_entities,
+    }
+    if rejected_plan is not None:
+        payload["rejected_query_plan"] = rejected_plan
+    user_payload = json.dumps(payload, ensure_ascii=True)
+    return {
+        "system_prompt": build_codegen_prompt(
+            profile_json, backend=settings.EXECUTION_BACKEND
+        ),
+        "user_prompt": user_payload,
+        "response_format": CodegenPlanSchema,
+        "conversation_messages": conversation_messages,
+        "max_output_tokens": settings.OPENAI_MAX_OUTPUT_TOKENS_CODEGEN,
+    }
 
 
 def generate_query_code_with_llm(
@@ -26,49 +78,142 @@ def generate_query_code_with_llm(
     profile: dict[str, Any],
     conversation_messages: list[dict[str, Any]] | None = None,
     client: OpenAILLMClient | None = None,
+    rejected_plan: dict[str, Any] | None = None,
 ) -> dict[str, Any]:
-    """Generate Python query code using LLM with strict schema validation."""
+    """Generate Python query code using LLM with strict schema validation.
+
+    `rejected_plan` ({"query_plan", "error"}) asks for python_code in place of
+    a query plan the engine could not run.
+    """
     llm = client or OpenAILLMClient()
-    profile_json = build_minimal_prompt_profile_json(profile)
-    user_payload = json.dumps(
-        {
-            "user_query": user_query,
-            "request_target": extracted_entities.get("request_target", []),
-            "ranking": extracted_entities.get(
-                "ranking", {"mode": "none", "top_k": None}
-            ),
-            "time_scope": extracted_entities.get("time_scope", {"mode": "none"}),
-            "extracted_entities": extracted_entities,
-        },
-        ensure_ascii=True,
-    )
     parsed = llm.parse_structured(
-        system_prompt=build_codegen_prompt(profile_json),
-        user_prompt=user_payload,
-        response_format=CodegenPlanSchema,
-        conversation_messages=conversation_messages,
-        max_output_tokens=settings.OPENAI_MAX_OUTPUT_TOKENS_CODEGEN,
+        **_codegen_request(
+            user_query,
+            extracted_entities,
+            profile,
+            conversation_messages,
+            rejected_plan,
+        )
+    )
+    return parsed.model_dump()
+
+
+async def agenerate_query_code_with_llm(
+    user_query: str,
+    extracted_entities: dict[str, Any],
+    profile: dict[str, Any],
+    conversation_messages: list[dict[str, Any]] | None = None,
+    client: OpenAILLMClient | None = None,
+    rejected_plan: dict[str, Any] | None = None,
+) -> dict[str, Any]:
+    """Awaitable `generate_query_code_with_llm`."""
+    llm = client or OpenAILLMClient()
+    parsed = await llm.aparse_structured(
+        **_codegen_request(
+            user_query,
+            extracted_entities,
+            profile,
+            conversation_messages,
+            rejected_plan,
+        )
     )
     return parsed.model_dump()
 
 
+def normalize_generated_code(python_code: str) -> str:
+    """Normalize line endings and trailing whitespace (indentation is preserved)."""
+    lines = [line.rstrip() for line in python_code.replace("\r\n", "\n").split("\n")]
+    return "\n".join(lines).strip("\n") + "\n"
+
+
+def generated_code_hash(python_code: str) -> str:
+    """Return the SHA-256 hex digest of the normalized plan source."""
+    return hashlib.sha256(
+        normalize_generated_code(python_code).encode("utf-8")
+    ).hexdigest()
+
+
+def _compile_generated_code(python_code: str) -> tuple[CompiledPlan, bool]:
+    """Return the validated compiled plan and whether it came from cache.
+
+    Keyed by the SHA-256 of the normalized source, so a repeated plan skips
+    AST validation, column analysis and compilation.
+    """
+    source = normalize_generated_code(python_code)
+    key = generated_code_hash(source)
+    compiled = _COMPILED_CODE_CACHE.get(key)
+    if compiled is not None:
+        return compiled, True
+    tree = parse_and_validate_generated_code(source)
+    compiled = CompiledPlan(
+        code=compile(tree, GENERATED_CODE_FILENAME, "exec"),
+        columns=plan_column_references(tree),
+    )
+    _COMPILED_CODE_CACHE.put(key, compiled)
+    return compiled, False
+
+
+def _prune_columns(
+    dataframe: pd.DataFrame, columns: frozenset[str] | None
+) -> pd.DataFrame:
+    """Narrow `dataframe` to the columns a plan reads, keeping column order."""
+    if columns is None or not settings.COLUMN_PRUNING_ENABLED:
+        return dataframe
+    kept = [column for column in dataframe.columns if column in columns]
+    if len(kept) == len(dataframe.columns):
+        return dataframe
+    log_event("code_columns_pruned", kept=kept, total_columns=len(dataframe.columns))
+    return dataframe[kept]
+
+
+def code_cache_stats() -> dict[str, float | int]:
+    """Return compiled-code cache size and hit-rate counters."""
+    return _COMPILED_CODE_CACHE.stats()
+
+
 def execute_generated_python_code(
-    dataframe: pd.DataFrame, python_code: str
+    dataframe: pd.DataFrame,
+    python_code: str,
+    *,
+    read_only: bool = False,
+    row_index: RowIndex | None = None,
+    timeout_sec: float | None = None,
+    cancel_token: CancellationToken | None = None,
+    profile: bool = False,
 ) -> dict[str, Any]:
     """Execute generated pandas code in restricted namespace.
 
     This step is for information gathering only and expects `result_df`.
+    With `read_only=True` the code runs against a zero-copy view of `dataframe`
+    and any attempt to mutate it raises `ReadOnlyDataFrameError`.
+    `row_index`, built over the same rows as `dataframe`, backs `select_rows`.
+    Plans that provably read only some columns get a frame narrowed to them.
+    Plan code past `timeout_sec` raises `ExecutionTimeoutError`; a cancelled
+    `cancel_token` raises `ExecutionCancelledError`.
+    With `profile=True` statements run one at a time and the result carries an
+    `execution_profile` (per-statement time, peak memory and row counts).
     """
     if not python_code.strip():
         return {"result_df": None, "result_payload": None}
 
-    for pattern in FORBIDDEN_CODE_PATTERNS:
-        if re.search(pattern, python_code):
-            raise ValueError("Generated code contains forbidden operations.")
+    compiled, cache_hit = _compile_generated_code(python_code)
+    log_event("code_cache_lookup", hit=cache_hit, **code_cache_stats())
 
-    local_vars = build_exec_locals(dataframe)
+    # Pruned before the copy/view, so only referenced columns are duplicated.
+    dataframe = _prune_columns(dataframe, compiled.columns)
+    local_vars = build_exec_locals(dataframe, read_only=read_only)
     safe_globals = build_safe_exec_globals()
-    exec(python_code, safe_globals, local_vars)
+    safe_globals["select_rows"] = make_row_selector(local_vars["dataframe"], row_index)
+    with ExecutionGuard(timeout_sec=timeout_sec, cancel_token=cancel_token):
+        if profile:
+            execution_profile = profile_generated_code(
+                normalize_generated_code(python_code),
+                GENERATED_CODE_FILENAME,
+                safe_globals,
+                local_vars,
+            )
+        else:
+            exec(compiled.code, safe_globals, local_vars)
     result_df = local_vars.get("result_df")
     filtered_df = local_vars.get("filtered_df")
     if result_df is not None and not isinstance(result_df, pd.DataFrame):
@@ -76,8 +221,11 @@ def execute_generated_python_code(
     filtered_row_count: int | None = None
     if isinstance(filtered_df, pd.DataFrame):
         filtered_row_count = int(len(filtered_df))
-    return {
+    execution = {
         "result_df": result_df,
         "filtered_row_count": filtered_row_count,
         "result_payload": local_vars.get("result_payload"),
     }
+    if profile:
+        execution["execution_profile"] = execution_profile
+    return execution
@@ -0,0 +1,384 @@
+"""DuckDB backend for structured query plans, run as SQL over the parquet files.
+
+Plans compile to one parameterized SELECT against `read_parquet`, so DuckDB
+scans with all threads, pushes filters down to row groups and hive partitions,
+and spills large aggregations to disk instead of materializing the dataset in
+memory. The pandas engine (`plan_engine`) remains the reference semantics:
+nulls group and sort last, sums over no rows are 0, and `not_in`/`ne` drop nulls.
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from typing import Any
+
+import duckdb
+import pandas as pd
+
+from config.settings import settings
+from src.data.constants import PERIOD_KEY_COLUMNS
+from src.data.partitions import list_dataset_files
+from src.data.periods import period_ordinal
+from src.data.repository import DatasetSnapshot, cached_per_snapshot
+from src.services.execution_control import (
+    CancellationToken,
+    ExecutionCancelledError,
+    ExecutionTimeoutError,
+)
+from src.services.plan_engine import (
+    PNL_VALUE_COLUMNS,
+    QueryPlanError,
+    coerce_plan_operands,
+    plan_operand_text,
+    validate_query_plan,
+)
+
+# How often the watchdog checks the deadline and the cancellation token.
+_WATCHDOG_POLL_SEC = 0.05
+
+_NUMERIC_TYPE_PREFIXES: tuple[str, ...] = (
+    "TINYINT",
+    "SMALLINT",
+    "INTEGER",
+    "BIGINT",
+    "HUGEINT",
+    "UTINYINT",
+    "USMALLINT",
+    "UINTEGER",
+    "UBIGINT",
+    "FLOAT",
+    "DOUBLE",
+    "DECIMAL",
+)
+_INTEGER_TYPE_MARKER = "INT"
+
+_COMPARISON_OPERATORS: dict[str, str] = {
+    "eq": "=",
+    "ne": "<>",
+    "gt": ">",
+    "gte": ">=",
+    "lt": "<",
+    "lte": "<=",
+}
+
+_AGGREGATE_TEMPLATES: dict[str, str] = {
+    "sum": "COALESCE(SUM({column}), 0)",
+    "mean": "AVG({column})",
+    "min": "MIN({column})",
+    "max": "MAX({column})",
+    "count": "COUNT({column})",
+    "nunique": "COUNT(DISTINCT {column})",
+}
+
+# Helper columns of the compiled statement; dropped before returning.
+_ROW_COUNT_COLUMN = "__filtered_row_count"
+_RESULT_ROWS_COLUMN = "__result_row_count"
+_ORDINAL_COLUMN = "__result_ordinal"
+
+_DATABASE: duckdb.DuckDBPyConnection | None = None
+_DATABASE_LOCK = threading.Lock()
+
+
+def _database() -> duckdb.DuckDBPyConnection:
+    """Return the process-wide in-memory DuckDB database, opening it once."""
+    global _DATABASE
+    if _DATABASE is None:
+        with _DATABASE_LOCK:
+            if _DATABASE is None:
+                config: dict[str, Any] = {}
+                if settings.DUCKDB_THREADS:
+                    config["threads"] = settings.DUCKDB_THREADS
+                if settings.DUCKDB_MEMORY_LIMIT:
+                    config["memory_limit"] = settings.DUCKDB_MEMORY_LIMIT
+                if settings.DUCKDB_TEMP_DIRECTORY:
+                    config["temp_directory"] = settings.DUCKDB_TEMP_DIRECTORY
+                _DATABASE = duckdb.connect(database=":memory:", config=config)
+    return _DATABASE
+
+
+def _quote_identifier(name: str) -> str:
+    return '"' + name.replace('"', '""') + '"'
+
+
+def _quote_literal(value: str) -> str:
+    return "'" + value.replace("'", "''") + "'"
+
+
+def parquet_relation(dataset_path: str, partitioned: bool) -> str:
+    """Return the `read_parquet` table expression for a dataset path.
+
+    Partition keys of the hive layout stay strings, like the pandas loader.
+    """
+    if not partitioned:
+        return f"read_parquet({_quote_literal(dataset_path)})"
+    files = ", ".join(_quote_literal(path) for path in list_dataset_files(dataset_path))
+    return (
+        f"read_parquet([{files}], hive_partitioning = true, "
+        "hive_types_autocast = false)"
+    )
+
+
+@cached_per_snapshot()
+def parquet_column_types(snapshot: DatasetSnapshot) -> dict[str, str]:
+    """Return the parquet schema (column -> DuckDB type) of a dataset version."""
+    relation = parquet_relation(snapshot.dataset_path, snapshot.partitioned)
+    rows = _database().cursor().execute(f"DESCRIBE SELECT * FROM {relation}").fetchall()
+    return {str(row[0]): str(row[1]) for row in rows}
+
+
+def _coerce_values(column: str, column_type: str, values: list[Any]) -> list[Any]:
+    """Cast plan operands to the DuckDB type of `column`."""
+    numeric = column_type.upper().startswith(_NUMERIC_TYPE_PREFIXES)
+    return coerce_plan_operands(
+        column,
+        values,
+        numeric=numeric,
+        integer=numeric and _INTEGER_TYPE_MARKER in column_type.upper(),
+    )
+
+
+def _predicate_sql(
+    predicate: dict[str, Any], column_types: dict[str, str]
+) -> tuple[str, list[Any]]:
+    """Render one predicate as a SQL condition and its parameters."""
+    column, op = predicate["column"], predicate["op"]
+    identifier = _quote_identifier(column)
+    if op == "is_null":
+        return f"{identifier} IS NULL", []
+    if op == "not_null":
+        return f"{identifier} IS NOT NULL", []
+    if op == "contains":
+        return (
+            f"strpos(lower(CAST({identifier} AS VARCHAR)), lower(?)) > 0",
+            [plan_operand_text(predicate["values"][0])],
+        )
+    if op == "between" and column in PERIOD_KEY_COLUMNS:
+        # Tokens are fixed-width (YYYY, YYYY-QN, YYYY-MNN), so string order is
+        # period order once both bounds are known to be well formed.
+        try:
+            bounds = [plan_operand_text(value).strip() for value in predicate["values"]]
+            for bound in bounds:
+                period_ordinal(column, bound)
+        except ValueError as exc:
+            raise QueryPlanError(str(exc)) from exc
+        return f"{identifier} BETWEEN ? AND ?", bounds
+
+    values = _coerce_values(column, column_types[column], predicate["values"])
+    if op in ("in", "not_in"):
+        placeholders = ", ".join("?" for _ in values)
+        keyword = "IN" if op == "in" else "NOT IN"
+        # NOT IN over a NULL column is NULL, so null rows drop out as in pandas.
+        return f"{identifier} {keyword} ({placeholders})", values
+    if op == "between":
+        return f"{identifier} BETWEEN ? AND ?", values
+    return f"{identifier} {_COMPARISON_OPERATORS[op]} ?", values
+
+
+def _order_by_sql(plan: dict[str, Any], tiebreak: list[str]) -> str:
+    """ORDER BY for the plan sort keys, then group keys (pandas group order)."""
+    terms = [
+        f"{_quote_identifier(key['column'])} "
+        f"{'ASC' if key.get('ascending', True) else 'DESC'} NULLS LAST"
+        for key in plan.get("sort", [])
+    ]
+    terms += [f"{_quote_identifier(column)} ASC NULLS LAST" for column in tiebreak]
+    return f" ORDER BY {', '.join(terms)}" if terms else ""
+
+
+def compile_query_plan_sql(
+    plan: dict[str, Any], relation: str, column_types: dict[str, str]
+) -> tuple[str, list[Any]]:
+    """Compile a validated plan to (SQL, parameters).
+
+    The filtered row count comes from a separate aggregate CTE joined once, so
+    it is known even when the result is empty, and the result rows stream
+    through LIMIT without a window over every filtered row. Without a plan
+    limit, `RESULT_MAX_ROWS + 1` rows are fetched: enough to serialize the
+    answer and to tell that it was truncated. Output rows carry
+    `_ROW_COUNT_COLUMN`, plus `_RESULT_ROWS_COLUMN` (result rows before LIMIT)
+    for grouped and DISTINCT plans; an empty result is a single row whose
+    `_ORDINAL_COLUMN` is NULL.
+    """
+    conditions: list[str] = []
+    where_params: list[Any] = []
+    for predicate in plan.get("filters", []):
+        condition, values = _predicate_sql(predicate, column_types)
+        conditions.append(condition)
+        where_params.extend(values)
+    where = f" WHERE {' AND '.join(conditions)}" if conditions else ""
+
+    counts = [f"COUNT(*) AS {_ROW_COUNT_COLUMN}"]
+    group_by = list(plan.get("group_by", []))
+    if plan.get("aggregations") or plan.get("derive_pnl"):
+        items = [_quote_identifier(column) for column in group_by]
+        for aggregation in plan.get("aggregations", []):
+            expression = _AGGREGATE_TEMPLATES[aggregation["func"]].format(
+                column=_quote_identifier(aggregation["column"])
+            )
+            items.append(f"{expression} AS {_quote_identifier(aggregation['alias'])}")
+        outer = ["*"]
+        if plan.get("derive_pnl"):
+            for alias, ledger_type in (
+                ("revenue_total", "revenue"),
+                ("expenses_total", "expenses"),
+            ):
+                items.append(
+                    "COALESCE(SUM(CASE WHEN ledger_type = "
+                    f"{_quote_literal(ledger_type)} THEN profit ELSE 0 END), 0) "
+                    f"AS {alias}"
+                )
+            outer.append("revenue_total + expenses_total AS net_pnl")
+        # A window over the grouped rows only; there is one row per group.
+        outer.append(f"COUNT(*) OVER () AS {_RESULT_ROWS_COLUMN}")
+        grouping = (
+            f" GROUP BY {', '.join(_quote_identifier(c) for c in group_by)}"
+            if group_by
+            else ""
+        )
+        inner = f"SELECT {', '.join(items)} FROM {relation}{where}{grouping}"
+        result_sql = (
+            f"SELECT {', '.join(outer)} FROM ({inner}) AS grouped"
+            f"{_order_by_sql(plan, group_by)}"
+        )
+    else:
+        columns = plan.get("columns") or list(column_types)
+        projection = ", ".join(_quote_identifier(column) for column in columns)
+        if plan.get("distinct"):
+            # DISTINCT treats NULLs as equal, like `drop_duplicates`.
+            counts.append(
+                f"COUNT(DISTINCT ROW({projection})) AS {_RESULT_ROWS_COLUMN}"
+            )
+            result_sql = f"SELECT DISTINCT {projection} FROM {relation}{where}"
+        else:
+            result_sql = f"SELECT {projection} FROM {relation}{where}"
+        result_sql += _order_by_sql(plan, [])
+    limit = plan.get("limit")
+    if limit is None:
+        limit = settings.RESULT_MAX_ROWS + 1
+    result_sql += f" LIMIT {int(limit)}"
+
+    sql = (
+        f"WITH row_count AS (SELECT {', '.join(counts)} FROM {relation}{where}), "
+        f"limited AS ({result_sql}), "
+        f"result AS (SELECT *, ROW_NUMBER() OVER () AS {_ORDINAL_COLUMN} "
+        "FROM limited) "
+        "SELECT result.*, row_count.* "
+        f"FROM row_count LEFT JOIN result ON TRUE ORDER BY {_ORDINAL_COLUMN}"
+    )
+    return sql, where_params + where_params
+
+
+class _Watchdog:
+    """Interrupt a DuckDB cursor on deadline or cancellation."""
+
+    def __init__(
+        self,
+        cursor: duckdb.DuckDBPyConnection,
+        *,
+        timeout_sec: float | None,
+        cancel_token: CancellationToken | None,
+    ) -> None:
+        self._cursor = cursor
+        self._timeout_sec = timeout_sec
+        self._deadline = (
+            time.monotonic() + timeout_sec if timeout_sec is not None else None
+        )
+        self._cancel_token = cancel_token
+        self._done = threading.Event()
+        self.reason: str | None = None
+
+    def _watch(self) -> None:
+        while not self._done.wait(_WATCHDOG_POLL_SEC):
+            if self._cancel_token is not None and self._cancel_token.cancelled:
+                self.reason = "cancelled"
+            elif self._deadline is not None and time.monotonic() > self._deadline:
+                self.reason = "timeout"
+            else:
+                continue
+            self._cursor.interrupt()
+            return
+
+    def raise_for_reason(self) -> None:
+        if self.reason == "cancelled":
+            raise ExecutionCancelledError("Query execution was cancelled")
+        raise ExecutionTimeoutError(
+            f"DuckDB query exceeded {self._timeout_sec:g}s execution deadline"
+        )
+
+    def __enter__(self) -> "_Watchdog":
+        if self._cancel_token is not None and self._cancel_token.cancelled:
+            raise ExecutionCancelledError("Query execution was cancelled")
+        if self._deadline is not None or self._cancel_token is not None:
+            threading.Thread(
+                target=self._watch, name="duckdb-watchdog", daemon=True
+            ).start()
+        return self
+
+    def __exit__(self, *_exc: Any) -> None:
+        self._done.set()
+
+
+def execute_query_plan_duckdb(
+    snapshot: DatasetSnapshot,
+    plan: dict[str, Any],
+    *,
+    timeout_sec: float | None = None,
+    cancel_token: CancellationToken | None = None,
+) -> dict[str, Any]:
+    """Execute a structured plan with DuckDB; mirrors `execute_query_plan` output.
+
+    Reads the parquet files of `snapshot` directly and never loads its frame.
+    Plans DuckDB cannot bind (unknown columns, operands of the wrong type)
+    raise `QueryPlanError`. Rows of an unsorted projection keep file order.
+    Only the rows the answer stage can use are fetched; `result_row_count`
+    is the size of the full result.
+    """
+    column_types = parquet_column_types(snapshot)
+    validate_query_plan(plan, pd.Index(list(column_types)))
+    relation = parquet_relation(snapshot.dataset_path, snapshot.partitioned)
+    result_sql, params = compile_query_plan_sql(plan, relation, column_types)
+
+    cursor = _database().cursor()
+    try:
+        with _Watchdog(
+            cursor, timeout_sec=timeout_sec, cancel_token=cancel_token
+        ) as watchdog:
+            try:
+                result_df = cursor.execute(result_sql, params).df()
+            except duckdb.InterruptException:
+                if watchdog.reason is None:
+                    raise
+                watchdog.raise_for_reason()
+            except duckdb.Error as exc:
+                raise QueryPlanError(str(exc)) from exc
+    finally:
+        cursor.close()
+    filtered_row_count = int(result_df[_ROW_COUNT_COLUMN].iloc[0])
+    result_row_count = filtered_row_count
+    if _RESULT_ROWS_COLUMN in result_df.columns:
+        result_row_count = int(result_df[_RESULT_ROWS_COLUMN].fillna(0).iloc[0])
+    if plan.get("limit") is not None:
+        result_row_count = min(result_row_count, int(plan["limit"]))
+    result_df = (
+        result_df[result_df[_ORDINAL_COLUMN].notna()]
+        .drop(
+            columns=[_ROW_COUNT_COLUMN, _RESULT_ROWS_COLUMN, _ORDINAL_COLUMN],
+            errors="ignore",
+        )
+        .reset_index(drop=True)
+    )
+    if plan.get("derive_pnl"):
+        for column in PNL_VALUE_COLUMNS:
+            result_df[column] = result_df[column].astype("float64")
+    return {
+        "result_df": result_df,
+        "filtered_row_count": filtered_row_count,
+        "result_row_count": result_row_count,
+        "result_payload": None,
+        "plan_path": "duckdb",
+        "filter_order": [
+            f"{predicate['column']}:{predicate['op']}"
+            for predicate in plan.get("filters", [])
+        ],
+    }
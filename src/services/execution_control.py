@@ -0,0 +1,125 @@
+"""Deadlines and cancellation for query plan and generated-code execution."""
+
+from __future__ import annotations
+
+import ctypes
+import threading
+import time
+from typing import Any
+
+# How often the watchdog checks the deadline and the cancellation token.
+_WATCHDOG_POLL_SEC = 0.05
+
+
+class ExecutionTimeoutError(TimeoutError):
+    """Raised when generated code runs past its deadline."""
+
+
+class ExecutionCancelledError(RuntimeError):
+    """Raised when the caller cancelled the query while its code was running."""
+
+
+class CancellationToken:
+    """Thread-safe flag a caller sets to stop the query it started."""
+
+    def __init__(self) -> None:
+        self._event = threading.Event()
+
+    def cancel(self) -> None:
+        self._event.set()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._event.is_set()
+
+
+class ExecutionGuard:
+    """Context manager enforcing a deadline and a cancellation token.
+
+    A watchdog thread checks both every `_WATCHDOG_POLL_SEC`. Once either
+    fires, it raises the matching error asynchronously in the thread that
+    entered the guard (`PyThreadState_SetAsyncExc`), and repeats until the
+    guarded block exits, in case library code swallows it. Nothing runs on
+    the executing thread itself, so plan code, lambdas and pandas internals
+    run untraced. The error is delivered at the next Python bytecode, so a
+    single long C-level operation (a large merge, sort or cross join) is only
+    interrupted once it returns; `EXECUTION_SANDBOX` kills such a worker.
+    """
+
+    def __init__(
+        self,
+        *,
+        timeout_sec: float | None = None,
+        cancel_token: CancellationToken | None = None,
+        description: str = "Generated code",
+    ) -> None:
+        self._timeout_sec = timeout_sec
+        self._deadline = (
+            time.monotonic() + timeout_sec if timeout_sec is not None else None
+        )
+        self._cancel_token = cancel_token
+        self._description = description
+        self._thread_id: int | None = None
+        self._lock = threading.Lock()
+        self._done = threading.Event()
+        self._reason: type[BaseException] | None = None
+
+    def check(self) -> None:
+        """Raise if the query was cancelled or its deadline passed."""
+        reason = self._expired()
+        if reason is not None:
+            self._raise(reason)
+
+    def _expired(self) -> type[BaseException] | None:
+        if self._cancel_token is not None and self._cancel_token.cancelled:
+            return ExecutionCancelledError
+        if self._deadline is not None and time.monotonic() > self._deadline:
+            return ExecutionTimeoutError
+        return None
+
+    def _raise(self, reason: type[BaseException]) -> None:
+        if reason is ExecutionCancelledError:
+            raise ExecutionCancelledError("Query execution was cancelled")
+        raise ExecutionTimeoutError(
+            f"{self._description} exceeded {self._timeout_sec:g}s execution deadline"
+        )
+
+    def _watch(self) -> None:
+        while not self._done.wait(_WATCHDOG_POLL_SEC):
+            reason = self._reason or self._expired()
+            if reason is None:
+                continue
+            with self._lock:
+                if self._done.is_set():
+                    return
+                self._reason = reason
+                _set_async_exc(self._thread_id, reason)
+
+    def __enter__(self) -> "ExecutionGuard":
+        self.check()
+        if self._deadline is not None or self._cancel_token is not None:
+            self._thread_id = threading.get_ident()
+            threading.Thread(
+                target=self._watch, name="execution-watchdog", daemon=True
+            ).start()
+        return self
+
+    def __exit__(self, *_exc: Any) -> None:
+        with self._lock:
+            self._done.set()
+            reason = self._reason
+            if reason is not None:
+                # Drop an interrupt that was not delivered before the block ended.
+                _set_async_exc(self._thread_id, None)
+        if reason is not None:
+            self._raise(reason)
+
+
+def _set_async_exc(thread_id: int | None, exc_type: type[BaseException] | None) -> None:
+    """Schedule `exc_type` in thread `thread_id`; None clears a pending one."""
+    if thread_id is None:
+        return
+    ctypes.pythonapi.PyThreadState_SetAsyncExc(
+        ctypes.c_ulong(thread_id),
+        ctypes.py_object(exc_type) if exc_type is not None else None,
+    )
@@ -0,0 +1,131 @@
+"""Per-statement profiling of generated plans (opt-in, for slow-query diagnosis)."""
+
+from __future__ import annotations
+
+import ast
+import threading
+import time
+import tracemalloc
+from typing import Any
+
+import pandas as pd
+
+# Longest statement source kept in a profile entry.
+_SOURCE_PREVIEW_CHARS = 160
+
+# tracemalloc start/reset_peak/stop are process-wide, so profiled executions
+# run one at a time; concurrent ones would reset each other's peaks.
+_PROFILE_LOCK = threading.Lock()
+
+
+def _operations(statement: ast.stmt) -> list[str]:
+    """Return the calls a statement makes, plus `filter` for mask indexing, in order."""
+    found: list[tuple[int, int, str]] = []
+    for node in ast.walk(statement):
+        if isinstance(node, ast.Call):
+            func = node.func
+            if isinstance(func, ast.Attribute):
+                found.append((func.end_lineno or 0, func.end_col_offset or 0, func.attr))
+            elif isinstance(func, ast.Name):
+                found.append((func.lineno, func.col_offset, func.id))
+        elif isinstance(node, ast.Subscript) and isinstance(
+            node.slice, (ast.Compare, ast.BinOp, ast.BoolOp, ast.UnaryOp, ast.Call)
+        ):
+            found.append((node.lineno, node.col_offset, "filter"))
+    # Chained calls nest outermost first; sorting by position restores call order.
+    return [name for *_position, name in sorted(found)]
+
+
+def _assigned_names(statement: ast.stmt) -> list[str]:
+    """Return plain names bound (or item-assigned) by a statement."""
+    if isinstance(statement, ast.Assign):
+        targets = statement.targets
+    elif isinstance(statement, (ast.AugAssign, ast.AnnAssign)):
+        targets = [statement.target]
+    else:
+        return []
+    names: list[str] = []
+    for target in targets:
+        for node in ast.walk(target):
+            if isinstance(node, ast.Name) and node.id not in names:
+                names.append(node.id)
+    return names
+
+
+def _row_counts(names: list[str], local_vars: dict[str, Any]) -> dict[str, int]:
+    """Return len() of every frame or series a statement bound."""
+    return {
+        name: int(len(local_vars[name]))
+        for name in names
+        if isinstance(local_vars.get(name), (pd.DataFrame, pd.Series))
+    }
+
+
+def profile_generated_code(
+    source: str,
+    filename: str,
+    safe_globals: dict[str, Any],
+    local_vars: dict[str, Any],
+) -> dict[str, Any]:
+    """Execute already-validated plan `source` one top-level statement at a time.
+
+    Each statement is compiled under `filename`, so tracebacks point at the
+    plan, and an active `ExecutionGuard` still applies. Per statement the profile records wall time, the peak of
+    traced allocations above the level at its start, the operations it runs and
+    the row counts of the frames it binds.
+
+    Profiled executions in one process are serialized on a module lock, since
+    allocation tracing is process-wide; the memory figures hold for this query
+    alone, but concurrent profiled queries wait for each other.
+    """
+    module = ast.parse(source, filename=filename)
+    with _PROFILE_LOCK:
+        return _profile_statements(module, source, filename, safe_globals, local_vars)
+
+
+def _profile_statements(
+    module: ast.Module,
+    source: str,
+    filename: str,
+    safe_globals: dict[str, Any],
+    local_vars: dict[str, Any],
+) -> dict[str, Any]:
+    """Run and measure each top-level statement; callers hold `_PROFILE_LOCK`."""
+    owns_tracing = not tracemalloc.is_tracing()
+    if owns_tracing:
+        tracemalloc.start()
+    statements: list[dict[str, Any]] = []
+    started = time.perf_counter()
+    overall_peak = 0
+    try:
+        baseline, _ = tracemalloc.get_traced_memory()
+        for statement in module.body:
+            code = compile(
+                ast.Module(body=[statement], type_ignores=[]), filename, "exec"
+            )
+            before, _ = tracemalloc.get_traced_memory()
+            tracemalloc.reset_peak()
+            t0 = time.perf_counter()
+            exec(code, safe_globals, local_vars)
+            duration_ms = (time.perf_counter() - t0) * 1000
+            _, peak = tracemalloc.get_traced_memory()
+            overall_peak = max(overall_peak, peak - baseline)
+            segment = ast.get_source_segment(source, statement) or ""
+            statements.append(
+                {
+                    "line": statement.lineno,
+                    "source": segment[:_SOURCE_PREVIEW_CHARS],
+                    "operations": _operations(statement),
+                    "duration_ms": round(duration_ms, 3),
+                    "peak_memory_bytes": max(0, peak - before),
+                    "row_counts": _row_counts(_assigned_names(statement), local_vars),
+                }
+            )
+    finally:
+        if owns_tracing:
+            tracemalloc.stop()
+    return {
+        "total_ms": round((time.perf_counter() - started) * 1000, 3),
+        "peak_memory_bytes": max(0, overall_peak),
+        "statements": statements,
+    }
@@ -38,6 +38,34 @@ def normalize_router_output(payload: dict[str, Any]) -> IntentDecision:
     )
 
 
+def _intent_request(
+    user_query: str,
+    profile: dict[str, Any],
+    conversation_messages: list[dict[str, Any]] | None,
+) -> dict[str, Any]:
+    """Build the structured-parse arguments of the combined intent call."""
+    profile_json = build_minimal_prompt_profile_json(profile)
+    return {
+        "system_prompt": build_intent_extractor_prompt(profile_json),
+        "user_prompt": user_query,
+        "response_format": IntentExtractionSchema,
+        "conversation_messages": conversation_messages,
+        "max_output_tokens": settings.OPENAI_MAX_OUTPUT_TOKENS_EXTRACTOR,
+        "hedge_after_sec": settings.LLM_INTENT_HEDGE_DELAY_SEC,
+    }
+
+
+def _decision_and_entities(
+    parsed: IntentExtractionSchema,
+) -> tuple[IntentDecision, dict[str, Any]]:
+    payload = parsed.model_dump()
+    decision = normalize_router_output(payload)
+    entities = payload.get("entities", {})
+    if not isinstance(entities, dict):
+        entities = {}
+    return decision, entities
+
+
 def classify_intent_and_extract_with_llm(
     user_query: str,
     profile: dict[str, Any],
@@ -46,17 +74,21 @@ def classify_intent_and_extract_with_llm(
 ) -> tuple[IntentDecision, dict[str, Any]]:
     """Classify intent and extract entities in a single structured LLM call."""
     llm = client or OpenAILLMClient()
-    profile_json = build_minimal_prompt_profile_json(profile)
     parsed = llm.parse_structured(
-        system_prompt=build_intent_extractor_prompt(profile_json),
-        user_prompt=user_query,
-        response_format=IntentExtractionSchema,
-        conversation_messages=conversation_messages,
-        max_output_tokens=settings.OPENAI_MAX_OUTPUT_TOKENS_EXTRACTOR,
+        **_intent_request(user_query, profile, conversation_messages)
     )
-    payload = parsed.model_dump()
-    decision = normalize_router_output(payload)
-    entities = payload.get("entities", {})
-    if not isinstance(entities, dict):
-        entities = {}
-    return decision, entities
+    return _decision_and_entities(parsed)
+
+
+async def aclassify_intent_and_extract_with_llm(
+    user_query: str,
+    profile: dict[str, Any],
+    conversation_messages: list[dict[str, Any]] | None = None,
+    client: OpenAILLMClient | None = None,
+) -> tuple[IntentDecision, dict[str, Any]]:
+    """Awaitable `classify_intent_and_extract_with_llm`."""
+    llm = client or OpenAILLMClient()
+    parsed = await llm.aparse_structured(
+        **_intent_request(user_query, profile, conversation_messages)
+    )
+    return _decision_and_entities(parsed)
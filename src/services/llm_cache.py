@@ -0,0 +1,180 @@
+"""Persistent exact-match cache of LLM responses (SQLite)."""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Any
+
+from config.settings import settings
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS llm_responses (
+    key TEXT PRIMARY KEY,
+    model TEXT NOT NULL,
+    stage TEXT NOT NULL,
+    payload TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    created_at REAL NOT NULL,
+    accessed_at REAL NOT NULL
+)
+"""
+_ACCESS_INDEX = (
+    "CREATE INDEX IF NOT EXISTS llm_responses_accessed ON llm_responses (accessed_at)"
+)
+
+
+def llm_cache_key(
+    *,
+    model: str,
+    messages: list[dict[str, Any]],
+    schema_name: str,
+    schema: dict[str, Any] | None,
+    max_output_tokens: int,
+    temperature: float,
+) -> str:
+    """Return the cache key of one request.
+
+    Hashes the model, the full prompt (system prompt, prior turns, user
+    payload), the response schema and its name, the token cap and temperature.
+    """
+    material = json.dumps(
+        {
+            "model": model,
+            "messages": messages,
+            "schema_name": schema_name,
+            "schema": schema,
+            "max_output_tokens": max_output_tokens,
+            "temperature": temperature,
+        },
+        ensure_ascii=True,
+        sort_keys=True,
+    )
+    return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+
+class LLMResponseCache:
+    """SQLite-backed response cache with TTL, byte budget and per-stage counters.
+
+    Entries older than `ttl_sec` are misses and are purged on write. Once the
+    stored payloads exceed `max_bytes`, least recently read entries are evicted.
+    The database runs in WAL mode, so several processes can share one file.
+    """
+
+    def __init__(self, path: str, *, ttl_sec: float, max_bytes: int) -> None:
+        self.path = path
+        self.ttl_sec = ttl_sec
+        self.max_bytes = max_bytes
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._connection = sqlite3.connect(
+            path, check_same_thread=False, isolation_level=None, timeout=5.0
+        )
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute(_SCHEMA)
+        self._connection.execute(_ACCESS_INDEX)
+        self._lock = threading.Lock()
+        self._counters: dict[str, dict[str, int]] = {}
+
+    def _count(self, stage: str, outcome: str) -> None:
+        counters = self._counters.setdefault(stage, {"hits": 0, "misses": 0})
+        counters[outcome] += 1
+
+    def get(self, key: str, *, stage: str) -> str | None:
+        """Return the cached payload for `key`, or None (counted per stage)."""
+        now = time.time()
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT payload, created_at FROM llm_responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None or now - row[1] > self.ttl_sec:
+                self._count(stage, "misses")
+                return None
+            self._connection.execute(
+                "UPDATE llm_responses SET accessed_at = ? WHERE key = ?", (now, key)
+            )
+            self._count(stage, "hits")
+            return row[0]
+
+    def put(self, key: str, payload: str, *, model: str, stage: str) -> None:
+        """Store a payload, then purge expired entries and evict over budget."""
+        size = len(payload.encode("utf-8"))
+        if size > self.max_bytes:
+            return
+        now = time.time()
+        with self._lock:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO llm_responses "
+                "(key, model, stage, payload, size, created_at, accessed_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (key, model, stage, payload, size, now, now),
+            )
+            self._connection.execute(
+                "DELETE FROM llm_responses WHERE created_at < ?", (now - self.ttl_sec,)
+            )
+            (total,) = self._connection.execute(
+                "SELECT COALESCE(SUM(size), 0) FROM llm_responses"
+            ).fetchone()
+            if total > self.max_bytes:
+                self._evict(total - self.max_bytes)
+
+    def _evict(self, excess: int) -> None:
+        """Delete least recently read entries totalling at least `excess` bytes."""
+        freed = 0
+        victims: list[tuple[str]] = []
+        for key, size in self._connection.execute(
+            "SELECT key, size FROM llm_responses ORDER BY accessed_at"
+        ):
+            victims.append((key,))
+            freed += size
+            if freed >= excess:
+                break
+        self._connection.executemany("DELETE FROM llm_responses WHERE key = ?", victims)
+
+    def clear(self) -> None:
+        """Drop all entries and reset counters."""
+        with self._lock:
+            self._connection.execute("DELETE FROM llm_responses")
+            self._counters.clear()
+
+    def stats(self) -> dict[str, Any]:
+        """Return entry count, stored bytes and per-stage hit/miss counters."""
+        with self._lock:
+            entries, total = self._connection.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM llm_responses"
+            ).fetchone()
+            stages = {
+                stage: {
+                    **counters,
+                    "hit_rate": round(
+                        counters["hits"] / (counters["hits"] + counters["misses"]), 4
+                    ),
+                }
+                for stage, counters in self._counters.items()
+            }
+        return {"entries": entries, "bytes": total, "stages": stages}
+
+
+_CACHE: LLMResponseCache | None = None
+_CACHE_LOCK = threading.Lock()
+
+
+def get_llm_response_cache() -> LLMResponseCache | None:
+    """Return the process-wide response cache, or None when disabled."""
+    global _CACHE
+    if not settings.LLM_CACHE_ENABLED:
+        return None
+    if _CACHE is None:
+        with _CACHE_LOCK:
+            if _CACHE is None:
+                _CACHE = LLMResponseCache(
+                    settings.LLM_CACHE_PATH,
+                    ttl_sec=settings.LLM_CACHE_TTL_SEC,
+                    max_bytes=settings.LLM_CACHE_MAX_BYTES,
+                )
+    return _CACHE
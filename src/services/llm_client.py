@@ -2,38 +2,220 @@
 
 from __future__ import annotations
 
+import asyncio
+import threading
 import time
-from typing import Any
+from typing import Any, AsyncIterator, Iterator
 from typing import TypeVar
+import weakref
 
 from config.settings import settings
 from src.contracts.policies import LLM_COMPATIBILITY_MARKERS
+from src.services.llm_cache import (
+    LLMResponseCache,
+    get_llm_response_cache,
+    llm_cache_key,
+)
+from src.services.llm_resilience import (
+    LLMCircuitOpenError,
+    acall_with_retry,
+    ahedged_call,
+    call_with_retry,
+    hedged_call,
+    is_transient_error,
+)
 from src.utils.logging import log_event
 
+_PATH_RESPONSE_FORMAT = "responses.parse_response_format"
+_PATH_TEXT_FORMAT = "responses.parse_text_format"
+_PATH_BETA_CHAT = "beta.chat.completions.parse"
+# Endpoints with their own retry loop and circuit breaker.
+_ENDPOINT_CHAT = "chat.completions.create"
+_ENDPOINT_RESPONSES = "responses.parse"
+# Cache stage label of chat_text calls (structured calls use the schema name).
+_CHAT_TEXT_STAGE = "chat_text"
+
+_SHARED_CLIENT: Any | None = None
+# One async client (and connection pool) per event loop: pooled connections
+# are bound to the loop that opened them.
+_SHARED_ASYNC_CLIENTS: weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Any] = (
+    weakref.WeakKeyDictionary()
+)
+_SHARED_CLIENT_LOCK = threading.Lock()
+
 
 class LLMClientError(RuntimeError):
     """Raised when LLM client initialization or invocation fails."""
 
 
+def _import_openai() -> Any:
+    """Import the openai package or raise `LLMClientError`."""
+    try:
+        import openai
+    except Exception as exc:  # pragma: no cover - depends on runtime environment
+        raise LLMClientError("openai package is required for runtime LLM calls.") from exc
+    return openai
+
+
+def _http_limits() -> Any:
+    """Return the connection-pool limits shared by every LLM HTTP client."""
+    import httpx
+
+    return httpx.Limits(
+        max_connections=settings.LLM_HTTP_MAX_CONNECTIONS,
+        max_keepalive_connections=settings.LLM_HTTP_MAX_KEEPALIVE_CONNECTIONS,
+        keepalive_expiry=settings.LLM_HTTP_KEEPALIVE_EXPIRY_SEC,
+    )
+
+
+def shared_openai_client() -> Any:
+    """Return the process-wide OpenAI client and its keep-alive connection pool."""
+    global _SHARED_CLIENT
+    if _SHARED_CLIENT is None:
+        openai = _import_openai()
+        with _SHARED_CLIENT_LOCK:
+            if _SHARED_CLIENT is None:
+                # Retries happen in llm_resilience, under the circuit breakers.
+                _SHARED_CLIENT = openai.OpenAI(
+                    api_key=settings.OPENAI_API_KEY,
+                    max_retries=0,
+                    http_client=openai.DefaultHttpxClient(limits=_http_limits()),
+                )
+    return _SHARED_CLIENT
+
+
+def shared_async_openai_client() -> Any:
+    """Return the AsyncOpenAI client pooled for the running event loop."""
+    loop = asyncio.get_running_loop()
+    client = _SHARED_ASYNC_CLIENTS.get(loop)
+    if client is None:
+        openai = _import_openai()
+        with _SHARED_CLIENT_LOCK:
+            client = _SHARED_ASYNC_CLIENTS.get(loop)
+            if client is None:
+                client = openai.AsyncOpenAI(
+                    api_key=settings.OPENAI_API_KEY,
+                    max_retries=0,
+                    http_client=openai.DefaultAsyncHttpxClient(limits=_http_limits()),
+                )
+                _SHARED_ASYNC_CLIENTS[loop] = client
+    return client
+
+
+def _build_messages(
+    system_prompt: str,
+    user_prompt: str,
+    conversation_messages: list[dict[str, Any]] | None,
+) -> list[dict[str, Any]]:
+    """Return system prompt, prior user/assistant turns, then the user prompt."""
+    messages: list[dict[str, Any]] = [{"role": "system", "content": system_prompt}]
+    if conversation_messages:
+        for message in conversation_messages:
+            role = str(message.get("role", "")).strip()
+            content = str(message.get("content", "")).strip()
+            if role in {"user", "assistant"} and content:
+                messages.append({"role": role, "content": content})
+    messages.append({"role": "user", "content": user_prompt})
+    return messages
+
+
+def _sampling(
+    temperature: float | None, max_output_tokens: int | None
+) -> tuple[float, int]:
+    """Apply settings defaults to per-call temperature and token cap."""
+    return (
+        temperature if temperature is not None else settings.OPENAI_TEMPERATURE,
+        (
+            max_output_tokens
+            if max_output_tokens is not None
+            else settings.OPENAI_MAX_OUTPUT_TOKENS
+        ),
+    )
+
+
+def _format_name(response_format: Any) -> str:
+    return str(getattr(response_format, "__name__", response_format))
+
+
+def _log_parse_attempt(
+    path: str, response_format: Any, t0: float, parsed: Any, empty_reason: str
+) -> None:
+    """Log one structured-parse attempt with its outcome and duration."""
+    fields: dict[str, Any] = {
+        "path": path,
+        "success": parsed is not None,
+        "duration_ms": int((time.perf_counter() - t0) * 1000),
+    }
+    if parsed is None:
+        fields["reason"] = empty_reason
+    log_event(
+        "llm_parse_structured_attempt",
+        **fields,
+        response_format=_format_name(response_format),
+    )
+
+
+def _cache_lookup(
+    *,
+    stage: str,
+    messages: list[dict[str, Any]],
+    temperature: float,
+    max_tokens: int,
+    response_format: Any = None,
+    bypass_cache: bool = False,
+) -> tuple[LLMResponseCache | None, str | None, str | None]:
+    """Return (cache, key, cached payload) for a request.
+
+    Only deterministic requests (temperature 0) are cached; `bypass_cache`
+    skips both the lookup and the store.
+    """
+    cache = get_llm_response_cache()
+    if cache is None or bypass_cache or temperature != 0.0:
+        return None, None, None
+    schema = response_format.model_json_schema() if response_format is not None else None
+    key = llm_cache_key(
+        model=settings.OPENAI_MODEL,
+        messages=messages,
+        schema_name=stage,
+        schema=schema,
+        max_output_tokens=max_tokens,
+        temperature=temperature,
+    )
+    payload = cache.get(key, stage=stage)
+    log_event("llm_cache_lookup", stage=stage, hit=payload is not None)
+    return cache, key, payload
+
+
+def _chunk_text(chunk: Any) -> str:
+    """Return the content delta of one streamed chat-completion chunk."""
+    if not chunk.choices:
+        return ""
+    return chunk.choices[0].delta.content or ""
+
+
+def _is_compatibility_error(exc: Exception) -> bool:
+    """Return True for likely SDK capability/signature issues."""
+    if isinstance(exc, LLMCircuitOpenError) or is_transient_error(exc):
+        return False
+    message = str(exc).lower()
+    return any(marker in message for marker in LLM_COMPATIBILITY_MARKERS)
+
+
 class OpenAILLMClient:
-    """Minimal OpenAI chat wrapper with lazy dependency import."""
+    """Minimal OpenAI chat wrapper with lazy dependency import.
+
+    Instances are cheap: every instance shares the process-wide connection pool
+    (`LLM_HTTP_*` settings). The `a`-prefixed methods are awaitable variants
+    that use the async pool of the running event loop.
+    """
 
     def __init__(self) -> None:
         self._client: Any | None = None
 
     def _get_client(self) -> Any:
-        """Initialize and cache OpenAI client lazily."""
-        if self._client is not None:
-            return self._client
-
-        try:
-            from openai import OpenAI
-        except Exception as exc:  # pragma: no cover - depends on runtime environment
-            raise LLMClientError(
-                "openai package is required for runtime LLM calls."
-            ) from exc
-
-        self._client = OpenAI(api_key=settings.OPENAI_API_KEY)
+        """Return the shared OpenAI client (initialized lazily)."""
+        if self._client is None:
+            self._client = shared_openai_client()
         return self._client
 
     def chat_text(
@@ -44,6 +226,7 @@ class OpenAILLMClient:
         conversation_messages: list[dict[str, Any]] | None = None,
         temperature: float | None = None,
         max_output_tokens: int | None = None,
+        bypass_cache: bool = False,
     ) -> str:
         """Send a chat request and return message text.
 
@@ -52,36 +235,171 @@ class OpenAILLMClient:
             user_prompt: Query/input payload.
             temperature: Optional override for model temperature.
             max_output_tokens: Optional override for max completion tokens.
+            bypass_cache: Skip the persistent response cache for this call.
 
         Returns:
             Model response content as text.
         """
+        temperature, max_tokens = _sampling(temperature, max_output_tokens)
+        messages = _build_messages(system_prompt, user_prompt, conversation_messages)
+        cache, key, cached = _cache_lookup(
+            stage=_CHAT_TEXT_STAGE,
+            messages=messages,
+            temperature=temperature,
+            max_tokens=max_tokens,
+            bypass_cache=bypass_cache,
+        )
+        if cached is not None:
+            return cached
         client = self._get_client()
-        messages: list[dict[str, Any]] = [{"role": "system", "content": system_prompt}]
-        if conversation_messages:
-            for message in conversation_messages:
-                role = str(message.get("role", "")).strip()
-                content = str(message.get("content", "")).strip()
-                if role in {"user", "assistant"} and content:
-                    messages.append({"role": role, "content": content})
-        messages.append({"role": "user", "content": user_prompt})
-
-        response = client.chat.completions.create(
-            model=settings.OPENAI_MODEL,
-            temperature=(
-                temperature if temperature is not None else settings.OPENAI_TEMPERATURE
+        response = call_with_retry(
+            _ENDPOINT_CHAT,
+            lambda: client.chat.completions.create(
+                model=settings.OPENAI_MODEL,
+                temperature=temperature,
+                max_tokens=max_tokens,
+                messages=messages,
+                timeout=settings.OPENAI_TIMEOUT_SEC,
             ),
-            max_tokens=(
-                max_output_tokens
-                if max_output_tokens is not None
-                else settings.OPENAI_MAX_OUTPUT_TOKENS
+        )
+        content = (response.choices[0].message.content if response.choices else "") or ""
+        if cache is not None and content:
+            cache.put(key, content, model=settings.OPENAI_MODEL, stage=_CHAT_TEXT_STAGE)
+        return content
+
+    async def achat_text(
+        self,
+        *,
+        system_prompt: str,
+        user_prompt: str,
+        conversation_messages: list[dict[str, Any]] | None = None,
+        temperature: float | None = None,
+        max_output_tokens: int | None = None,
+        bypass_cache: bool = False,
+    ) -> str:
+        """Awaitable `chat_text` on the event loop's pooled async client."""
+        temperature, max_tokens = _sampling(temperature, max_output_tokens)
+        messages = _build_messages(system_prompt, user_prompt, conversation_messages)
+        cache, key, cached = _cache_lookup(
+            stage=_CHAT_TEXT_STAGE,
+            messages=messages,
+            temperature=temperature,
+            max_tokens=max_tokens,
+            bypass_cache=bypass_cache,
+        )
+        if cached is not None:
+            return cached
+        client = shared_async_openai_client()
+        response = await acall_with_retry(
+            _ENDPOINT_CHAT,
+            lambda: client.chat.completions.create(
+                model=settings.OPENAI_MODEL,
+                temperature=temperature,
+                max_tokens=max_tokens,
+                messages=messages,
+                timeout=settings.OPENAI_TIMEOUT_SEC,
             ),
+        )
+        content = (response.choices[0].message.content if response.choices else "") or ""
+        if cache is not None and content:
+            cache.put(key, content, model=settings.OPENAI_MODEL, stage=_CHAT_TEXT_STAGE)
+        return content
+
+    def stream_chat_text(
+        self,
+        *,
+        system_prompt: str,
+        user_prompt: str,
+        conversation_messages: list[dict[str, Any]] | None = None,
+        temperature: float | None = None,
+        max_output_tokens: int | None = None,
+        bypass_cache: bool = False,
+    ) -> Iterator[str]:
+        """Streaming `chat_text`: yield text deltas as the model generates them.
+
+        A cached response is yielded in one piece; a completed stream is cached
+        like a `chat_text` response. Only opening the stream is retried.
+        """
+        temperature, max_tokens = _sampling(temperature, max_output_tokens)
+        messages = _build_messages(system_prompt, user_prompt, conversation_messages)
+        cache, key, cached = _cache_lookup(
+            stage=_CHAT_TEXT_STAGE,
             messages=messages,
-            timeout=settings.OPENAI_TIMEOUT_SEC,
+            temperature=temperature,
+            max_tokens=max_tokens,
+            bypass_cache=bypass_cache,
+        )
+        if cached is not None:
+            yield cached
+            return
+        client = self._get_client()
+        stream = call_with_retry(
+            _ENDPOINT_CHAT,
+            lambda: client.chat.completions.create(
+                model=settings.OPENAI_MODEL,
+                temperature=temperature,
+                max_tokens=max_tokens,
+                messages=messages,
+                timeout=settings.OPENAI_TIMEOUT_SEC,
+                stream=True,
+            ),
         )
+        parts: list[str] = []
+        with stream:
+            for chunk in stream:
+                delta = _chunk_text(chunk)
+                if delta:
+                    parts.append(delta)
+                    yield delta
+        content = "".join(parts)
+        if cache is not None and content:
+            cache.put(key, content, model=settings.OPENAI_MODEL, stage=_CHAT_TEXT_STAGE)
 
-        content = response.choices[0].message.content if response.choices else ""
-        return content or ""
+    async def astream_chat_text(
+        self,
+        *,
+        system_prompt: str,
+        user_prompt: str,
+        conversation_messages: list[dict[str, Any]] | None = None,
+        temperature: float | None = None,
+        max_output_tokens: int | None = None,
+        bypass_cache: bool = False,
+    ) -> AsyncIterator[str]:
+        """Awaitable `stream_chat_text` on the event loop's pooled async client."""
+        temperature, max_tokens = _sampling(temperature, max_output_tokens)
+        messages = _build_messages(system_prompt, user_prompt, conversation_messages)
+        cache, key, cached = _cache_lookup(
+            stage=_CHAT_TEXT_STAGE,
+            messages=messages,
+            temperature=temperature,
+            max_tokens=max_tokens,
+            bypass_cache=bypass_cache,
+        )
+        if cached is not None:
+            yield cached
+            return
+        client = shared_async_openai_client()
+        stream = await acall_with_retry(
+            _ENDPOINT_CHAT,
+            lambda: client.chat.completions.create(
+                model=settings.OPENAI_MODEL,
+                temperature=temperature,
+                max_tokens=max_tokens,
+                messages=messages,
+                timeout=settings.OPENAI_TIMEOUT_SEC,
+                stream=True,
+            ),
+        )
+        parts: list[str] = []
+        async with stream:
+            async for chunk in stream:
+                delta = _chunk_text(chunk)
+                if delta:
+                    parts.append(delta)
+                    yield delta
+        content = "".join(parts)
+        if cache is not None and content:
+            cache.put(key, content, model=settings.OPENAI_MODEL, stage=_CHAT_TEXT_STAGE)
 
     TModel = TypeVar("TModel")
 
@@ -94,152 +412,212 @@ class OpenAILLMClient:
         conversation_messages: list[dict[str, Any]] | None = None,
         temperature: float | None = None,
         max_output_tokens: int | None = None,
+        bypass_cache: bool = False,
+        hedge_after_sec: float | None = None,
     ) -> TModel:
-        """Request structured output parsed into the provided response_format type."""
+        """Request structured output parsed into the provided response_format type.
+
+        With `hedge_after_sec`, a duplicate request is raced against one that
+        has not answered after that many seconds (for latency-critical stages).
+        """
+        messages = _build_messages(system_prompt, user_prompt, conversation_messages)
+        temperature, max_tokens = _sampling(temperature, max_output_tokens)
+        stage = _format_name(response_format)
+        cache, key, cached = _cache_lookup(
+            stage=stage,
+            messages=messages,
+            temperature=temperature,
+            max_tokens=max_tokens,
+            response_format=response_format,
+            bypass_cache=bypass_cache,
+        )
+        if cached is not None:
+            return response_format.model_validate_json(cached)
+        parsed = hedged_call(
+            lambda: self._parse_structured_uncached(
+                messages, response_format, temperature, max_tokens
+            ),
+            hedge_after_sec or 0.0,
+        )
+        if cache is not None:
+            cache.put(
+                key, parsed.model_dump_json(), model=settings.OPENAI_MODEL, stage=stage
+            )
+        return parsed
+
+    def _parse_structured_uncached(
+        self,
+        messages: list[dict[str, Any]],
+        response_format: type[TModel],
+        temperature: float,
+        max_tokens: int,
+    ) -> TModel:
+        """Run the Responses API parse with its chat-completions fallback."""
         client = self._get_client()
-        messages: list[dict[str, Any]] = [{"role": "system", "content": system_prompt}]
-        if conversation_messages:
-            for message in conversation_messages:
-                role = str(message.get("role", "")).strip()
-                content = str(message.get("content", "")).strip()
-                if role in {"user", "assistant"} and content:
-                    messages.append({"role": role, "content": content})
-        messages.append({"role": "user", "content": user_prompt})
+        request: dict[str, Any] = {
+            "model": settings.OPENAI_MODEL,
+            "input": messages,
+            "temperature": temperature,
+            "max_output_tokens": max_tokens,
+            "timeout": settings.OPENAI_TIMEOUT_SEC,
+        }
 
         # Preferred path: Responses API with parsing.
         primary_error: Exception | None = None
         try:
             t0 = time.perf_counter()
-            response = client.responses.parse(
-                model=settings.OPENAI_MODEL,
-                input=messages,
-                response_format=response_format,
-                temperature=(
-                    temperature
-                    if temperature is not None
-                    else settings.OPENAI_TEMPERATURE
-                ),
-                max_output_tokens=(
-                    max_output_tokens
-                    if max_output_tokens is not None
-                    else settings.OPENAI_MAX_OUTPUT_TOKENS
-                ),
-                timeout=settings.OPENAI_TIMEOUT_SEC,
-            )
-            duration_ms = int((time.perf_counter() - t0) * 1000)
-            parsed = getattr(response, "output_parsed", None)
-            if parsed is not None:
-                log_event(
-                    "llm_parse_structured_attempt",
-                    path="responses.parse_response_format",
-                    success=True,
-                    duration_ms=duration_ms,
-                    response_format=str(
-                        getattr(response_format, "__name__", response_format)
+            try:
+                response = call_with_retry(
+                    _ENDPOINT_RESPONSES,
+                    lambda: client.responses.parse(
+                        **request, response_format=response_format
                     ),
                 )
-                return parsed
-            log_event(
-                "llm_parse_structured_attempt",
-                path="responses.parse_response_format",
-                success=False,
-                duration_ms=duration_ms,
-                reason="output_parsed_empty",
-                response_format=str(
-                    getattr(response_format, "__name__", response_format)
-                ),
-            )
-        except TypeError:
-            # Some SDK versions use text_format instead of response_format.
-            t0 = time.perf_counter()
-            response = client.responses.parse(
-                model=settings.OPENAI_MODEL,
-                input=messages,
-                text_format=response_format,
-                temperature=(
-                    temperature
-                    if temperature is not None
-                    else settings.OPENAI_TEMPERATURE
-                ),
-                max_output_tokens=(
-                    max_output_tokens
-                    if max_output_tokens is not None
-                    else settings.OPENAI_MAX_OUTPUT_TOKENS
-                ),
-                timeout=settings.OPENAI_TIMEOUT_SEC,
-            )
-            duration_ms = int((time.perf_counter() - t0) * 1000)
+                path = _PATH_RESPONSE_FORMAT
+            except TypeError:
+                # Some SDK versions use text_format instead of response_format.
+                t0 = time.perf_counter()
+                response = call_with_retry(
+                    _ENDPOINT_RESPONSES,
+                    lambda: client.responses.parse(**request, text_format=response_format),
+                )
+                path = _PATH_TEXT_FORMAT
             parsed = getattr(response, "output_parsed", None)
+            _log_parse_attempt(path, response_format, t0, parsed, "output_parsed_empty")
             if parsed is not None:
-                log_event(
-                    "llm_parse_structured_attempt",
-                    path="responses.parse_text_format",
-                    success=True,
-                    duration_ms=duration_ms,
-                    response_format=str(
-                        getattr(response_format, "__name__", response_format)
-                    ),
-                )
                 return parsed
-            log_event(
-                "llm_parse_structured_attempt",
-                path="responses.parse_text_format",
-                success=False,
-                duration_ms=duration_ms,
-                reason="output_parsed_empty",
-                response_format=str(
-                    getattr(response_format, "__name__", response_format)
-                ),
-            )
         except Exception as exc:
             # Only fallback for likely SDK capability/signature issues.
             primary_error = exc
-            message = str(exc).lower()
-            if not any(marker in message for marker in LLM_COMPATIBILITY_MARKERS):
+            if not _is_compatibility_error(exc):
                 raise LLMClientError("Structured parse request failed.") from exc
 
         # Fallback path: beta chat completions parse.
         try:
             t0 = time.perf_counter()
-            response = client.beta.chat.completions.parse(
-                model=settings.OPENAI_MODEL,
-                temperature=(
-                    temperature
-                    if temperature is not None
-                    else settings.OPENAI_TEMPERATURE
+            response = call_with_retry(
+                _PATH_BETA_CHAT,
+                lambda: client.beta.chat.completions.parse(
+                    model=settings.OPENAI_MODEL,
+                    temperature=temperature,
+                    max_tokens=max_tokens,
+                    messages=messages,
+                    response_format=response_format,
+                    timeout=settings.OPENAI_TIMEOUT_SEC,
                 ),
-                max_tokens=(
-                    max_output_tokens
-                    if max_output_tokens is not None
-                    else settings.OPENAI_MAX_OUTPUT_TOKENS
-                ),
-                messages=messages,
-                response_format=response_format,
-                timeout=settings.OPENAI_TIMEOUT_SEC,
             )
-            duration_ms = int((time.perf_counter() - t0) * 1000)
             parsed = response.choices[0].message.parsed if response.choices else None
+            _log_parse_attempt(_PATH_BETA_CHAT, response_format, t0, parsed, "parsed_empty")
             if parsed is not None:
-                log_event(
-                    "llm_parse_structured_attempt",
-                    path="beta.chat.completions.parse",
-                    success=True,
-                    duration_ms=duration_ms,
-                    response_format=str(
-                        getattr(response_format, "__name__", response_format)
+                return parsed
+        except Exception as exc:
+            if primary_error is not None:
+                raise LLMClientError(
+                    "Structured parse failed in primary and fallback paths."
+                ) from primary_error
+            raise LLMClientError("Structured parse request failed.") from exc
+
+        raise LLMClientError("Structured parse returned no parsed output.")
+
+    async def aparse_structured(
+        self,
+        *,
+        system_prompt: str,
+        user_prompt: str,
+        response_format: type[TModel],
+        conversation_messages: list[dict[str, Any]] | None = None,
+        temperature: float | None = None,
+        max_output_tokens: int | None = None,
+        bypass_cache: bool = False,
+        hedge_after_sec: float | None = None,
+    ) -> TModel:
+        """Awaitable `parse_structured` on the event loop's pooled async client."""
+        messages = _build_messages(system_prompt, user_prompt, conversation_messages)
+        temperature, max_tokens = _sampling(temperature, max_output_tokens)
+        stage = _format_name(response_format)
+        cache, key, cached = _cache_lookup(
+            stage=stage,
+            messages=messages,
+            temperature=temperature,
+            max_tokens=max_tokens,
+            response_format=response_format,
+            bypass_cache=bypass_cache,
+        )
+        if cached is not None:
+            return response_format.model_validate_json(cached)
+        parsed = await ahedged_call(
+            lambda: self._aparse_structured_uncached(
+                messages, response_format, temperature, max_tokens
+            ),
+            hedge_after_sec or 0.0,
+        )
+        if cache is not None:
+            cache.put(
+                key, parsed.model_dump_json(), model=settings.OPENAI_MODEL, stage=stage
+            )
+        return parsed
+
+    async def _aparse_structured_uncached(
+        self,
+        messages: list[dict[str, Any]],
+        response_format: type[TModel],
+        temperature: float,
+        max_tokens: int,
+    ) -> TModel:
+        """Awaitable `_parse_structured_uncached`."""
+        client = shared_async_openai_client()
+        request: dict[str, Any] = {
+            "model": settings.OPENAI_MODEL,
+            "input": messages,
+            "temperature": temperature,
+            "max_output_tokens": max_tokens,
+            "timeout": settings.OPENAI_TIMEOUT_SEC,
+        }
+
+        primary_error: Exception | None = None
+        try:
+            t0 = time.perf_counter()
+            try:
+                response = await acall_with_retry(
+                    _ENDPOINT_RESPONSES,
+                    lambda: client.responses.parse(
+                        **request, response_format=response_format
                     ),
                 )
+                path = _PATH_RESPONSE_FORMAT
+            except TypeError:
+                t0 = time.perf_counter()
+                response = await acall_with_retry(
+                    _ENDPOINT_RESPONSES,
+                    lambda: client.responses.parse(**request, text_format=response_format),
+                )
+                path = _PATH_TEXT_FORMAT
+            parsed = getattr(response, "output_parsed", None)
+            _log_parse_attempt(path, response_format, t0, parsed, "output_parsed_empty")
+            if parsed is not None:
                 return parsed
-            log_event(
-                "llm_parse_structured_attempt",
-                path="beta.chat.completions.parse",
-                success=False,
-                duration_ms=duration_ms,
-                reason="parsed_empty",
-                response_format=str(
-                    getattr(response_format, "__name__", response_format)
+        except Exception as exc:
+            primary_error = exc
+            if not _is_compatibility_error(exc):
+                raise LLMClientError("Structured parse request failed.") from exc
+
+        try:
+            t0 = time.perf_counter()
+            response = await acall_with_retry(
+                _PATH_BETA_CHAT,
+                lambda: client.beta.chat.completions.parse(
+                    model=settings.OPENAI_MODEL,
+                    temperature=temperature,
+                    max_tokens=max_tokens,
+                    messages=messages,
+                    response_format=response_format,
+                    timeout=settings.OPENAI_TIMEOUT_SEC,
                 ),
             )
+            parsed = response.choices[0].message.parsed if response.choices else None
+            _log_parse_attempt(_PATH_BETA_CHAT, response_format, t0, parsed, "parsed_empty")
+            if parsed is not None:
+                return parsed
         except Exception as exc:
             if primary_error is not None:
                 raise LLMClientError(
@@ -0,0 +1,328 @@
+"""Retry, circuit breaking and request hedging for LLM endpoint calls.
+
+Transient provider errors (429, 408/409, 5xx, connection drops and timeouts)
+are retried with exponential backoff and full jitter, waiting at least as long
+as a `Retry-After` header asks. Every endpoint has a circuit breaker that opens
+after consecutive transient failures and fails fast until a probe succeeds.
+"""
+
+from __future__ import annotations
+
+import asyncio
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from email.utils import parsedate_to_datetime
+import random
+import threading
+import time
+from typing import Any, Awaitable, Callable, TypeVar
+
+from config.settings import settings
+from src.utils.logging import log_event
+
+TResult = TypeVar("TResult")
+
+RETRYABLE_STATUS_CODES: frozenset[int] = frozenset({408, 409, 429, 500, 502, 503, 504})
+
+
+class LLMCircuitOpenError(RuntimeError):
+    """Raised without calling the provider while an endpoint's circuit is open."""
+
+
+def is_transient_error(exc: BaseException) -> bool:
+    """Return True for provider errors worth retrying."""
+    try:
+        import openai
+    except Exception:  # pragma: no cover - depends on runtime environment
+        return False
+    if isinstance(exc, (openai.APIConnectionError, openai.APITimeoutError)):
+        return True
+    return (
+        isinstance(exc, openai.APIStatusError)
+        and exc.status_code in RETRYABLE_STATUS_CODES
+    )
+
+
+def retry_after_seconds(exc: BaseException) -> float | None:
+    """Return the delay a `Retry-After`/`retry-after-ms` response header asks for."""
+    response = getattr(exc, "response", None)
+    headers = getattr(response, "headers", None)
+    if headers is None:
+        return None
+    milliseconds = headers.get("retry-after-ms")
+    if milliseconds:
+        try:
+            return max(0.0, float(milliseconds) / 1000)
+        except ValueError:
+            pass
+    value = headers.get("retry-after")
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+def backoff_delay(attempt: int, retry_after: float | None) -> float | None:
+    """Return the wait before retry number `attempt` (1-based), or None to give up.
+
+    Full jitter over `LLM_RETRY_BASE_DELAY_SEC * 2**(attempt-1)`, capped at
+    `LLM_RETRY_MAX_DELAY_SEC`. A server-requested delay is a lower bound; one
+    beyond the cap ends the retries.
+    """
+    cap = settings.LLM_RETRY_MAX_DELAY_SEC
+    delay = random.uniform(
+        0.0, min(cap, settings.LLM_RETRY_BASE_DELAY_SEC * 2 ** (attempt - 1))
+    )
+    if retry_after is None:
+        return delay
+    if retry_after > cap:
+        return None
+    return max(delay, retry_after)
+
+
+class CircuitBreaker:
+    """Consecutive-failure circuit breaker for one endpoint.
+
+    Closed: calls pass. After `failure_threshold` consecutive transient
+    failures the circuit opens and calls fail fast for `reset_timeout_sec`.
+    Then a single probe call is let through (half-open); its outcome closes
+    or re-opens the circuit.
+    """
+
+    def __init__(
+        self, endpoint: str, *, failure_threshold: int, reset_timeout_sec: float
+    ) -> None:
+        self.endpoint = endpoint
+        self.failure_threshold = failure_threshold
+        self.reset_timeout_sec = reset_timeout_sec
+        self._failures = 0
+        self._opened_at: float | None = None
+        self._probing = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            if self._opened_at is None:
+                return "closed"
+            if time.monotonic() - self._opened_at >= self.reset_timeout_sec:
+                return "half_open"
+            return "open"
+
+    def before_call(self) -> None:
+        """Raise `LLMCircuitOpenError` unless a call may go to the provider."""
+        with self._lock:
+            if self._opened_at is None:
+                return
+            elapsed = time.monotonic() - self._opened_at
+            if elapsed >= self.reset_timeout_sec and not self._probing:
+                self._probing = True
+                return
+        raise LLMCircuitOpenError(
+            f"Circuit for {self.endpoint} is open after repeated provider failures."
+        )
+
+    def record_success(self) -> None:
+        with self._lock:
+            reopened = self._opened_at is not None
+            self._failures = 0
+            self._opened_at = None
+            self._probing = False
+        if reopened:
+            log_event("llm_circuit_closed", endpoint=self.endpoint)
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+            trip = self._probing or (
+                self._opened_at is None and self._failures >= self.failure_threshold
+            )
+            if trip:
+                self._opened_at = time.monotonic()
+            self._probing = False
+        if trip:
+            log_event(
+                "llm_circuit_opened",
+                endpoint=self.endpoint,
+                consecutive_failures=self._failures,
+                reset_timeout_sec=self.reset_timeout_sec,
+            )
+
+    def release_probe(self) -> None:
+        """End a probe whose call failed for a non-provider reason."""
+        with self._lock:
+            self._probing = False
+
+
+_BREAKERS: dict[str, CircuitBreaker] = {}
+_BREAKERS_LOCK = threading.Lock()
+
+
+def circuit_breaker(endpoint: str) -> CircuitBreaker:
+    """Return the process-wide circuit breaker of an endpoint."""
+    with _BREAKERS_LOCK:
+        breaker = _BREAKERS.get(endpoint)
+        if breaker is None:
+            breaker = CircuitBreaker(
+                endpoint,
+                failure_threshold=settings.LLM_CIRCUIT_FAILURE_THRESHOLD,
+                reset_timeout_sec=settings.LLM_CIRCUIT_RESET_SEC,
+            )
+            _BREAKERS[endpoint] = breaker
+        return breaker
+
+
+def _after_failure(
+    breaker: CircuitBreaker, endpoint: str, attempt: int, exc: Exception
+) -> float | None:
+    """Book a failed attempt; return the wait before retrying, or None to raise."""
+    if not is_transient_error(exc):
+        breaker.release_probe()
+        return None
+    breaker.record_failure()
+    if attempt >= settings.LLM_RETRY_MAX_ATTEMPTS:
+        return None
+    retry_after = retry_after_seconds(exc)
+    delay = backoff_delay(attempt, retry_after)
+    if delay is not None:
+        log_event(
+            "llm_retry_scheduled",
+            endpoint=endpoint,
+            attempt=attempt,
+            delay_sec=round(delay, 3),
+            retry_after_sec=retry_after,
+            error=type(exc).__name__,
+        )
+    return delay
+
+
+def call_with_retry(endpoint: str, call: Callable[[], TResult]) -> TResult:
+    """Run a provider call under the endpoint's breaker, retrying transient errors."""
+    breaker = circuit_breaker(endpoint)
+    attempt = 0
+    while True:
+        attempt += 1
+        breaker.before_call()
+        try:
+            result = call()
+        except Exception as exc:
+            delay = _after_failure(breaker, endpoint, attempt, exc)
+            if delay is None:
+                raise
+            time.sleep(delay)
+            continue
+        breaker.record_success()
+        return result
+
+
+async def acall_with_retry(
+    endpoint: str, call: Callable[[], Awaitable[TResult]]
+) -> TResult:
+    """Awaitable `call_with_retry`; `call` returns a fresh awaitable per attempt."""
+    breaker = circuit_breaker(endpoint)
+    attempt = 0
+    while True:
+        attempt += 1
+        breaker.before_call()
+        try:
+            result = await call()
+        except asyncio.CancelledError:
+            breaker.release_probe()
+            raise
+        except Exception as exc:
+            delay = _after_failure(breaker, endpoint, attempt, exc)
+            if delay is None:
+                raise
+            await asyncio.sleep(delay)
+            continue
+        breaker.record_success()
+        return result
+
+
+# Hedged attempts run here; a losing request is not interrupted and its result
+# is discarded when it completes. Submissions take a slot first, so they never
+# queue behind busy threads: without a slot a call runs unhedged instead.
+_HEDGE_POOL = ThreadPoolExecutor(
+    max_workers=settings.LLM_HEDGE_MAX_WORKERS, thread_name_prefix="llm-hedge"
+)
+_HEDGE_SLOTS = threading.BoundedSemaphore(settings.LLM_HEDGE_MAX_WORKERS)
+
+
+def _submit_hedge_attempt(call: Callable[[], TResult]) -> Future[TResult] | None:
+    """Run `call` on a free hedge thread, or return None when all are busy."""
+    if not _HEDGE_SLOTS.acquire(blocking=False):
+        return None
+    future = _HEDGE_POOL.submit(call)
+    future.add_done_callback(lambda _future: _HEDGE_SLOTS.release())
+    return future
+
+
+def _first_success(futures: list[Future[Any]]) -> Any:
+    """Return the first successful result, or raise the primary's error."""
+    pending = set(futures)
+    while pending:
+        done, pending = wait(pending, return_when=FIRST_COMPLETED)
+        for future in done:
+            if future.exception() is None:
+                if future is not futures[0]:
+                    log_event("llm_hedge_won", status="ok")
+                return future.result()
+    return futures[0].result()
+
+
+def hedged_call(call: Callable[[], TResult], delay_sec: float) -> TResult:
+    """Run `call`; if it has not finished after `delay_sec`, race a duplicate.
+
+    Returns whichever attempt succeeds first. When the hedge threads are all
+    busy, `call` runs unhedged on the caller's thread (or the duplicate is
+    skipped), so hedging never caps concurrent requests.
+    """
+    if delay_sec <= 0:
+        return call()
+    primary = _submit_hedge_attempt(call)
+    if primary is None:
+        log_event("llm_hedge_skipped", reason="pool_busy")
+        return call()
+    done, _ = wait([primary], timeout=delay_sec)
+    if done:
+        return primary.result()
+    hedge = _submit_hedge_attempt(call)
+    if hedge is None:
+        log_event("llm_hedge_skipped", reason="pool_busy")
+        return primary.result()
+    log_event("llm_hedge_fired", delay_sec=delay_sec)
+    return _first_success([primary, hedge])
+
+
+async def ahedged_call(
+    call: Callable[[], Awaitable[TResult]], delay_sec: float
+) -> TResult:
+    """Awaitable `hedged_call`; the losing attempt is cancelled."""
+    if delay_sec <= 0:
+        return await call()
+    primary = asyncio.ensure_future(call())
+    done, _ = await asyncio.wait({primary}, timeout=delay_sec)
+    if done:
+        return primary.result()
+    log_event("llm_hedge_fired", delay_sec=delay_sec)
+    hedge = asyncio.ensure_future(call())
+    tasks = [primary, hedge]
+    try:
+        pending = set(tasks)
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if not task.cancelled() and task.exception() is None:
+                    if task is hedge:
+                        log_event("llm_hedge_won", status="ok")
+                    return task.result()
+        return primary.result()
+    finally:
+        for task in tasks:
+            if not task.done():
+                task.cancel()
@@ -0,0 +1,470 @@
+"""Vectorized executor for structured query plans (no generated code)."""
+
+from __future__ import annotations
+
+from functools import reduce
+import operator
+from typing import Any, Callable
+
+import numpy as np
+import pandas as pd
+
+from src.data.constants import PERIOD_KEY_COLUMNS
+from src.data.cube import CUBE_DIMENSIONS, CUBE_TIME_GRAINS, PnlCube
+from src.data.indexes import RowIndex
+from src.data.periods import period_ordinal
+
+PNL_VALUE_COLUMNS: tuple[str, ...] = ("revenue_total", "expenses_total", "net_pnl")
+
+_VALUE_COUNTS: dict[str, tuple[int, int | None]] = {
+    "eq": (1, 1),
+    "ne": (1, 1),
+    "gt": (1, 1),
+    "gte": (1, 1),
+    "lt": (1, 1),
+    "lte": (1, 1),
+    "contains": (1, 1),
+    "between": (2, 2),
+    "in": (1, None),
+    "not_in": (1, None),
+    "is_null": (0, 0),
+    "not_null": (0, 0),
+}
+
+# Rough selectivity rank of residual predicates: most selective runs first, so
+# every later mask is evaluated over fewer rows.
+_SELECTIVITY_RANK: dict[str, int] = {
+    "eq": 0,
+    "is_null": 1,
+    "in": 2,
+    "between": 3,
+    "gt": 4,
+    "gte": 4,
+    "lt": 4,
+    "lte": 4,
+    "contains": 5,
+    "ne": 6,
+    "not_in": 6,
+    "not_null": 7,
+}
+
+
+# Range operators evaluated on the integer period key of period columns.
+_PERIOD_KEY_OPS: dict[str, Callable[[pd.Series, int], pd.Series] | None] = {
+    "between": None,
+    "gt": operator.gt,
+    "gte": operator.ge,
+    "lt": operator.lt,
+    "lte": operator.le,
+}
+
+
+class QueryPlanError(ValueError):
+    """Raised when a structured plan is invalid for the dataset."""
+
+
+def _value_dtype(series: pd.Series) -> Any:
+    dtype = series.dtype
+    if isinstance(dtype, pd.CategoricalDtype):
+        return dtype.categories.dtype
+    return dtype
+
+
+def plan_operand_text(value: Any) -> str:
+    """Render a plan operand as text, writing whole numbers without ".0".
+
+    JSON plans may carry `2025` for the year column; compared as text it must
+    read "2025", not "2025.0".
+    """
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        if float(value).is_integer():
+            return str(int(value))
+    return str(value)
+
+
+def coerce_plan_operands(
+    column: str, values: list[Any], *, numeric: bool, integer: bool
+) -> list[Any]:
+    """Cast plan operands to a column value type (numbers or strings).
+
+    Shared by the pandas and DuckDB engines; the caller decides from the column
+    type whether it is numeric and, if so, integer.
+    """
+    if not numeric:
+        return [plan_operand_text(value) for value in values]
+    try:
+        numbers = [float(value) for value in values]
+    except (TypeError, ValueError) as exc:
+        raise QueryPlanError(
+            f"Non-numeric operand for numeric column `{column}`"
+        ) from exc
+    if integer:
+        return [int(value) if value.is_integer() else value for value in numbers]
+    return numbers
+
+
+def _coerce_values(series: pd.Series, values: list[Any]) -> list[Any]:
+    """Cast plan operands to the value type of `series`."""
+    dtype = _value_dtype(series)
+    numeric = pd.api.types.is_numeric_dtype(dtype)
+    return coerce_plan_operands(
+        str(series.name),
+        values,
+        numeric=numeric,
+        integer=numeric and pd.api.types.is_integer_dtype(dtype),
+    )
+
+
+def validate_query_plan(plan: dict[str, Any], columns: pd.Index) -> None:
+    """Check columns, operand counts and output names; raise `QueryPlanError`."""
+    available = set(columns)
+
+    def require(column: str, role: str) -> None:
+        if column not in available:
+            raise QueryPlanError(f"Unknown {role} column `{column}`")
+
+    for predicate in plan.get("filters", []):
+        require(predicate["column"], "filter")
+        low, high = _VALUE_COUNTS[predicate["op"]]
+        count = len(predicate.get("values", []))
+        if count < low or (high is not None and count > high):
+            raise QueryPlanError(
+                f"`{predicate['op']}` on `{predicate['column']}` got {count} values"
+            )
+    for column in plan.get("columns", []):
+        require(column, "projection")
+    for column in plan.get("group_by", []):
+        require(column, "group_by")
+    aggregations = plan.get("aggregations", [])
+    for aggregation in aggregations:
+        require(aggregation["column"], "aggregation")
+
+    aggregated = bool(aggregations or plan.get("derive_pnl"))
+    if aggregated and (plan.get("columns") or plan.get("distinct")):
+        raise QueryPlanError("Projection/distinct cannot be combined with aggregation")
+    if plan.get("group_by") and not aggregated:
+        raise QueryPlanError("group_by requires aggregations or derive_pnl")
+    if plan.get("derive_pnl"):
+        require("ledger_type", "P&L")
+        require("profit", "P&L")
+
+    output_columns = _output_columns(plan, columns)
+    if len(set(output_columns)) != len(output_columns):
+        raise QueryPlanError("Output column names must be unique")
+    for key in plan.get("sort", []):
+        if key["column"] not in output_columns:
+            raise QueryPlanError(f"Sort column `{key['column']}` is not in the output")
+    limit = plan.get("limit")
+    if limit is not None and limit < 0:
+        raise QueryPlanError("limit must not be negative")
+
+
+def _output_columns(plan: dict[str, Any], columns: pd.Index) -> list[str]:
+    """Return the column names the plan produces."""
+    if plan.get("aggregations") or plan.get("derive_pnl"):
+        names = [*plan.get("group_by", [])]
+        names += [aggregation["alias"] for aggregation in plan.get("aggregations", [])]
+        if plan.get("derive_pnl"):
+            names += PNL_VALUE_COLUMNS
+        return names
+    return list(plan.get("columns") or columns)
+
+
+def _cube_lookup(cube: PnlCube, plan: dict[str, Any]) -> dict[str, Any] | None:
+    """Answer a pure P&L plan from the cube, or None when the plan does not fit it."""
+    if not plan.get("derive_pnl") or plan.get("aggregations"):
+        return None
+    group_by = list(plan.get("group_by", []))
+    dimensions = {column for column in group_by if column in CUBE_DIMENSIONS}
+    grains = [column for column in group_by if column in CUBE_TIME_GRAINS]
+    if len(dimensions) + len(grains) != len(group_by) or len(grains) > 1:
+        return None
+
+    masks: list[tuple[str, str, list[Any]]] = []
+    time_columns: set[str] = set()
+    for predicate in plan.get("filters", []):
+        column, op = predicate["column"], predicate["op"]
+        values = [plan_operand_text(value) for value in predicate.get("values", [])]
+        if column in CUBE_DIMENSIONS and op in ("eq", "in", "not_null"):
+            dimensions.add(column)
+        elif column in CUBE_TIME_GRAINS and op in ("eq", "in", "between"):
+            time_columns.add(column)
+        else:
+            return None
+        masks.append((column, op, values))
+
+    candidate_grains = [*grains, *time_columns]
+    # CUBE_TIME_GRAINS runs finest first; finer levels carry coarser period keys.
+    grain = (
+        min(candidate_grains, key=CUBE_TIME_GRAINS.index) if candidate_grains else None
+    )
+    frame = cube.level(tuple(dimensions), grain)
+    mask = np.ones(len(frame), dtype=bool)
+    for column, op, values in masks:
+        series = frame[column]
+        if op == "not_null":
+            mask &= series.notna().to_numpy()
+        elif op == "between":
+            period = series.astype(str)
+            mask &= ((period >= values[0]) & (period <= values[1])).to_numpy()
+        else:
+            mask &= series.isin(values).to_numpy()
+    matched = frame[mask]
+    value_columns = list(PNL_VALUE_COLUMNS)
+    if group_by:
+        result_df = (
+            matched.groupby(group_by, dropna=False, sort=True)[value_columns]
+            .sum()
+            .reset_index()
+        )
+    else:
+        result_df = matched[value_columns].sum().to_frame().T
+    return {"result_df": result_df, "filtered_row_count": int(len(matched))}
+
+
+def _index_positions(
+    dataframe: pd.DataFrame,
+    filters: list[dict[str, Any]],
+    row_index: RowIndex | None,
+) -> tuple[np.ndarray | None, list[dict[str, Any]]]:
+    """Resolve indexed eq/in predicates to row positions, smallest set first.
+
+    Returns the intersected positions (None when no predicate was indexed) and
+    the predicates left for masking.
+    """
+    if row_index is None or row_index.row_count != len(dataframe):
+        return None, filters
+    position_sets: list[np.ndarray] = []
+    residual: list[dict[str, Any]] = []
+    for predicate in filters:
+        column = predicate["column"]
+        if predicate["op"] in ("eq", "in") and column in row_index.columns:
+            values = _coerce_values(dataframe[column], predicate["values"])
+            position_sets.append(row_index.lookup(column, values))
+        else:
+            residual.append(predicate)
+    if not position_sets:
+        return None, residual
+    position_sets.sort(key=len)
+    positions = reduce(
+        lambda left, right: np.intersect1d(left, right, assume_unique=True),
+        position_sets,
+    )
+    return positions, residual
+
+
+def _period_bounds(
+    dataframe: pd.DataFrame, filters: list[dict[str, Any]]
+) -> tuple[int, int, list[dict[str, Any]]]:
+    """Turn period `between` predicates into one contiguous row range.
+
+    Only applies to frames sorted by period key (the loaded dataset); other
+    predicates, or all of them on unsorted frames, are returned for masking.
+    """
+    first, last = 0, len(dataframe)
+    residual: list[dict[str, Any]] = []
+    for predicate in filters:
+        key_column = PERIOD_KEY_COLUMNS.get(predicate["column"])
+        if (
+            predicate["op"] != "between"
+            or key_column not in dataframe.columns
+            or not dataframe[key_column].is_monotonic_increasing
+        ):
+            residual.append(predicate)
+            continue
+        try:
+            low, high = (
+                period_ordinal(predicate["column"], plan_operand_text(value))
+                for value in predicate["values"]
+            )
+        except ValueError as exc:
+            raise QueryPlanError(str(exc)) from exc
+        keys = dataframe[key_column].to_numpy()
+        first = max(first, int(np.searchsorted(keys, low, side="left")))
+        last = min(last, int(np.searchsorted(keys, high, side="right")))
+    return first, max(first, last), residual
+
+
+def _predicate_mask(frame: pd.DataFrame, predicate: dict[str, Any]) -> pd.Series:
+    """Evaluate one predicate over `frame` as a boolean mask."""
+    column, op = predicate["column"], predicate["op"]
+    series = frame[column]
+    if op == "is_null":
+        return series.isna()
+    if op == "not_null":
+        return series.notna()
+    if op == "contains":
+        return (
+            series.astype(str).str.contains(
+                plan_operand_text(predicate["values"][0]), case=False, regex=False
+            )
+            & series.notna()
+        )
+    if op in _PERIOD_KEY_OPS and column in PERIOD_KEY_COLUMNS:
+        # Integer keys order periods without comparing tokens, which ordered
+        # period categoricals only allow for tokens present in the data.
+        try:
+            bounds = [
+                period_ordinal(column, plan_operand_text(value))
+                for value in predicate["values"]
+            ]
+        except ValueError as exc:
+            raise QueryPlanError(str(exc)) from exc
+        keys = frame[PERIOD_KEY_COLUMNS[column]]
+        if op == "between":
+            return (keys >= bounds[0]) & (keys <= bounds[1])
+        return _PERIOD_KEY_OPS[op](keys, bounds[0])
+
+    values = _coerce_values(series, predicate["values"])
+    if op == "in":
+        return series.isin(values)
+    if op == "not_in":
+        return ~series.isin(values) & series.notna()
+    if op == "between":
+        return (series >= values[0]) & (series <= values[1])
+    value = values[0]
+    if op == "eq":
+        return series == value
+    if op == "ne":
+        return (series != value) & series.notna()
+    if op == "gt":
+        return series > value
+    if op == "gte":
+        return series >= value
+    if op == "lt":
+        return series < value
+    return series <= value
+
+
+def _selectivity_order(predicate: dict[str, Any]) -> tuple[int, int]:
+    return _SELECTIVITY_RANK[predicate["op"]], len(predicate.get("values", []))
+
+
+def _required_columns(
+    plan: dict[str, Any], residual: list[dict[str, Any]], columns: pd.Index
+) -> list[str]:
+    """Return the source columns the plan reads after row selection."""
+    needed: set[str] = set()
+    for predicate in residual:
+        needed.add(predicate["column"])
+        key_column = PERIOD_KEY_COLUMNS.get(predicate["column"])
+        if key_column is not None and predicate["op"] in _PERIOD_KEY_OPS:
+            needed.add(key_column)
+    needed.update(plan.get("group_by", []))
+    needed.update(aggregation["column"] for aggregation in plan.get("aggregations", []))
+    if plan.get("derive_pnl"):
+        needed.update(("ledger_type", "profit"))
+    if not (plan.get("aggregations") or plan.get("derive_pnl")):
+        needed.update(plan.get("columns") or columns)
+    return [column for column in columns if column in needed]
+
+
+def _aggregate(frame: pd.DataFrame, plan: dict[str, Any]) -> pd.DataFrame:
+    """Run every aggregation (and P&L derivation) in one grouped pass."""
+    named: dict[str, tuple[str, str]] = {
+        aggregation["alias"]: (aggregation["column"], aggregation["func"])
+        for aggregation in plan.get("aggregations", [])
+    }
+    if plan.get("derive_pnl"):
+        profit = frame["profit"]
+        ledger_type = frame["ledger_type"]
+        frame = frame.assign(
+            revenue_total=profit.where(ledger_type == "revenue", 0.0),
+            expenses_total=profit.where(ledger_type == "expenses", 0.0),
+        )
+        named["revenue_total"] = ("revenue_total", "sum")
+        named["expenses_total"] = ("expenses_total", "sum")
+
+    group_by = list(plan.get("group_by", []))
+    if group_by:
+        result_df = (
+            frame.groupby(group_by, dropna=False, sort=True, observed=True)
+            .agg(**named)
+            .reset_index()
+        )
+    else:
+        result_df = pd.DataFrame(
+            {
+                alias: [frame[column].agg(func)]
+                for alias, (column, func) in named.items()
+            }
+        )
+    if plan.get("derive_pnl"):
+        result_df["net_pnl"] = result_df["revenue_total"] + result_df["expenses_total"]
+    return result_df
+
+
+def _finish(result_df: pd.DataFrame, plan: dict[str, Any]) -> pd.DataFrame:
+    """Apply sort and limit."""
+    sort_keys = plan.get("sort", [])
+    if sort_keys:
+        result_df = result_df.sort_values(
+            [key["column"] for key in sort_keys],
+            ascending=[bool(key.get("ascending", True)) for key in sort_keys],
+            kind="stable",
+        )
+    if plan.get("limit") is not None:
+        result_df = result_df.head(int(plan["limit"]))
+    return result_df.reset_index(drop=True)
+
+
+def execute_query_plan(
+    dataframe: pd.DataFrame,
+    plan: dict[str, Any],
+    *,
+    row_index: RowIndex | None = None,
+    cube: PnlCube | None = None,
+) -> dict[str, Any]:
+    """Execute a structured plan; mirrors `execute_generated_python_code` output.
+
+    Pure P&L plans are answered from `cube` when given. Otherwise indexed eq/in
+    predicates resolve to row positions and period ranges to a binary-searched
+    row range; only the columns the plan reads are gathered for those rows, and
+    the remaining predicates are applied most selective first. The extra
+    `plan_path` and `filter_order` keys describe how the plan ran.
+    """
+    validate_query_plan(plan, dataframe.columns)
+
+    if cube is not None:
+        cube_execution = _cube_lookup(cube, plan)
+        if cube_execution is not None:
+            return {
+                "result_df": _finish(cube_execution["result_df"], plan),
+                "filtered_row_count": cube_execution["filtered_row_count"],
+                "result_payload": None,
+                "plan_path": "cube",
+                "filter_order": [],
+            }
+
+    filters = list(plan.get("filters", []))
+    positions, filters = _index_positions(dataframe, filters, row_index)
+    first, last, residual = _period_bounds(dataframe, filters)
+    residual.sort(key=_selectivity_order)
+
+    frame = dataframe[_required_columns(plan, residual, dataframe.columns)]
+    if positions is not None:
+        positions = positions[(positions >= first) & (positions < last)]
+        frame = frame.iloc[positions]
+    elif (first, last) != (0, len(dataframe)):
+        frame = frame.iloc[first:last]
+    for predicate in residual:
+        if frame.empty:
+            break
+        frame = frame[_predicate_mask(frame, predicate)]
+    filtered_row_count = int(len(frame))
+
+    if plan.get("aggregations") or plan.get("derive_pnl"):
+        result_df = _aggregate(frame, plan)
+    else:
+        result_df = frame[plan.get("columns") or list(dataframe.columns)]
+        if plan.get("distinct"):
+            result_df = result_df.drop_duplicates()
+    return {
+        "result_df": _finish(result_df, plan),
+        "filtered_row_count": filtered_row_count,
+        "result_payload": None,
+        "plan_path": "rows",
+        "filter_order": [
+            f"{predicate['column']}:{predicate['op']}" for predicate in residual
+        ],
+    }
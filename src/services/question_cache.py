@@ -0,0 +1,352 @@
+"""Near-duplicate question cache backed by a local character n-gram TF-IDF index.
+
+Rephrasings of a past question ("P&L 2024 Q1" / "show me profit and loss for
+2024-Q1") reuse its intent+extraction output and, once its plan executed, its
+generated query plan, so only the answer stage calls the LLM again. Nothing
+leaves the process: questions are normalized, split into character trigrams
+and compared by TF-IDF cosine similarity.
+
+Similarity alone never decides a hit. Both questions must mention the same
+canonical entities (dataset values, periods, numbers and modifier words such
+as "top" or "last", detected locally), and only questions whose extraction is
+grounded in their own text are indexed, so answers that relied on earlier
+conversation turns are never replayed.
+"""
+
+from __future__ import annotations
+
+from collections import Counter, OrderedDict
+import copy
+import hashlib
+import json
+import math
+import re
+import threading
+from typing import Any
+
+from config.matching_rules import (
+    MISSING_CHECK_COLUMNS,
+    QUESTION_MODIFIER_TERMS,
+    QUESTION_STOPWORDS,
+    QUESTION_SYNONYMS,
+)
+from config.month_labels import MONTH_LABELS
+from config.settings import settings
+
+_NGRAM = 3
+
+_MONTH_NUMBERS: dict[str, str] = {}
+for _token, _label in MONTH_LABELS.items():
+    _MONTH_NUMBERS[_label.lower()] = _token[1:]
+    _MONTH_NUMBERS[_label.lower()[:3]] = _token[1:]
+_MONTH_NAMES = "|".join(sorted(_MONTH_NUMBERS, key=len, reverse=True))
+
+# Rewrites applied to normalized text, turning period spellings into single
+# tokens: 2024q1 (quarter) and 2024m03 (month).
+_PERIOD_REWRITES: tuple[tuple[re.Pattern[str], Any], ...] = (
+    (re.compile(r"\b(\d{4}) q([1-4])\b"), lambda m: f"{m[1]}q{m[2]}"),
+    (re.compile(r"\bq([1-4]) (\d{4})\b"), lambda m: f"{m[2]}q{m[1]}"),
+    (re.compile(r"\b(\d{4}) m(0?[1-9]|1[0-2])\b"), lambda m: f"{m[1]}m{int(m[2]):02d}"),
+    (
+        re.compile(rf"\b({_MONTH_NAMES}) (\d{{4}})\b"),
+        lambda m: f"{m[2]}m{_MONTH_NUMBERS[m[1]]}",
+    ),
+    (
+        re.compile(rf"\b(\d{{4}}) ({_MONTH_NAMES})\b"),
+        lambda m: f"{m[1]}m{_MONTH_NUMBERS[m[2]]}",
+    ),
+)
+_QUARTER_TOKEN = re.compile(r"^(\d{4})q([1-4])$")
+_MONTH_TOKEN = re.compile(r"^(\d{4})m(\d{2})$")
+_BARE_QUARTER_TOKEN = re.compile(r"^q([1-4])$")
+_PERIOD_VALUE = re.compile(r"^(\d{4})(?:-(Q[1-4]|M\d{2}))?$")
+
+
+def _basic_normalize(text: str) -> str:
+    normalized = re.sub(r"[^a-z0-9]+", " ", str(text).lower()).strip()
+    return re.sub(r"\s+", " ", normalized)
+
+
+def normalize_question(text: str) -> str:
+    """Return the canonical word form of a question used for indexing.
+
+    Lowercases, folds synonyms ("profit and loss" -> "pnl"), rewrites period
+    spellings to one token (`2024q1`, `2024m03`) and drops filler words.
+    """
+    normalized = f" {_basic_normalize(text)} "
+    for phrase, replacement in QUESTION_SYNONYMS.items():
+        normalized = normalized.replace(f" {phrase} ", f" {replacement} ")
+    normalized = normalized.strip()
+    for pattern, replacement in _PERIOD_REWRITES:
+        normalized = pattern.sub(replacement, normalized)
+    return " ".join(
+        word for word in normalized.split() if word not in QUESTION_STOPWORDS
+    )
+
+
+def _profile_values(profile: dict[str, Any]) -> list[str]:
+    """Return normalized dimension values of the profile, longest first."""
+    unique_values = profile.get("unique_values", {}) if isinstance(profile, dict) else {}
+    values: set[str] = set()
+    for column in MISSING_CHECK_COLUMNS:
+        raw_values = unique_values.get(column, []) if isinstance(unique_values, dict) else []
+        if isinstance(raw_values, list):
+            values.update(
+                _basic_normalize(value) for value in raw_values if value is not None
+            )
+    values.discard("")
+    return sorted(values, key=len, reverse=True)
+
+
+def question_mentions(text: str, profile: dict[str, Any]) -> frozenset[str]:
+    """Return the canonical entities a question mentions, detected without an LLM.
+
+    Tags cover dataset values (`value=building 180`), periods
+    (`quarter=2024-Q1`, `month=2024-M03`), every number (`number=5`) and
+    modifier words (`rank=highest`, `relative=last`, ...).
+    """
+    mentions: set[str] = set()
+    basic = f" {_basic_normalize(text)} "
+    for value in _profile_values(profile):
+        if f" {value} " in basic:
+            mentions.add(f"value={value}")
+    for word in normalize_question(text).split():
+        if word.isdigit():
+            mentions.add(f"number={int(word)}")
+        elif match := _QUARTER_TOKEN.match(word):
+            mentions.update({f"quarter={match[1]}-Q{match[2]}", f"number={match[1]}"})
+        elif match := _MONTH_TOKEN.match(word):
+            mentions.update({f"month={match[1]}-M{match[2]}", f"number={match[1]}"})
+        elif match := _BARE_QUARTER_TOKEN.match(word):
+            mentions.add(f"quarter=Q{match[1]}")
+        elif word in _MONTH_NUMBERS and len(word) > 3:
+            mentions.add(f"month=M{_MONTH_NUMBERS[word]}")
+        elif word in QUESTION_MODIFIER_TERMS:
+            mentions.add(QUESTION_MODIFIER_TERMS[word])
+    return frozenset(mentions)
+
+
+def _period_mentions(token: Any) -> set[str] | None:
+    """Tags an extracted period token must match; None when it is malformed."""
+    match = _PERIOD_VALUE.match(str(token).strip())
+    if not match:
+        return None
+    tags = {f"number={match[1]}"}
+    if match[2] and match[2].startswith("Q"):
+        tags.add(f"quarter={match[1]}-{match[2]}")
+    elif match[2]:
+        tags.add(f"month={match[1]}-{match[2]}")
+    return tags
+
+
+def extraction_is_grounded(entities: dict[str, Any], mentions: frozenset[str]) -> bool:
+    """Return True when every extracted value and period appears in `mentions`.
+
+    Extractions that filled in values from earlier turns (or guessed values
+    the question never names) are not grounded and must not be reused.
+    """
+    for column in MISSING_CHECK_COLUMNS:
+        values = entities.get(column, [])
+        if not isinstance(values, list):
+            return False
+        for value in values:
+            normalized = _basic_normalize(value)
+            if normalized and f"value={normalized}" not in mentions:
+                return False
+    time_scope = entities.get("time_scope") or {}
+    if not isinstance(time_scope, dict):
+        return False
+    if str(time_scope.get("mode") or "none") == "relative" or time_scope.get(
+        "relative_period"
+    ):
+        return any(tag.startswith("relative=") for tag in mentions)
+    for field in ("month", "quarter", "year", "start", "end"):
+        token = time_scope.get(field)
+        if token in (None, ""):
+            continue
+        tags = _period_mentions(token)
+        if tags is None or not tags <= mentions:
+            return False
+    return True
+
+
+def _ngrams(normalized: str) -> Counter[str]:
+    padded = f" {normalized} "
+    return Counter(padded[i : i + _NGRAM] for i in range(len(padded) - _NGRAM + 1))
+
+
+def _profile_fingerprint(profile: dict[str, Any]) -> str:
+    """Hash of the profile content: cached output is only valid for one profile."""
+    material = json.dumps(profile, sort_keys=True, default=str)
+    return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+
+class QuestionCache:
+    """Bounded in-process index of past questions and their LLM stage outputs.
+
+    Entries hold the intent decision and raw extracted entities of a question,
+    and, once `attach_generated` is called, the generated plan together with
+    the resolved entities it was generated for. Least recently matched entries
+    are evicted past `maxsize`.
+    """
+
+    def __init__(self, maxsize: int, *, min_similarity: float) -> None:
+        self.maxsize = maxsize
+        self.min_similarity = min_similarity
+        self._entries: OrderedDict[str, dict[str, Any]] = OrderedDict()
+        self._postings: dict[str, set[str]] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def _weights(self, grams: Counter[str]) -> dict[str, float]:
+        """L2-normalized TF-IDF weights (caller holds the lock)."""
+        total = len(self._entries)
+        weights = {
+            gram: count
+            * (math.log((1 + total) / (1 + len(self._postings.get(gram, ())))) + 1)
+            for gram, count in grams.items()
+        }
+        norm = math.sqrt(sum(weight * weight for weight in weights.values())) or 1.0
+        return {gram: weight / norm for gram, weight in weights.items()}
+
+    def lookup(
+        self, question: str, profile: dict[str, Any]
+    ) -> tuple[str, dict[str, Any], float] | None:
+        """Return (key, entry copy, similarity) of the best near-duplicate, or None."""
+        normalized = normalize_question(question)
+        if not normalized:
+            return None
+        mentions = question_mentions(question, profile)
+        fingerprint = _profile_fingerprint(profile)
+        grams = _ngrams(normalized)
+        with self._lock:
+            candidates: set[str] = set()
+            for gram in grams:
+                candidates.update(self._postings.get(gram, ()))
+            query_weights = self._weights(grams)
+            best: tuple[float, str] | None = None
+            for key in candidates:
+                entry = self._entries[key]
+                if entry["profile"] != fingerprint or entry["mentions"] != mentions:
+                    continue
+                entry_weights = self._weights(entry["grams"])
+                similarity = sum(
+                    weight * entry_weights.get(gram, 0.0)
+                    for gram, weight in query_weights.items()
+                )
+                if best is None or similarity > best[0]:
+                    best = (similarity, key)
+            if best is None or best[0] < self.min_similarity:
+                self.misses += 1
+                return None
+            similarity, key = best
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return key, copy.deepcopy(self._entries[key]), round(similarity, 4)
+
+    def add(
+        self,
+        question: str,
+        profile: dict[str, Any],
+        decision: dict[str, Any],
+        entities: dict[str, Any],
+    ) -> str | None:
+        """Index a question's intent+extraction output; None when not reusable."""
+        if self.maxsize <= 0:
+            return None
+        normalized = normalize_question(question)
+        mentions = question_mentions(question, profile)
+        if not normalized or not extraction_is_grounded(entities, mentions):
+            return None
+        fingerprint = _profile_fingerprint(profile)
+        key = hashlib.sha256(f"{fingerprint}\n{normalized}".encode("utf-8")).hexdigest()
+        entry = {
+            "question": normalized,
+            "grams": _ngrams(normalized),
+            "mentions": mentions,
+            "profile": fingerprint,
+            "decision": copy.deepcopy(decision),
+            "entities": copy.deepcopy(entities),
+            "generated": None,
+        }
+        with self._lock:
+            self._remove(key)
+            self._entries[key] = entry
+            for gram in entry["grams"]:
+                self._postings.setdefault(gram, set()).add(key)
+            while len(self._entries) > self.maxsize:
+                self._remove(next(iter(self._entries)))
+        return key
+
+    def attach_generated(
+        self, key: str, entities: dict[str, Any], generated: dict[str, Any]
+    ) -> None:
+        """Record the plan generated (and executed) for an indexed question."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                entry["generated"] = {
+                    "entities": copy.deepcopy(entities),
+                    "output": copy.deepcopy(generated),
+                }
+
+    def generated_for(self, key: str, entities: dict[str, Any]) -> dict[str, Any] | None:
+        """Return the recorded plan of `key` if it was generated for `entities`."""
+        with self._lock:
+            entry = self._entries.get(key)
+            generated = entry.get("generated") if entry is not None else None
+            if generated is None or generated["entities"] != entities:
+                return None
+            return copy.deepcopy(generated["output"])
+
+    def _remove(self, key: str) -> None:
+        """Drop one entry and its postings (caller holds the lock)."""
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        for gram in entry["grams"]:
+            keys = self._postings.get(gram)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._postings[gram]
+
+    def clear(self) -> None:
+        """Drop all entries and reset counters."""
+        with self._lock:
+            self._entries.clear()
+            self._postings.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self) -> dict[str, float | int]:
+        """Return size and hit-rate counters."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "maxsize": self.maxsize,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            }
+
+
+_QUESTION_CACHE: QuestionCache | None = None
+_QUESTION_CACHE_LOCK = threading.Lock()
+
+
+def get_question_cache() -> QuestionCache | None:
+    """Return the process-wide question cache, or None when disabled."""
+    global _QUESTION_CACHE
+    if not settings.QUESTION_CACHE_ENABLED:
+        return None
+    if _QUESTION_CACHE is None:
+        with _QUESTION_CACHE_LOCK:
+            if _QUESTION_CACHE is None:
+                _QUESTION_CACHE = QuestionCache(
+                    settings.QUESTION_CACHE_SIZE,
+                    min_similarity=settings.QUESTION_CACHE_MIN_SIMILARITY,
+                )
+    return _QUESTION_CACHE
@@ -1,16 +1,23 @@
 """Response formatting helpers and fallback mapping."""
 
 from __future__ import annotations
-from typing import Any
+from typing import Any, AsyncIterator, Iterable, Iterator
 import json
 import re
+
+import pandas as pd
+
 from config.month_labels import MONTH_LABELS
 from config.settings import settings
 from config.constants import (
+    MSG_CANCELLED,
     MSG_CANNOT_PROCEED,
+    MSG_EXECUTION_TIMEOUT,
     MSG_GIBBERISH,
     MSG_NOT_PRESENT,
     MSG_OUT_OF_SCOPE,
+    MSG_RESOURCE_LIMIT,
+    MSG_SANDBOX_UNAVAILABLE,
 )
 from config.prompts import build_answer_prompt
 from src.data.profiler import build_minimal_prompt_profile_json, get_startup_profile
@@ -37,6 +44,69 @@ def _format_month_tokens(text: str) -> str:
     return re.sub(r"\b(M\d{2})\b", _replace_month_only, formatted)
 
 
+# Trailing whitespace plus the word after it; held back while streaming because
+# a month token may still be incomplete.
+_STREAM_PENDING_TAIL = re.compile(r"\s+\S*\Z")
+
+
+class MonthTokenStreamFormatter:
+    """Apply `_format_month_tokens` to streamed text as it arrives.
+
+    Text is released up to the last whitespace. Month tokens contain no
+    whitespace, so each released piece formats exactly as it would inside the
+    full text. Output is stripped like a non-streamed answer.
+    """
+
+    def __init__(self) -> None:
+        self._pending = ""
+        self._started = False
+
+    def _release(self, text: str) -> str:
+        if not self._started:
+            text = text.lstrip()
+            if not text:
+                return ""
+            self._started = True
+        return _format_month_tokens(text)
+
+    def feed(self, delta: str) -> str:
+        """Add a text delta; return the formatted text that is now final."""
+        self._pending += delta
+        match = _STREAM_PENDING_TAIL.search(self._pending)
+        if match is None:
+            return ""
+        ready = self._pending[: match.start()]
+        self._pending = self._pending[match.start() :]
+        return self._release(ready)
+
+    def flush(self) -> str:
+        """Return the remaining formatted text once the stream has ended."""
+        text, self._pending = self._pending.rstrip(), ""
+        return self._release(text)
+
+
+def _format_stream(deltas: Iterable[str]) -> Iterator[str]:
+    formatter = MonthTokenStreamFormatter()
+    for delta in deltas:
+        text = formatter.feed(delta)
+        if text:
+            yield text
+    text = formatter.flush()
+    if text:
+        yield text
+
+
+async def _aformat_stream(deltas: AsyncIterator[str]) -> AsyncIterator[str]:
+    formatter = MonthTokenStreamFormatter()
+    async for delta in deltas:
+        text = formatter.feed(delta)
+        if text:
+            yield text
+    text = formatter.flush()
+    if text:
+        yield text
+
+
 def fallback_for_error_type(error_type: str) -> str:
     """Map error category to canonical fallback string."""
     mapping = {
@@ -44,10 +114,99 @@ def fallback_for_error_type(error_type: str) -> str:
         "out_of_scope": MSG_OUT_OF_SCOPE,
         "adversarial": MSG_CANNOT_PROCEED,
         "gibberish": MSG_GIBBERISH,
+        "timeout": MSG_EXECUTION_TIMEOUT,
+        "cancelled": MSG_CANCELLED,
+        "resource_limit": MSG_RESOURCE_LIMIT,
+        "sandbox_unavailable": MSG_SANDBOX_UNAVAILABLE,
     }
     return _format_month_tokens(mapping.get(error_type, MSG_NOT_PRESENT))
 
 
+def _unique_column_names(columns: Iterable[Any]) -> list[str]:
+    """Stringify column labels, suffixing repeats with `.1`, `.2`, ..."""
+    names: list[str] = []
+    seen: set[str] = set()
+    for label in columns:
+        base = name = str(label)
+        suffix = 0
+        while name in seen:
+            suffix += 1
+            name = f"{base}.{suffix}"
+        seen.add(name)
+        names.append(name)
+    return names
+
+
+def serialize_result_frame(
+    result_df: pd.DataFrame,
+    *,
+    max_rows: int,
+    task_type: str | None = None,
+    total_rows: int | None = None,
+) -> dict[str, Any]:
+    """Serialize the first `max_rows` rows of a result in columnar JSON form.
+
+    Only the bounded head is converted; `total_rows` defaults to `len()`, and
+    engines that fetch only a bounded head pass the full result size. Each
+    column maps to its list of values (missing values become null); repeated
+    column names are suffixed `a`, `a.1`, ... so no column is dropped.
+    """
+    head = result_df.head(max_rows)
+    columns: dict[str, list[Any]] = {}
+    names = _unique_column_names(head.columns)
+    for position, name in enumerate(names):
+        series = head.iloc[:, position]
+        values = series.tolist()
+        missing = series.isna().tolist()
+        if any(missing):
+            values = [
+                None if is_missing else value
+                for value, is_missing in zip(values, missing)
+            ]
+        columns[name] = values
+    if total_rows is None:
+        total_rows = len(result_df)
+    return {
+        "columns": columns,
+        "row_count": len(head),
+        "total_rows": total_rows,
+        "truncated": total_rows > len(head),
+        "task_type": task_type,
+    }
+
+
+def result_records(computed_result: dict[str, Any]) -> list[dict[str, Any]]:
+    """Rebuild row records from a columnar result payload."""
+    columns = computed_result["columns"]
+    names = list(columns)
+    return [dict(zip(names, row)) for row in zip(*columns.values())]
+
+
+def _answer_request(
+    user_query: str,
+    result_payload: dict[str, Any] | list[dict[str, Any]],
+    profile: dict[str, Any] | None,
+    conversation_messages: list[dict[str, Any]] | None,
+) -> dict[str, Any]:
+    """Build the chat arguments of the final answer call."""
+    profile_data = profile or get_startup_profile()
+    profile_json = build_minimal_prompt_profile_json(profile_data)
+    user_prompt = json.dumps(
+        {"user_query": user_query, "result_json": result_payload},
+        ensure_ascii=True,
+    )
+    return {
+        "system_prompt": build_answer_prompt(profile_json),
+        "user_prompt": user_prompt,
+        "conversation_messages": conversation_messages,
+        "max_output_tokens": settings.OPENAI_MAX_OUTPUT_TOKENS_ANSWER,
+    }
+
+
+def _is_empty_payload(result_payload: dict[str, Any] | list[dict[str, Any]]) -> bool:
+    return json.dumps(result_payload, ensure_ascii=True) in ("{}", "[]")
+
+
 def answer_from_result_with_llm(
     *,
     user_query: str,
@@ -58,23 +217,69 @@ def answer_from_result_with_llm(
 ) -> str:
     """Generate final user-facing answer from extracted result JSON."""
     llm = client or OpenAILLMClient()
-    profile_data = profile or get_startup_profile()
-    profile_json = build_minimal_prompt_profile_json(profile_data)
-    payload_json = json.dumps(result_payload, ensure_ascii=True)
-    if payload_json in ("{}", "[]"):
+    if _is_empty_payload(result_payload):
         return _format_month_tokens(MSG_NOT_PRESENT)
-    user_prompt = json.dumps(
-        {"user_query": user_query, "result_json": result_payload},
-        ensure_ascii=True,
+    request = _answer_request(
+        user_query, result_payload, profile, conversation_messages
+    )
+    return _format_month_tokens(llm.chat_text(**request).strip())
+
+
+async def aanswer_from_result_with_llm(
+    *,
+    user_query: str,
+    result_payload: dict[str, Any] | list[dict[str, Any]],
+    profile: dict[str, Any] | None = None,
+    conversation_messages: list[dict[str, Any]] | None = None,
+    client: OpenAILLMClient | None = None,
+) -> str:
+    """Awaitable `answer_from_result_with_llm`."""
+    llm = client or OpenAILLMClient()
+    if _is_empty_payload(result_payload):
+        return _format_month_tokens(MSG_NOT_PRESENT)
+    request = _answer_request(
+        user_query, result_payload, profile, conversation_messages
     )
-    return _format_month_tokens(
-        llm.chat_text(
-            system_prompt=build_answer_prompt(profile_json),
-            user_prompt=user_prompt,
-            conversation_messages=conversation_messages,
-            max_output_tokens=settings.OPENAI_MAX_OUTPUT_TOKENS_ANSWER,
-        ).strip()
+    return _format_month_tokens((await llm.achat_text(**request)).strip())
+
+
+def stream_answer_from_result_with_llm(
+    *,
+    user_query: str,
+    result_payload: dict[str, Any] | list[dict[str, Any]],
+    profile: dict[str, Any] | None = None,
+    conversation_messages: list[dict[str, Any]] | None = None,
+    client: OpenAILLMClient | None = None,
+) -> Iterator[str]:
+    """Streaming `answer_from_result_with_llm`: yield formatted answer text pieces."""
+    llm = client or OpenAILLMClient()
+    if _is_empty_payload(result_payload):
+        yield _format_month_tokens(MSG_NOT_PRESENT)
+        return
+    request = _answer_request(
+        user_query, result_payload, profile, conversation_messages
+    )
+    yield from _format_stream(llm.stream_chat_text(**request))
+
+
+async def astream_answer_from_result_with_llm(
+    *,
+    user_query: str,
+    result_payload: dict[str, Any] | list[dict[str, Any]],
+    profile: dict[str, Any] | None = None,
+    conversation_messages: list[dict[str, Any]] | None = None,
+    client: OpenAILLMClient | None = None,
+) -> AsyncIterator[str]:
+    """Awaitable `stream_answer_from_result_with_llm`."""
+    llm = client or OpenAILLMClient()
+    if _is_empty_payload(result_payload):
+        yield _format_month_tokens(MSG_NOT_PRESENT)
+        return
+    request = _answer_request(
+        user_query, result_payload, profile, conversation_messages
     )
+    async for text in _aformat_stream(llm.astream_chat_text(**request)):
+        yield text
 
 
 def answer_from_profile_with_llm(
@@ -86,17 +291,45 @@ def answer_from_profile_with_llm(
 ) -> str:
     """Generate final answer from profile context only for metadata/methodology questions."""
     llm = client or OpenAILLMClient()
-    profile_data = profile or get_startup_profile()
-    profile_json = build_minimal_prompt_profile_json(profile_data)
-    user_prompt = json.dumps(
-        {"user_query": user_query, "result_json": {}},
-        ensure_ascii=True,
-    )
-    return _format_month_tokens(
-        llm.chat_text(
-            system_prompt=build_answer_prompt(profile_json),
-            user_prompt=user_prompt,
-            conversation_messages=conversation_messages,
-            max_output_tokens=settings.OPENAI_MAX_OUTPUT_TOKENS_ANSWER,
-        ).strip()
-    )
+    request = _answer_request(user_query, {}, profile, conversation_messages)
+    return _format_month_tokens(llm.chat_text(**request).strip())
+
+
+async def aanswer_from_profile_with_llm(
+    *,
+    user_query: str,
+    profile: dict[str, Any] | None = None,
+    conversation_messages: list[dict[str, Any]] | None = None,
+    client: OpenAILLMClient | None = None,
+) -> str:
+    """Awaitable `answer_from_profile_with_llm`."""
+    llm = client or OpenAILLMClient()
+    request = _answer_request(user_query, {}, profile, conversation_messages)
+    return _format_month_tokens((await llm.achat_text(**request)).strip())
+
+
+def stream_answer_from_profile_with_llm(
+    *,
+    user_query: str,
+    profile: dict[str, Any] | None = None,
+    conversation_messages: list[dict[str, Any]] | None = None,
+    client: OpenAILLMClient | None = None,
+) -> Iterator[str]:
+    """Streaming `answer_from_profile_with_llm`: yield formatted answer text pieces."""
+    llm = client or OpenAILLMClient()
+    request = _answer_request(user_query, {}, profile, conversation_messages)
+    yield from _format_stream(llm.stream_chat_text(**request))
+
+
+async def astream_answer_from_profile_with_llm(
+    *,
+    user_query: str,
+    profile: dict[str, Any] | None = None,
+    conversation_messages: list[dict[str, Any]] | None = None,
+    client: OpenAILLMClient | None = None,
+) -> AsyncIterator[str]:
+    """Awaitable `stream_answer_from_profile_with_llm`."""
+    llm = client or OpenAILLMClient()
+    request = _answer_request(user_query, {}, profile, conversation_messages)
+    async for text in _aformat_stream(llm.astream_chat_text(**request)):
+        yield text
@@ -0,0 +1,131 @@
+"""Cache of executed plan results keyed by dataset version and plan hash.
+
+Plans are generated code or serialized query plans (`query_plan_source`).
+"""
+
+from __future__ import annotations
+
+import json
+import threading
+from typing import Any
+
+import pandas as pd
+
+from config.settings import settings
+from src.data.arrow_io import dataframe_from_ipc_bytes, dataframe_to_ipc_bytes
+from src.data.partitions import time_scope_filter
+from src.data.repository import DatasetSnapshot
+from src.services.codegen_service import generated_code_hash
+from src.utils.cache import LRUCache
+from src.utils.logging import log_event
+
+# (dataset_path, categorical, dataset version, normalized code hash,
+#  pushed-down partition filter or None)
+ResultKey = tuple[str, bool, str, str, str | None]
+
+# (result frame as Arrow IPC, filtered row count, full result row count)
+_RESULT_CACHE: LRUCache[tuple[bytes | None, int | None, int | None]] = LRUCache(
+    settings.RESULT_CACHE_SIZE, max_bytes=settings.RESULT_CACHE_MAX_BYTES
+)
+_CURRENT_VERSIONS: dict[tuple[str, bool], str] = {}
+_VERSIONS_LOCK = threading.Lock()
+
+
+def query_plan_source(query_plan: dict[str, Any]) -> str:
+    """Serialize a structured query plan as the cache source of its results."""
+    return json.dumps(query_plan, sort_keys=True, ensure_ascii=True)
+
+
+def _result_key(
+    snapshot: DatasetSnapshot, python_code: str, time_scope: dict[str, Any] | None
+) -> ResultKey:
+    """Key a result by everything that decides the rows the plan ran over.
+
+    On partitioned datasets the plan runs over `snapshot.scan(time_scope)`, so
+    the same code under another scope may see other rows.
+    """
+    scan_filter = time_scope_filter(time_scope) if snapshot.partitioned else None
+    return (
+        snapshot.dataset_path,
+        snapshot.categorical,
+        snapshot.version,
+        generated_code_hash(python_code),
+        None if scan_filter is None else str(scan_filter),
+    )
+
+
+def _drop_stale_versions(snapshot: DatasetSnapshot) -> None:
+    """Evict results of older versions once a newer snapshot is queried."""
+    dataset = (snapshot.dataset_path, snapshot.categorical)
+    with _VERSIONS_LOCK:
+        if _CURRENT_VERSIONS.get(dataset) == snapshot.version:
+            return
+        _CURRENT_VERSIONS[dataset] = snapshot.version
+    dropped = _RESULT_CACHE.discard_if(
+        lambda key: key[:2] == dataset and key[2] != snapshot.version
+    )
+    if dropped:
+        log_event(
+            "result_cache_invalidated",
+            dataset_path=snapshot.dataset_path,
+            version=snapshot.version,
+            dropped=dropped,
+        )
+
+
+def get_cached_execution(
+    snapshot: DatasetSnapshot,
+    python_code: str,
+    *,
+    time_scope: dict[str, Any] | None,
+) -> dict[str, Any] | None:
+    """Return a cached result for this plan, dataset version and scan, if any."""
+    _drop_stale_versions(snapshot)
+    entry = _RESULT_CACHE.get(_result_key(snapshot, python_code, time_scope))
+    if entry is None:
+        return None
+    payload, filtered_row_count, result_row_count = entry
+    return {
+        "result_df": None if payload is None else dataframe_from_ipc_bytes(payload),
+        "filtered_row_count": filtered_row_count,
+        "result_row_count": result_row_count,
+        "result_payload": None,
+    }
+
+
+def store_execution(
+    snapshot: DatasetSnapshot,
+    python_code: str,
+    execution: dict[str, Any],
+    *,
+    time_scope: dict[str, Any] | None,
+) -> None:
+    """Serialize and cache an execution result.
+
+    Results carrying a custom `result_payload`, or frames Arrow cannot encode
+    (e.g. mixed-type object columns), are not cached.
+    """
+    if _RESULT_CACHE.maxsize <= 0 or execution.get("result_payload") is not None:
+        return
+    result_df = execution.get("result_df")
+    payload: bytes | None = None
+    if isinstance(result_df, pd.DataFrame):
+        try:
+            payload = dataframe_to_ipc_bytes(result_df)
+        except Exception as exc:
+            log_event("result_cache_serialize_failed", error=str(exc))
+            return
+    _RESULT_CACHE.put(
+        _result_key(snapshot, python_code, time_scope),
+        (
+            payload,
+            execution.get("filtered_row_count"),
+            execution.get("result_row_count"),
+        ),
+        nbytes=len(payload) if payload is not None else 0,
+    )
+
+
+def result_cache_stats() -> dict[str, float | int]:
+    """Return result cache size, byte usage and hit-rate counters."""
+    return _RESULT_CACHE.stats()
@@ -0,0 +1,503 @@
+"""Warm process-pool sandbox for generated code.
+
+Each worker is a spawned process that loads (or memory-maps) the dataset once,
+reports ready, and only then joins the idle queue to execute plans sent over a
+pipe, so no query's budget pays for a cold load. Per query the parent enforces a wall
+clock deadline and the caller's cancellation token (the worker is killed and
+replaced on overrun or cancel); inside the worker the plan runs under the
+execution deadline, and an RLIMIT_CPU soft limit and an RLIMIT_AS cap bound CPU
+time and memory.
+Result frames travel back as Arrow IPC bytes. A worker that fails to start is
+respawned with exponential backoff; while none is running, plans raise
+`SandboxUnavailableError` instead of running unisolated.
+"""
+
+from __future__ import annotations
+
+import atexit
+import multiprocessing
+from multiprocessing.connection import Connection
+import queue
+import signal
+import threading
+import time
+from typing import Any
+
+from config.constants import DATASET_PATH
+from config.settings import settings
+from src.contracts.code_validation import GeneratedCodeValidationError
+from src.contracts.policies import ReadOnlyDataFrameError
+from src.data.arrow_io import dataframe_from_ipc_bytes, dataframe_to_ipc_bytes
+from src.data.repository import DatasetSnapshot
+from src.services.execution_control import (
+    CancellationToken,
+    ExecutionCancelledError,
+    ExecutionTimeoutError,
+)
+from src.utils.logging import log_event
+
+try:
+    import resource
+except ImportError:  # pragma: no cover - non-POSIX platforms
+    resource = None  # type: ignore[assignment]
+
+_MB = 1024 * 1024
+# How often the parent checks the cancellation token and the pool while waiting.
+_CANCEL_POLL_SEC = 0.1
+# Delay before respawning a worker that failed to start; doubles per failure.
+_RESPAWN_BACKOFF_SEC = 1.0
+_RESPAWN_BACKOFF_MAX_SEC = 60.0
+# Pause between attempts while workers load the caller's dataset version.
+_STALE_RETRY_SEC = 0.25
+
+
+class SandboxError(RuntimeError):
+    """Raised when the sandbox cannot produce a result for a plan."""
+
+
+class SandboxTimeoutError(SandboxError, ExecutionTimeoutError):
+    """Raised when a plan exceeds its wall-clock budget."""
+
+
+class SandboxMemoryLimitError(SandboxError, MemoryError):
+    """Raised when a plan exceeds the worker's address-space limit."""
+
+
+class SandboxUnavailableError(SandboxError):
+    """Raised when no sandbox worker can run the plan right now."""
+
+
+class SandboxStaleSnapshotError(SandboxUnavailableError):
+    """Raised when no worker loaded the caller's dataset version in time."""
+
+
+class _CpuLimitExceeded(Exception):
+    """Raised inside a worker when SIGXCPU fires."""
+
+
+_ERROR_TYPES: dict[str, type[Exception]] = {
+    "validation": GeneratedCodeValidationError,
+    "read_only": ReadOnlyDataFrameError,
+    "syntax": SyntaxError,
+    "stale": SandboxStaleSnapshotError,
+    "timeout": ExecutionTimeoutError,
+    "cpu_limit": SandboxTimeoutError,
+    "memory_limit": SandboxMemoryLimitError,
+}
+
+
+def _address_space_bytes() -> int | None:
+    """Return the current virtual memory size of this process (Linux only)."""
+    try:
+        with open("/proc/self/status", encoding="ascii") as handle:
+            for line in handle:
+                if line.startswith("VmSize:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        return None
+    return None
+
+
+def _limit_address_space(headroom_mb: int) -> None:
+    """Cap address space at the warmed-up size plus `headroom_mb`."""
+    if resource is None or not hasattr(resource, "RLIMIT_AS"):
+        return
+    current = _address_space_bytes()
+    if current is None:
+        return
+    limit = current + headroom_mb * _MB
+    resource.setrlimit(resource.RLIMIT_AS, (limit, resource.RLIM_INFINITY))
+
+
+def _arm_cpu_limit(cpu_seconds: int) -> None:
+    """Set the CPU soft limit to `cpu_seconds` beyond the time used so far."""
+    if resource is None:
+        return
+    usage = resource.getrusage(resource.RUSAGE_SELF)
+    used = int(usage.ru_utime + usage.ru_stime) + 1
+    resource.setrlimit(
+        resource.RLIMIT_CPU, (used + cpu_seconds, resource.RLIM_INFINITY)
+    )
+
+
+def _disarm_cpu_limit() -> None:
+    if resource is None:
+        return
+    resource.setrlimit(
+        resource.RLIMIT_CPU, (resource.RLIM_INFINITY, resource.RLIM_INFINITY)
+    )
+
+
+def _raise_cpu_limit(_signum: int, _frame: Any) -> None:
+    raise _CpuLimitExceeded("CPU time limit exceeded")
+
+
+def _run_request(request: dict[str, Any]) -> dict[str, Any]:
+    """Execute one plan inside the worker and encode the outcome."""
+    # Imported in the worker so the parent module stays light.
+    from src.data.indexes import get_scan_row_index
+    from src.data.repository import get_dataset_snapshot
+    from src.services.codegen_service import execute_generated_python_code
+
+    snapshot = get_dataset_snapshot(
+        dataset_path=request["dataset_path"], categorical=request["categorical"]
+    )
+    if snapshot.version != request["version"]:
+        return {
+            "ok": False,
+            "error_type": "stale",
+            "message": f"worker has dataset version {snapshot.version}",
+        }
+    frame = snapshot.scan(request["time_scope"])
+    row_index = None
+    if request["row_index"]:
+        row_index = get_scan_row_index(snapshot, request["time_scope"], frame)
+    execution = execute_generated_python_code(
+        frame,
+        request["python_code"],
+        read_only=request["read_only"],
+        row_index=row_index,
+        timeout_sec=request["timeout_sec"],
+        profile=request["profile"],
+    )
+    result_df = execution.get("result_df")
+    return {
+        "ok": True,
+        "result_ipc": None if result_df is None else dataframe_to_ipc_bytes(result_df),
+        "filtered_row_count": execution.get("filtered_row_count"),
+        "result_payload": execution.get("result_payload"),
+        "execution_profile": execution.get("execution_profile"),
+    }
+
+
+def _worker_main(
+    connection: Connection,
+    dataset_path: str,
+    categorical: bool,
+    cpu_seconds: int,
+    memory_headroom_mb: int,
+) -> None:
+    """Worker loop: warm the dataset, then serve requests until the pipe closes."""
+    from src.data.repository import get_dataset_snapshot
+
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    if hasattr(signal, "SIGXCPU"):
+        signal.signal(signal.SIGXCPU, _raise_cpu_limit)
+    snapshot = get_dataset_snapshot(dataset_path=dataset_path, categorical=categorical)
+    if not snapshot.partitioned:
+        # Partitioned datasets are scanned per query instead of loaded whole.
+        snapshot.dataframe
+    _limit_address_space(memory_headroom_mb)
+    try:
+        connection.send({"ready": True})
+    except (EOFError, OSError):
+        return
+
+    while True:
+        try:
+            request = connection.recv()
+        except (EOFError, OSError):
+            return
+        try:
+            _arm_cpu_limit(cpu_seconds)
+            response = _run_request(request)
+        except _CpuLimitExceeded as exc:
+            response = {"ok": False, "error_type": "cpu_limit", "message": str(exc)}
+        except MemoryError:
+            response = {
+                "ok": False,
+                "error_type": "memory_limit",
+                "message": "Address space limit exceeded",
+            }
+        except GeneratedCodeValidationError as exc:
+            response = {"ok": False, "error_type": "validation", "message": str(exc)}
+        except ReadOnlyDataFrameError as exc:
+            response = {"ok": False, "error_type": "read_only", "message": str(exc)}
+        except SyntaxError as exc:
+            response = {"ok": False, "error_type": "syntax", "message": str(exc)}
+        except ExecutionTimeoutError as exc:
+            response = {"ok": False, "error_type": "timeout", "message": str(exc)}
+        except Exception as exc:
+            response = {
+                "ok": False,
+                "error_type": "error",
+                "message": f"{type(exc).__name__}: {exc}",
+            }
+        finally:
+            _disarm_cpu_limit()
+        try:
+            connection.send(response)
+        except Exception as exc:
+            connection.send(
+                {
+                    "ok": False,
+                    "error_type": "error",
+                    "message": f"unsendable result: {exc}",
+                }
+            )
+
+
+class _Worker:
+    """Parent-side handle of one sandbox process."""
+
+    def __init__(self, context: Any, dataset_path: str, categorical: bool) -> None:
+        self.connection, child_connection = context.Pipe()
+        self.process = context.Process(
+            target=_worker_main,
+            args=(
+                child_connection,
+                dataset_path,
+                categorical,
+                settings.SANDBOX_CPU_TIME_SEC,
+                settings.SANDBOX_MEMORY_MB,
+            ),
+            name="plan-sandbox",
+            daemon=True,
+        )
+        self.process.start()
+        child_connection.close()
+
+    def kill(self) -> None:
+        self.process.kill()
+        self.process.join(timeout=5)
+        self.connection.close()
+
+
+class SandboxPool:
+    """Fixed-size pool of warm sandbox workers shared by all sessions."""
+
+    def __init__(
+        self,
+        size: int,
+        *,
+        dataset_path: str = DATASET_PATH,
+        categorical: bool | None = None,
+    ) -> None:
+        self._context = multiprocessing.get_context("spawn")
+        self._dataset_path = dataset_path
+        self._categorical = (
+            settings.DATASET_CATEGORICAL if categorical is None else categorical
+        )
+        self._idle: queue.Queue[_Worker] = queue.Queue()
+        self._workers: set[_Worker] = set()
+        self._lock = threading.Lock()
+        self._closed = False
+        self._start_failures = 0
+        for _ in range(size):
+            self._spawn()
+
+    def _spawn(self) -> None:
+        """Start a worker; it joins the idle queue once its dataset is loaded."""
+        worker = _Worker(self._context, self._dataset_path, self._categorical)
+        with self._lock:
+            self._workers.add(worker)
+        threading.Thread(
+            target=self._await_ready, args=(worker,), name="sandbox-warmup", daemon=True
+        ).start()
+
+    def _await_ready(self, worker: _Worker) -> None:
+        """Queue `worker` after its ready handshake; respawn it if it dies warming."""
+        try:
+            message = worker.connection.recv()
+        except (EOFError, OSError):
+            message = None
+        if self._closed:
+            return
+        if not isinstance(message, dict) or not message.get("ready"):
+            # Back off, so a dataset that cannot load does not respawn in a loop.
+            with self._lock:
+                self._workers.discard(worker)
+                self._start_failures += 1
+                delay = min(
+                    _RESPAWN_BACKOFF_SEC * 2 ** (self._start_failures - 1),
+                    _RESPAWN_BACKOFF_MAX_SEC,
+                )
+            worker.kill()
+            log_event(
+                "sandbox_worker_start_failed",
+                exitcode=worker.process.exitcode,
+                respawn_in_sec=delay,
+            )
+            timer = threading.Timer(delay, self._respawn)
+            timer.daemon = True
+            timer.start()
+            return
+        with self._lock:
+            self._start_failures = 0
+        self._idle.put(worker)
+
+    def _respawn(self) -> None:
+        if not self._closed:
+            self._spawn()
+
+    def _acquire(
+        self, deadline: float, cancel_token: CancellationToken | None
+    ) -> _Worker:
+        """Take an idle worker, waiting up to `deadline` unless cancelled.
+
+        Fails fast with `SandboxUnavailableError` while no worker is running or
+        warming up (every start failed and the respawn is backing off).
+        """
+        waited = 0.0
+        while True:
+            if cancel_token is not None and cancel_token.cancelled:
+                raise ExecutionCancelledError("Query execution was cancelled")
+            with self._lock:
+                if not self._workers:
+                    raise SandboxUnavailableError(
+                        "No sandbox worker is running; failed workers are "
+                        "being respawned"
+                    )
+            step = min(_CANCEL_POLL_SEC, deadline - waited)
+            try:
+                return self._idle.get(timeout=max(step, 0.0))
+            except queue.Empty:
+                waited += step
+                if waited >= deadline:
+                    raise SandboxTimeoutError(
+                        "No sandbox worker became available"
+                    ) from None
+
+    def _replace(self, worker: _Worker, reason: str) -> None:
+        """Kill a worker that overran or died, and start a fresh one."""
+        with self._lock:
+            self._workers.discard(worker)
+        worker.kill()
+        log_event(
+            "sandbox_worker_replaced",
+            reason=reason,
+            exitcode=worker.process.exitcode,
+        )
+        if not self._closed:
+            self._spawn()
+
+    def execute(
+        self,
+        snapshot: DatasetSnapshot,
+        python_code: str,
+        *,
+        time_scope: dict[str, Any] | None,
+        read_only: bool,
+        row_index: bool,
+        wall_time_sec: float | None = None,
+        timeout_sec: float | None = None,
+        cancel_token: CancellationToken | None = None,
+        profile: bool = False,
+    ) -> dict[str, Any]:
+        """Run a plan in a worker and return the same shape as in-process execution.
+
+        `timeout_sec` is the plan deadline enforced inside the worker;
+        `wall_time_sec` is the hard limit after which the worker is killed.
+        CPU-limit kills raise `SandboxTimeoutError` and address-space overruns
+        `SandboxMemoryLimitError`. While workers still load the caller's
+        dataset version the plan is retried within the wall-time budget, then
+        `SandboxStaleSnapshotError` is raised.
+        """
+        deadline = wall_time_sec or settings.SANDBOX_WALL_TIME_SEC
+        request = {
+            "dataset_path": snapshot.dataset_path,
+            "categorical": snapshot.categorical,
+            "version": snapshot.version,
+            "python_code": python_code,
+            "time_scope": time_scope,
+            "read_only": read_only,
+            "row_index": row_index,
+            "timeout_sec": timeout_sec,
+            "profile": profile,
+        }
+        started = time.monotonic()
+        while True:
+            try:
+                return self._execute_once(
+                    request, deadline - (time.monotonic() - started), cancel_token
+                )
+            except SandboxStaleSnapshotError as exc:
+                if deadline - (time.monotonic() - started) <= 2 * _STALE_RETRY_SEC:
+                    raise
+                log_event("sandbox_stale_snapshot_retry", error=str(exc))
+                time.sleep(_STALE_RETRY_SEC)
+
+    def _execute_once(
+        self,
+        request: dict[str, Any],
+        deadline: float,
+        cancel_token: CancellationToken | None,
+    ) -> dict[str, Any]:
+        """Send one request to an idle worker and decode its response."""
+        worker = self._acquire(deadline, cancel_token)
+        cancelled = False
+        try:
+            worker.connection.send(request)
+            finished = self._wait(worker, deadline, cancel_token)
+            cancelled = (
+                not finished and cancel_token is not None and cancel_token.cancelled
+            )
+            response = worker.connection.recv() if finished else None
+        except (EOFError, OSError) as exc:
+            self._replace(worker, "worker_died")
+            raise SandboxError(f"Sandbox worker died: {exc}") from exc
+        if cancelled:
+            self._replace(worker, "cancelled")
+            raise ExecutionCancelledError("Query execution was cancelled")
+        if response is None:
+            self._replace(worker, "wall_time")
+            raise SandboxTimeoutError(
+                f"Generated code exceeded {deadline:g}s wall time"
+            )
+        self._idle.put(worker)
+
+        if not response["ok"]:
+            error_type = response["error_type"]
+            log_event("sandbox_execution_failed", error_type=error_type)
+            raise _ERROR_TYPES.get(error_type, SandboxError)(response["message"])
+        payload = response["result_ipc"]
+        execution = {
+            "result_df": None if payload is None else dataframe_from_ipc_bytes(payload),
+            "filtered_row_count": response["filtered_row_count"],
+            "result_payload": response["result_payload"],
+        }
+        if response["execution_profile"] is not None:
+            execution["execution_profile"] = response["execution_profile"]
+        return execution
+
+    @staticmethod
+    def _wait(
+        worker: _Worker, deadline: float, cancel_token: CancellationToken | None
+    ) -> bool:
+        """Wait for a response; False on wall-time overrun or cancellation."""
+        if cancel_token is None:
+            return worker.connection.poll(deadline)
+        waited = 0.0
+        while waited < deadline:
+            if cancel_token.cancelled:
+                return False
+            step = min(_CANCEL_POLL_SEC, deadline - waited)
+            if worker.connection.poll(step):
+                return True
+            waited += step
+        return False
+
+    def close(self) -> None:
+        """Stop all workers."""
+        self._closed = True
+        with self._lock:
+            workers = list(self._workers)
+            self._workers.clear()
+        for worker in workers:
+            worker.kill()
+
+
+_POOL: SandboxPool | None = None
+_POOL_LOCK = threading.Lock()
+
+
+def get_sandbox_pool() -> SandboxPool:
+    """Return the process-wide sandbox pool, starting its workers on first use."""
+    global _POOL
+    if _POOL is None:
+        with _POOL_LOCK:
+            if _POOL is None:
+                _POOL = SandboxPool(settings.SANDBOX_WORKERS)
+                atexit.register(_POOL.close)
+                log_event("sandbox_pool_started", workers=settings.SANDBOX_WORKERS)
+    return _POOL
@@ -0,0 +1,38 @@
+"""Process-wide background event loop for async graph runs."""
+
+from __future__ import annotations
+
+import asyncio
+import concurrent.futures
+import threading
+from typing import Any, Coroutine, TypeVar
+
+TResult = TypeVar("TResult")
+
+_LOOP: asyncio.AbstractEventLoop | None = None
+_LOCK = threading.Lock()
+
+
+def background_loop() -> asyncio.AbstractEventLoop:
+    """Return the shared event loop, starting its daemon thread on first use.
+
+    Every coroutine submitted here shares one loop, and therefore one async
+    LLM connection pool, across all sessions of the process.
+    """
+    global _LOOP
+    if _LOOP is None:
+        with _LOCK:
+            if _LOOP is None:
+                loop = asyncio.new_event_loop()
+                threading.Thread(
+                    target=loop.run_forever, name="async-runtime", daemon=True
+                ).start()
+                _LOOP = loop
+    return _LOOP
+
+
+def submit(
+    coroutine: Coroutine[Any, Any, TResult],
+) -> concurrent.futures.Future[TResult]:
+    """Schedule `coroutine` on the shared loop; cancelling the future cancels it."""
+    return asyncio.run_coroutine_threadsafe(coroutine, background_loop())
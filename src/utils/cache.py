@@ -0,0 +1,96 @@
+"""Small thread-safe in-process caches."""
+
+from __future__ import annotations
+
+from collections import OrderedDict
+import threading
+from typing import Callable, Generic, Hashable, TypeVar
+
+TValue = TypeVar("TValue")
+
+
+class LRUCache(Generic[TValue]):
+    """Bounded least-recently-used mapping with hit/miss counters.
+
+    Entries are evicted once there are more than `maxsize` of them or, when
+    `max_bytes` is set, once the sizes passed to `put` exceed that budget.
+    `maxsize=0` disables caching (every lookup is a miss, nothing is stored).
+    """
+
+    def __init__(self, maxsize: int, max_bytes: int | None = None) -> None:
+        self.maxsize = maxsize
+        self.max_bytes = max_bytes
+        self._values: OrderedDict[Hashable, TValue] = OrderedDict()
+        self._sizes: dict[Hashable, int] = {}
+        self._total_bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Hashable) -> TValue | None:
+        """Return the cached value (marking it recently used) or None."""
+        with self._lock:
+            if key in self._values:
+                self._values.move_to_end(key)
+                self.hits += 1
+                return self._values[key]
+            self.misses += 1
+            return None
+
+    def put(self, key: Hashable, value: TValue, *, nbytes: int = 0) -> None:
+        """Store a value, evicting least recently used entries over the bounds.
+
+        Values larger than the whole byte budget are not stored.
+        """
+        if self.maxsize <= 0:
+            return
+        if self.max_bytes is not None and nbytes > self.max_bytes:
+            return
+        with self._lock:
+            self._remove(key)
+            self._values[key] = value
+            self._sizes[key] = nbytes
+            self._total_bytes += nbytes
+            while len(self._values) > self.maxsize or (
+                self.max_bytes is not None and self._total_bytes > self.max_bytes
+            ):
+                self._remove(next(iter(self._values)))
+
+    def discard_if(self, predicate: Callable[[Hashable], bool]) -> int:
+        """Remove entries whose key matches `predicate`; return how many."""
+        with self._lock:
+            stale = [key for key in self._values if predicate(key)]
+            for key in stale:
+                self._remove(key)
+            return len(stale)
+
+    def _remove(self, key: Hashable) -> None:
+        """Drop one entry (caller holds the lock)."""
+        if key in self._values:
+            del self._values[key]
+            self._total_bytes -= self._sizes.pop(key, 0)
+
+    def clear(self) -> None:
+        """Drop all entries and reset counters."""
+        with self._lock:
+            self._values.clear()
+            self._sizes.clear()
+            self._total_bytes = 0
+            self.hits = 0
+            self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._values)
+
+    def stats(self) -> dict[str, float | int]:
+        """Return size and hit-rate counters."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._values),
+                "maxsize": self.maxsize,
+                "bytes": self._total_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            }
@@ -0,0 +1,29 @@
+"""Thread-safe hand-off of streamed answer text from a graph run to the UI."""
+
+from __future__ import annotations
+
+import queue
+
+
+class TokenStream:
+    """Queue of answer text pieces written by a graph node and read by the UI.
+
+    The node runs in a worker thread (or on the shared event loop) while the
+    UI thread polls `drain`, so Streamlit elements are only touched by the
+    script thread.
+    """
+
+    def __init__(self) -> None:
+        self._queue: queue.SimpleQueue[str] = queue.SimpleQueue()
+
+    def put(self, text: str) -> None:
+        self._queue.put(text)
+
+    def drain(self) -> str:
+        """Return (and remove) all text written since the last call."""
+        parts: list[str] = []
+        while True:
+            try:
+                parts.append(self._queue.get_nowait())
+            except queue.Empty:
+                return "".join(parts)
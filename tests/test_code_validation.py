@@ -0,0 +1,158 @@
+import ast
+
+import pandas as pd
+import pytest
+
+from benchmarks.code_validation import load_plan_corpus
+from src.contracts.code_validation import (
+    GeneratedCodeValidationError,
+    parse_and_validate_generated_code,
+    plan_column_references,
+)
+from src.data.indexes import get_row_index
+from src.data.repository import get_dataset_snapshot
+from src.services import codegen_service
+from src.services.codegen_service import execute_generated_python_code
+
+
+@pytest.fixture(scope="module")
+def snapshot():
+    return get_dataset_snapshot()
+
+
+def _columns(source):
+    return plan_column_references(parse_and_validate_generated_code(source))
+
+
+def _run(snapshot, source, monkeypatch, *, pruning):
+    monkeypatch.setattr(codegen_service.settings, "COLUMN_PRUNING_ENABLED", pruning)
+    return execute_generated_python_code(
+        snapshot.dataframe, source, row_index=get_row_index(snapshot)
+    )
+
+
+# (plan, columns it must be pruned to)
+PRUNED_PLANS = [
+    (
+        "filtered_df = select_rows(property_name='Building 17', year='2025')\n"
+        "result_df = pd.DataFrame({'profit': [filtered_df['profit'].sum()]})",
+        {"property_name", "year", "profit"},
+    ),
+    (
+        "filtered_df = period_slice(dataframe, 'month', '2024-M03', '2024-M09')\n"
+        "result_df = filtered_df.groupby('month')['profit'].sum().reset_index()",
+        {"month", "month_key", "profit"},
+    ),
+    (
+        "filtered_df = period_slice(dataframe[dataframe['ledger_type'] == 'revenue'], "
+        "'quarter', '2024-Q2', '2025-Q1')\n"
+        "result_df = filtered_df[['quarter', 'profit']]",
+        {"ledger_type", "quarter", "quarter_key", "profit"},
+    ),
+    (
+        "result_df = dataframe.loc[dataframe['profit'] > 1000, "
+        "['property_name', 'profit']]",
+        {"property_name", "profit"},
+    ),
+    (
+        "result_df = dataframe.loc[:, ['tenant_name']].drop_duplicates()",
+        {"tenant_name"},
+    ),
+    (
+        "result_df = dataframe.groupby(['property_name', 'year'])[['profit']]"
+        ".sum().reset_index()",
+        {"property_name", "year", "profit"},
+    ),
+    (
+        "result_df = dataframe.groupby(by='tenant_name', dropna=False)['profit']"
+        ".count().reset_index()",
+        {"tenant_name", "profit"},
+    ),
+    (
+        "filtered_df = dataframe[dataframe['year'] == '2025']\n"
+        "revenue_df = filtered_df[filtered_df['ledger_type'] == 'revenue']\n"
+        "result_df = revenue_df.groupby('property_name')['profit'].sum().reset_index()",
+        {"year", "ledger_type", "property_name", "profit"},
+    ),
+    (
+        "filtered_df = dataframe[dataframe['tenant_name'].isnull()]\n"
+        "result_df = pd.DataFrame({'empty': [filtered_df.empty], "
+        "'rows': [filtered_df['profit'].size]})",
+        {"tenant_name", "profit"},
+    ),
+]
+
+# Plans that can observe columns they do not name, so no pruning is allowed.
+UNPRUNED_PLANS = [
+    "result_df = pd.DataFrame({'column': dataframe.columns})",
+    "filtered_df = dataframe[dataframe['year'] == '2025']\nresult_df = filtered_df",
+    "filtered_df = dataframe[dataframe['year'] == '2025']\n"
+    "filtered_df += 0\n"
+    "result_df = filtered_df[['profit']]",
+    "filtered_df = dataframe[dataframe['year'] == '2025']\n"
+    "result_df = pd.concat([filtered_df])[['profit']]",
+    "result_df = dataframe.describe()",
+    "result_df = dataframe.groupby('month').sum().reset_index()",
+]
+
+
+@pytest.mark.parametrize("source,expected", PRUNED_PLANS)
+def test_pruned_plan_matches_unpruned_result(snapshot, monkeypatch, source, expected):
+    assert _columns(source) == frozenset(expected)
+
+    pruned = _run(snapshot, source, monkeypatch, pruning=True)
+    full = _run(snapshot, source, monkeypatch, pruning=False)
+
+    pd.testing.assert_frame_equal(pruned["result_df"], full["result_df"])
+    assert pruned["filtered_row_count"] == full["filtered_row_count"]
+
+
+@pytest.mark.parametrize("source", UNPRUNED_PLANS)
+def test_plan_observing_unnamed_columns_is_not_pruned(source):
+    assert _columns(source) is None
+
+
+def test_dataframe_parameter_name_is_not_pruned():
+    tree = ast.parse(
+        "result_df = (lambda dataframe: dataframe)(dataframe)[['profit']]"
+    )
+
+    assert plan_column_references(tree) is None
+
+
+def test_unpruned_plan_still_runs_on_full_frame(snapshot, monkeypatch):
+    source = "result_df = pd.DataFrame({'column': dataframe.columns})"
+
+    result = _run(snapshot, source, monkeypatch, pruning=True)
+
+    assert result["result_df"]["column"].tolist() == list(snapshot.dataframe.columns)
+
+
+def test_rejected_plan_raises_validation_error():
+    with pytest.raises(GeneratedCodeValidationError):
+        parse_and_validate_generated_code("import os\nresult_df = dataframe")
+
+
+CORPUS = load_plan_corpus()
+
+
+@pytest.mark.parametrize(
+    "plan",
+    [plan for plan in CORPUS if plan["expected"] == "accept"],
+    ids=lambda plan: plan["name"],
+)
+def test_benchmark_corpus_benign_plan_runs(snapshot, monkeypatch, plan):
+    pruned = _run(snapshot, plan["python_code"], monkeypatch, pruning=True)
+    full = _run(snapshot, plan["python_code"], monkeypatch, pruning=False)
+
+    pd.testing.assert_frame_equal(pruned["result_df"], full["result_df"])
+
+
+@pytest.mark.parametrize(
+    "plan",
+    [plan for plan in CORPUS if plan["expected"] == "reject"],
+    ids=lambda plan: plan["name"],
+)
+def test_benchmark_corpus_hostile_plan_is_rejected(plan):
+    with pytest.raises(GeneratedCodeValidationError):
+        parse_and_validate_generated_code(plan["python_code"])
@@ -0,0 +1,95 @@
+import pytest
+
+from src.contracts.models import QueryPlanSchema
+from src.data.repository import get_dataset_snapshot
+from src.services import duckdb_engine
+from src.services.duckdb_engine import execute_query_plan_duckdb
+from src.services.plan_engine import execute_query_plan
+
+
+@pytest.fixture(scope="module")
+def snapshot():
+    return get_dataset_snapshot()
+
+
+def _plan(plan):
+    return QueryPlanSchema.model_validate(plan).model_dump()
+
+
+def _both(snapshot, plan):
+    plan = _plan(plan)
+    return execute_query_plan(snapshot.dataframe, plan), execute_query_plan_duckdb(
+        snapshot, plan
+    )
+
+
+def test_limit_zero_keeps_filtered_row_count(snapshot):
+    pandas_run, duckdb_run = _both(
+        snapshot,
+        {"filters": [{"column": "year", "op": "eq", "values": ["2025"]}], "limit": 0},
+    )
+
+    assert duckdb_run["filtered_row_count"] == pandas_run["filtered_row_count"] > 0
+    assert duckdb_run["result_df"].empty
+    assert duckdb_run["result_row_count"] == 0
+
+
+def test_empty_filter_counts_zero(snapshot):
+    pandas_run, duckdb_run = _both(
+        snapshot, {"filters": [{"column": "year", "op": "eq", "values": ["1999"]}]}
+    )
+
+    assert pandas_run["filtered_row_count"] == duckdb_run["filtered_row_count"] == 0
+    assert duckdb_run["result_df"].empty
+
+
+def test_projection_fetches_bounded_head(snapshot, monkeypatch):
+    monkeypatch.setattr(duckdb_engine.settings, "RESULT_MAX_ROWS", 10)
+    pandas_run, duckdb_run = _both(
+        snapshot,
+        {
+            "columns": ["month", "profit"],
+            "sort": [{"column": "month"}, {"column": "profit"}],
+        },
+    )
+
+    assert len(duckdb_run["result_df"]) == 11
+    assert duckdb_run["result_row_count"] == len(pandas_run["result_df"])
+    assert duckdb_run["filtered_row_count"] == pandas_run["filtered_row_count"]
+
+
+@pytest.mark.parametrize(
+    "plan",
+    [
+        {"columns": ["property_name", "tenant_name"], "distinct": True},
+        {"group_by": ["property_name", "month"], "derive_pnl": True},
+        {
+            "group_by": ["tenant_name"],
+            "aggregations": [{"column": "profit", "func": "sum", "alias": "total"}],
+            "sort": [{"column": "total", "ascending": False}],
+            "limit": 5,
+        },
+    ],
+)
+def test_result_row_count_matches_pandas(snapshot, plan):
+    pandas_run, duckdb_run = _both(snapshot, plan)
+
+    assert duckdb_run["result_row_count"] == len(pandas_run["result_df"])
+    assert duckdb_run["filtered_row_count"] == pandas_run["filtered_row_count"]
+
+
+def test_sorted_aggregation_keeps_plan_order(snapshot):
+    pandas_run, duckdb_run = _both(
+        snapshot,
+        {
+            "group_by": ["tenant_name"],
+            "aggregations": [{"column": "profit", "func": "sum", "alias": "total"}],
+            "sort": [{"column": "total", "ascending": False}],
+            "limit": 5,
+        },
+    )
+
+    assert (
+        duckdb_run["result_df"]["tenant_name"].tolist()
+        == pandas_run["result_df"]["tenant_name"].tolist()
+    )
@@ -0,0 +1,60 @@
+import threading
+import time
+
+import pytest
+
+from src.services.execution_control import (
+    CancellationToken,
+    ExecutionCancelledError,
+    ExecutionGuard,
+    ExecutionTimeoutError,
+)
+
+
+def _spin(seconds):
+    end = time.monotonic() + seconds
+    while time.monotonic() < end:
+        pass
+
+
+def test_deadline_interrupts_running_code():
+    started = time.monotonic()
+    with pytest.raises(ExecutionTimeoutError, match="0.2s execution deadline"):
+        with ExecutionGuard(timeout_sec=0.2):
+            _spin(5)
+
+    assert time.monotonic() - started < 1
+
+
+def test_cancellation_interrupts_running_code():
+    token = CancellationToken()
+    threading.Timer(0.1, token.cancel).start()
+
+    with pytest.raises(ExecutionCancelledError):
+        with ExecutionGuard(timeout_sec=10, cancel_token=token):
+            _spin(5)
+
+
+def test_cancelled_token_fails_before_running():
+    token = CancellationToken()
+    token.cancel()
+    ran = []
+
+    with pytest.raises(ExecutionCancelledError):
+        with ExecutionGuard(cancel_token=token):
+            ran.append(True)
+
+    assert ran == []
+
+
+def test_finished_block_leaves_no_pending_interrupt():
+    with ExecutionGuard(timeout_sec=0.1):
+        pass
+
+    _spin(0.3)
+
+
+def test_description_names_the_guarded_work():
+    with pytest.raises(ExecutionTimeoutError, match="^Query plan exceeded"):
+        with ExecutionGuard(timeout_sec=0.05, description="Query plan"):
+            _spin(5)
@@ -0,0 +1,118 @@
+import pytest
+
+from config.constants import MSG_SANDBOX_UNAVAILABLE
+from src.graph import nodes
+from src.services.execution_control import ExecutionTimeoutError
+from src.services.sandbox import SandboxUnavailableError
+
+REJECTED_PLAN = {
+    "filters": [{"column": "address", "op": "eq", "values": ["Main Street 1"]}],
+    "columns": [],
+    "distinct": False,
+    "group_by": [],
+    "aggregations": [],
+    "derive_pnl": False,
+    "sort": [],
+    "limit": None,
+}
+
+FALLBACK_CODE = (
+    "filtered_df = select_rows(property_name='Building 17')\n"
+    "result_df = filtered_df[['property_name', 'profit']].head(3)"
+)
+
+
+@pytest.fixture
+def state():
+    return {
+        "user_query": "show rows for Building 17",
+        "entities": {},
+        "data_profile": {},
+        "task_type": "asset_details",
+        "query_plan": REJECTED_PLAN,
+        "python_code": "",
+    }
+
+
+@pytest.fixture(autouse=True)
+def in_process(monkeypatch):
+    monkeypatch.setattr(nodes.settings, "EXECUTION_SANDBOX", False)
+    monkeypatch.setattr(nodes.settings, "EXECUTION_BACKEND", "pandas")
+
+
+def test_rejected_plan_reprompts_for_python_code(state, monkeypatch):
+    requests = []
+
+    def fake_codegen(**kwargs):
+        requests.append(kwargs)
+        return {"task_type": "asset_details", "python_code": FALLBACK_CODE}
+
+    monkeypatch.setattr(nodes, "generate_query_code_with_llm", fake_codegen)
+
+    assert nodes._execute_for_answer(state) is True
+
+    assert requests[0]["rejected_plan"]["query_plan"] == REJECTED_PLAN
+    assert "address" in requests[0]["rejected_plan"]["error"]
+    assert state["query_plan"] is None
+    assert state["python_code"] == FALLBACK_CODE
+    assert state["computed_result"]["row_count"] == 3
+
+
+def test_rejected_plan_without_fallback_is_not_present(state, monkeypatch):
+    monkeypatch.setattr(
+        nodes, "generate_query_code_with_llm", lambda **_: {"python_code": ""}
+    )
+
+    assert nodes._execute_for_answer(state) is False
+
+    assert state["error_type"] == "not_present"
+
+
+def test_query_plan_runs_under_execution_deadline(state, monkeypatch):
+    def slow_plan(*_args, **_kwargs):
+        while True:
+            pass
+
+    monkeypatch.setattr(nodes.settings, "EXECUTION_TIMEOUT_SEC", 0.2)
+    monkeypatch.setattr(nodes, "execute_query_plan", slow_plan)
+    state["query_plan"] = {**REJECTED_PLAN, "filters": [], "limit": 7}
+
+    assert nodes._execute_for_answer(state) is False
+
+    assert state["error_type"] == "timeout"
+
+
+def test_deadline_error_names_the_query_plan(state, monkeypatch):
+    def slow_plan(*_args, **_kwargs):
+        while True:
+            pass
+
+    monkeypatch.setattr(nodes.settings, "EXECUTION_TIMEOUT_SEC", 0.2)
+    monkeypatch.setattr(nodes, "execute_query_plan", slow_plan)
+    snapshot = nodes.get_dataset_snapshot()
+
+    with pytest.raises(ExecutionTimeoutError, match="^Query plan exceeded"):
+        nodes._execute_query_plan_on_snapshot(
+            snapshot, {**REJECTED_PLAN, "filters": [], "limit": 8}, state
+        )
+
+
+def test_unavailable_sandbox_does_not_run_in_process(state, monkeypatch):
+    class UnavailablePool:
+        def execute(self, *_args, **_kwargs):
+            raise SandboxUnavailableError("No sandbox worker is running")
+
+    def in_process(*_args, **_kwargs):
+        raise AssertionError("plan ran outside the sandbox")
+
+    monkeypatch.setattr(nodes.settings, "EXECUTION_SANDBOX", True)
+    monkeypatch.setattr(nodes, "get_sandbox_pool", UnavailablePool)
+    monkeypatch.setattr(nodes, "execute_generated_python_code", in_process)
+    state["query_plan"] = None
+    # Not run by other tests, so the result cache cannot answer it.
+    state["python_code"] = FALLBACK_CODE.replace("head(3)", "head(4)")
+
+    assert nodes._execute_for_answer(state) is False
+
+    assert state["error_type"] == "sandbox_unavailable"
+    assert state["final_answer"] == MSG_SANDBOX_UNAVAILABLE
@@ -0,0 +1,94 @@
+import pandas as pd
+import pytest
+
+from src.data.cube import build_pnl_cube, build_pnl_cube_from_frames
+from src.data.indexes import get_scan_row_index
+from src.data.partitions import time_scope_period_range, write_partitioned_dataset
+from src.data.profiler import _build_profile_data, _build_profile_data_from_frames
+from src.data.repository import DatasetSnapshot, _read_source_dataframe
+
+SCOPES = [
+    {"mode": "exact", "month": "2025-M02"},
+    {"mode": "exact", "quarter": "2024-Q4"},
+    {"mode": "exact", "year": "2025"},
+    {"mode": "range", "column": "month", "start": "2024-M11", "end": "2025-M02"},
+    {"mode": "range", "column": "quarter", "start": "2024-Q3", "end": "2025-Q1"},
+]
+
+
+@pytest.fixture(scope="module")
+def partitioned_path(tmp_path_factory):
+    source = pd.read_parquet("data/cortex.parquet")
+    root = tmp_path_factory.mktemp("partitioned") / "cortex"
+    write_partitioned_dataset(source, str(root))
+    return str(root)
+
+
+def _snapshot(path: str) -> DatasetSnapshot:
+    return DatasetSnapshot(path, categorical=False, version="test")
+
+
+def _rows(frame: pd.DataFrame) -> pd.DataFrame:
+    columns = sorted(frame.columns)
+    return (
+        frame[columns]
+        .astype(object)
+        .sort_values(columns, na_position="last")
+        .reset_index(drop=True)
+    )
+
+
+@pytest.mark.parametrize(
+    ("time_scope", "expected"),
+    [
+        ({"mode": "exact", "month": "2025-M02"}, ("month", "2025-M02", "2025-M02")),
+        ({"mode": "exact", "year": "2024"}, ("year", "2024", "2024")),
+        (
+            {"mode": "range", "column": "quarter", "start": "2024-Q3", "end": "2025-Q1"},
+            ("quarter", "2024-Q3", "2025-Q1"),
+        ),
+        ({"mode": "exact", "month": "2025-M13"}, None),
+        ({"mode": "range", "column": "ledger_code", "start": "1", "end": "2"}, None),
+        ({"mode": "none"}, None),
+        (None, None),
+    ],
+)
+def test_time_scope_period_range(time_scope, expected):
+    assert time_scope_period_range(time_scope) == expected
+
+
+def test_cube_and_profile_from_partitions_match_full_frame(partitioned_path):
+    snapshot = _snapshot(partitioned_path)
+    cube = build_pnl_cube_from_frames(snapshot.iter_partitions())
+    profile = _build_profile_data_from_frames(snapshot.iter_partitions())
+    assert not snapshot.is_loaded
+
+    full = _read_source_dataframe(partitioned_path, categorical=False)
+    expected_cube = build_pnl_cube(full)
+    for level, frame in expected_cube.levels.items():
+        pd.testing.assert_frame_equal(cube.levels[level], frame)
+    assert profile == _build_profile_data(full)
+
+
+@pytest.mark.parametrize("time_scope", SCOPES)
+def test_scan_keeps_pushing_down_after_full_load(partitioned_path, time_scope):
+    snapshot = _snapshot(partitioned_path)
+    scanned = snapshot.scan(time_scope)
+    assert not snapshot.is_loaded
+
+    loaded = _snapshot(partitioned_path)
+    full = loaded.dataframe
+    sliced = loaded.scan(time_scope)
+    assert 0 < len(sliced) < len(full)
+    pd.testing.assert_frame_equal(_rows(sliced), _rows(scanned))
+
+
+def test_scan_row_index_is_built_per_scan(partitioned_path):
+    snapshot = _snapshot(partitioned_path)
+    time_scope = SCOPES[1]
+    frame = snapshot.scan(time_scope)
+    row_index = get_scan_row_index(snapshot, time_scope, frame)
+    assert row_index is not None
+    assert row_index.row_count == len(frame)
+    assert get_scan_row_index(snapshot, time_scope, frame) is row_index
+    assert not snapshot.is_loaded
@@ -0,0 +1,185 @@
+import pandas as pd
+import pytest
+
+from src.contracts.models import QueryPlanSchema
+from src.data.cube import build_pnl_cube
+from src.data.indexes import build_row_index
+from src.data.repository import _read_source_dataframe, get_dataset_snapshot
+from src.services.duckdb_engine import execute_query_plan_duckdb
+from src.services.plan_engine import QueryPlanError, execute_query_plan
+
+# (label, plan with numeric operands, same plan with text operands)
+PLAN_PAIRS = [
+    (
+        "year eq rows",
+        {"filters": [{"column": "year", "op": "eq", "values": [2025]}]},
+        {"filters": [{"column": "year", "op": "eq", "values": ["2025"]}]},
+    ),
+    (
+        "property+year eq",
+        {
+            "filters": [
+                {"column": "property_name", "op": "eq", "values": ["Building 17"]},
+                {"column": "year", "op": "eq", "values": [2025]},
+            ]
+        },
+        {
+            "filters": [
+                {"column": "property_name", "op": "eq", "values": ["Building 17"]},
+                {"column": "year", "op": "eq", "values": ["2025"]},
+            ]
+        },
+    ),
+    (
+        "year in pnl",
+        {
+            "filters": [{"column": "year", "op": "in", "values": [2024, 2025]}],
+            "group_by": ["year"],
+            "derive_pnl": True,
+        },
+        {
+            "filters": [{"column": "year", "op": "in", "values": ["2024", "2025"]}],
+            "group_by": ["year"],
+            "derive_pnl": True,
+        },
+    ),
+    (
+        "year between count",
+        {
+            "filters": [{"column": "year", "op": "between", "values": [2024, 2025]}],
+            "aggregations": [{"column": "profit", "func": "count", "alias": "rows"}],
+        },
+        {
+            "filters": [
+                {"column": "year", "op": "between", "values": ["2024", "2025"]}
+            ],
+            "aggregations": [{"column": "profit", "func": "count", "alias": "rows"}],
+        },
+    ),
+]
+
+ENGINES = ["rows", "index", "cube", "duckdb"]
+
+
+@pytest.fixture(scope="module")
+def snapshot():
+    return get_dataset_snapshot()
+
+
+@pytest.fixture(scope="module")
+def engines(snapshot):
+    dataframe = snapshot.dataframe
+    row_index = build_row_index(dataframe)
+    cube = build_pnl_cube(dataframe)
+    return {
+        "rows": lambda plan: execute_query_plan(dataframe, plan),
+        "index": lambda plan: execute_query_plan(dataframe, plan, row_index=row_index),
+        "cube": lambda plan: execute_query_plan(dataframe, plan, cube=cube),
+        "duckdb": lambda plan: execute_query_plan_duckdb(snapshot, plan),
+    }
+
+
+def _parsed(plan):
+    """Round-trip a plan through the contract, as the codegen stage does."""
+    return QueryPlanSchema.model_validate(plan).model_dump()
+
+
+@pytest.mark.parametrize("engine", ENGINES)
+@pytest.mark.parametrize(
+    "numeric_plan,text_plan",
+    [pair[1:] for pair in PLAN_PAIRS],
+    ids=[pair[0] for pair in PLAN_PAIRS],
+)
+def test_numeric_operands_match_text_operands(engines, engine, numeric_plan, text_plan):
+    numeric = engines[engine](_parsed(numeric_plan))
+    text = engines[engine](_parsed(text_plan))
+
+    assert text["filtered_row_count"] > 0
+    assert numeric["filtered_row_count"] == text["filtered_row_count"]
+    pd.testing.assert_frame_equal(numeric["result_df"], text["result_df"])
+
+
+@pytest.mark.parametrize(
+    "plan",
+    [
+        {
+            "filters": [
+                {
+                    "column": "property_name",
+                    "op": "in",
+                    "values": ["Building 17", "Building 160"],
+                },
+                {"column": "quarter", "op": "eq", "values": ["2025-Q1"]},
+            ],
+            "group_by": ["property_name"],
+            "aggregations": [{"column": "profit", "func": "sum", "alias": "total"}],
+        },
+        {
+            "filters": [
+                {"column": "month", "op": "between", "values": ["2024-M03", "2024-M09"]}
+            ],
+            "group_by": ["month"],
+            "derive_pnl": True,
+        },
+        {
+            "filters": [{"column": "tenant_name", "op": "not_null", "values": []}],
+            "group_by": ["property_name"],
+            "aggregations": [
+                {"column": "tenant_name", "func": "nunique", "alias": "tenants"}
+            ],
+            "sort": [{"column": "tenants", "ascending": False}],
+            "limit": 3,
+        },
+    ],
+)
+def test_index_and_cube_paths_match_row_path(engines, plan):
+    plan = _parsed(plan)
+    expected = engines["rows"](plan)
+
+    for engine in ("index", "cube"):
+        actual = engines[engine](plan)
+        # The cube path counts matching cube cells, not ledger rows.
+        assert actual["filtered_row_count"] > 0
+        assert expected["filtered_row_count"] > 0
+        pd.testing.assert_frame_equal(
+            actual["result_df"].reset_index(drop=True),
+            expected["result_df"].reset_index(drop=True),
+        )
+
+
+@pytest.mark.parametrize(
+    "op,values",
+    [
+        ("gte", ["2024-M10"]),
+        ("lt", ["2024-M03"]),
+        ("lte", ["2030-M01"]),
+        ("gt", ["1999-M12"]),
+        ("between", ["2024-M11", "2025-M02"]),
+    ],
+)
+def test_period_comparisons_on_categorical_storage(snapshot, op, values):
+    """Ordered period categoricals compare through the integer period keys."""
+    plan = _parsed({"filters": [{"column": "month", "op": op, "values": values}]})
+    categorical = _read_source_dataframe(snapshot.dataset_path, True)
+    plain = _read_source_dataframe(snapshot.dataset_path, False)
+
+    expected = execute_query_plan(plain, plan)
+    actual = execute_query_plan(categorical, plan)
+
+    assert actual["filtered_row_count"] == expected["filtered_row_count"]
+
+
+def test_unknown_column_is_rejected(snapshot):
+    plan = _parsed({"filters": [{"column": "address", "op": "eq", "values": ["x"]}]})
+
+    with pytest.raises(QueryPlanError):
+        execute_query_plan(snapshot.dataframe, plan)
+
+
+def test_malformed_period_bound_is_rejected(snapshot):
+    plan = _parsed(
+        {"filters": [{"column": "month", "op": "between", "values": ["2024", "May"]}]}
+    )
+
+    with pytest.raises(QueryPlanError):
+        execute_query_plan(snapshot.dataframe, plan)
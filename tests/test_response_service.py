@@ -0,0 +1,58 @@
+import numpy as np
+import pandas as pd
+
+from src.services.response_service import result_records, serialize_result_frame
+
+
+def test_serialize_result_frame_keeps_duplicate_columns():
+    frame = pd.DataFrame([[1, 2], [3, 4]], columns=["amount", "amount"])
+
+    payload = serialize_result_frame(frame, max_rows=10)
+
+    assert payload["columns"] == {"amount": [1, 3], "amount.1": [2, 4]}
+
+
+def test_serialize_result_frame_suffix_avoids_existing_names():
+    frame = pd.DataFrame([[1, 2, 3]], columns=["a", "a", "a.1"])
+
+    payload = serialize_result_frame(frame, max_rows=10)
+
+    assert list(payload["columns"]) == ["a", "a.1", "a.1.1"]
+
+
+def test_serialize_result_frame_list_cells_and_nulls():
+    frame = pd.DataFrame(
+        {"tenants": [["A", "B"], None], "profit": [np.nan, 2.5], "name": ["x", None]}
+    )
+
+    payload = serialize_result_frame(frame, max_rows=10)
+
+    assert payload["columns"] == {
+        "tenants": [["A", "B"], None],
+        "profit": [None, 2.5],
+        "name": ["x", None],
+    }
+
+
+def test_serialize_result_frame_truncates_and_round_trips_records():
+    frame = pd.DataFrame({"year": ["2024", "2025", "2026"], "profit": [1.0, 2.0, 3.0]})
+
+    payload = serialize_result_frame(frame, max_rows=2, task_type="list")
+
+    assert payload["row_count"] == 2
+    assert payload["total_rows"] == 3
+    assert payload["truncated"] is True
+    assert result_records(payload) == [
+        {"year": "2024", "profit": 1.0},
+        {"year": "2025", "profit": 2.0},
+    ]
+
+
+def test_serialize_result_frame_uses_engine_total_rows():
+    frame = pd.DataFrame({"profit": [1.0, 2.0]})
+
+    payload = serialize_result_frame(frame, max_rows=1, total_rows=5000)
+
+    assert payload["row_count"] == 1
+    assert payload["total_rows"] == 5000
+    assert payload["truncated"] is True
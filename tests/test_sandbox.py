@@ -0,0 +1,77 @@
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from src.data.repository import get_dataset_snapshot
+from src.services import sandbox
+from src.services.sandbox import (
+    SandboxPool,
+    SandboxStaleSnapshotError,
+    SandboxUnavailableError,
+)
+
+CODE = "result_df = dataframe[['profit']].head(2)"
+
+
+def _wait_for(predicate, timeout=60.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.05)
+    return False
+
+
+def test_failed_worker_is_respawned_with_backoff(monkeypatch, tmp_path):
+    monkeypatch.setattr(sandbox, "_RESPAWN_BACKOFF_SEC", 0.05)
+    pool = SandboxPool(1, dataset_path=str(tmp_path / "missing.parquet"))
+    try:
+        assert _wait_for(lambda: pool._start_failures >= 2)
+
+        # During a long backoff no worker runs, and plans fail fast.
+        monkeypatch.setattr(sandbox, "_RESPAWN_BACKOFF_SEC", 30.0)
+        failures = pool._start_failures
+        assert _wait_for(lambda: pool._start_failures > failures)
+        started = time.monotonic()
+        with pytest.raises(SandboxUnavailableError):
+            pool.execute(
+                get_dataset_snapshot(),
+                CODE,
+                time_scope=None,
+                read_only=True,
+                row_index=False,
+            )
+        assert time.monotonic() - started < 1
+    finally:
+        pool.close()
+
+
+def test_stale_snapshot_raises_after_retrying(monkeypatch):
+    monkeypatch.setattr(sandbox, "_STALE_RETRY_SEC", 0.05)
+    snapshot = get_dataset_snapshot()
+    pool = SandboxPool(1)
+    try:
+        execution = pool.execute(
+            snapshot, CODE, time_scope=None, read_only=True, row_index=False
+        )
+        assert len(execution["result_df"]) == 2
+
+        other_version = SimpleNamespace(
+            dataset_path=snapshot.dataset_path,
+            categorical=snapshot.categorical,
+            version="not-loaded",
+        )
+        started = time.monotonic()
+        with pytest.raises(SandboxStaleSnapshotError):
+            pool.execute(
+                other_version,
+                CODE,
+                time_scope=None,
+                read_only=True,
+                row_index=False,
+                wall_time_sec=1.0,
+            )
+        assert time.monotonic() - started < 5
+    finally:
+        pool.close()